@@ -10,8 +10,9 @@ class TeamAdmin(admin.ModelAdmin):
 
 @admin.register(Competition)
 class CompetitionAdmin(admin.ModelAdmin):
-    list_display = ['name']
-    search_fields = ['name']
+    list_display = ['name', 'code', 'monitoring_enabled', 'sync_interval_minutes', 'video_sync_enabled']
+    list_filter = ['monitoring_enabled']
+    search_fields = ['name', 'code']
 
 
 @admin.register(TeamInfo)
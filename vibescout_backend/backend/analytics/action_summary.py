@@ -0,0 +1,216 @@
+"""Per-team metrics aggregated from scouted RobotAction timelines"""
+
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Q,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Cast, Lag
+
+from .running_stats import create_team_infos
+
+logger = logging.getLogger(__name__)
+
+SHOOTING = "shooting"
+DEFENDING = "defending"
+DISABLED = "disabled"
+
+SUMMARY_FIELDS = [
+    "scouted_matches",
+    "scouted_seconds",
+    "action_seconds",
+    "time_share",
+    "fuel_scored",
+    "shooting_seconds",
+    "fuel_per_shooting_second",
+    "cycle_count",
+    "avg_cycle_time",
+    "defense_seconds_per_match",
+    "disabled_rate",
+]
+
+
+def _duration():
+    return ExpressionWrapper(
+        Cast("end_time", FloatField()) - Cast("start_time", FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def compute_action_summaries(competition, team_ids=None) -> dict:
+    """
+    Aggregate the robot actions scouted at a competition per team.
+
+    Three queries: per team and action type durations and fuel, per team
+    match counts, and the gaps between consecutive shooting actions of a
+    team in a match from a Lag window.
+
+    Cycle time is the average time from the start of one shooting action to
+    the start of the next within a match. Fuel per shooting second counts
+    the fuel of shooting actions only. Disabled rate is the share of scouted
+    matches with any disabled time.
+
+    Args:
+        competition: Competition instance
+        team_ids: Only summarize these teams (default: every scouted team)
+
+    Returns:
+        dict mapping team_id to a dict of SUMMARY_FIELDS values
+    """
+    from backend.models import RobotAction
+
+    actions = RobotAction.objects.filter(match__competition=competition)
+    if team_ids is not None:
+        actions = actions.filter(team_id__in=list(team_ids))
+
+    summaries = {}
+    for team_id, action_type, seconds, fuel in (
+        actions.values("team_id", "action_type")
+        .annotate(seconds=Sum(_duration()), fuel=Sum("fuel"))
+        .order_by()
+        .values_list("team_id", "action_type", "seconds", "fuel")
+    ):
+        summary = summaries.setdefault(
+            team_id, {"action_seconds": {}, "fuel_scored": 0, "shooting_fuel": 0}
+        )
+        summary["action_seconds"][action_type] = round(float(seconds or 0), 2)
+        summary["fuel_scored"] += fuel or 0
+        if action_type == SHOOTING:
+            summary["shooting_fuel"] = fuel or 0
+
+    for team_id, matches, disabled_matches in (
+        actions.values("team_id")
+        .annotate(
+            matches=Count("match_id", distinct=True),
+            disabled_matches=Count(
+                "match_id", filter=Q(action_type=DISABLED), distinct=True
+            ),
+        )
+        .order_by()
+        .values_list("team_id", "matches", "disabled_matches")
+    ):
+        summaries[team_id]["matches"] = matches
+        summaries[team_id]["disabled_matches"] = disabled_matches
+
+    # Time between the starts of consecutive shooting actions in a match
+    gaps = list(
+        actions.filter(action_type=SHOOTING)
+        .annotate(
+            previous_start=Window(
+                Lag(Cast("start_time", FloatField())),
+                partition_by=[F("match_id"), F("team_id")],
+                order_by=F("start_time").asc(),
+            )
+        )
+        .order_by()
+        .values_list("team_id", Cast("start_time", FloatField()), "previous_start")
+    )
+    gaps = np.array(
+        [(team_id, start - previous) for team_id, start, previous in gaps if previous is not None],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    cycle_teams, cycle_index = np.unique(gaps[:, 0].astype(np.int64), return_inverse=True)
+    cycle_counts = np.bincount(cycle_index, minlength=len(cycle_teams))
+    cycle_totals = np.bincount(cycle_index, weights=gaps[:, 1], minlength=len(cycle_teams))
+    cycles = {
+        int(team_id): (int(count), float(total))
+        for team_id, count, total in zip(cycle_teams, cycle_counts, cycle_totals)
+    }
+
+    results = {}
+    for team_id, summary in summaries.items():
+        action_seconds = summary["action_seconds"]
+        scouted_seconds = sum(action_seconds.values())
+        shooting_seconds = action_seconds.get(SHOOTING, 0.0)
+        cycle_count, cycle_total = cycles.get(team_id, (0, 0.0))
+        matches = summary["matches"]
+        results[team_id] = {
+            "scouted_matches": matches,
+            "scouted_seconds": round(scouted_seconds, 2),
+            "action_seconds": action_seconds,
+            "time_share": {
+                action_type: round(seconds / scouted_seconds, 4) if scouted_seconds else 0.0
+                for action_type, seconds in action_seconds.items()
+            },
+            "fuel_scored": summary["fuel_scored"],
+            "shooting_seconds": shooting_seconds,
+            "fuel_per_shooting_second": (
+                round(summary["shooting_fuel"] / shooting_seconds, 3)
+                if shooting_seconds
+                else None
+            ),
+            "cycle_count": cycle_count,
+            "avg_cycle_time": round(cycle_total / cycle_count, 2) if cycle_count else None,
+            "defense_seconds_per_match": round(
+                action_seconds.get(DEFENDING, 0.0) / matches, 2
+            ),
+            "disabled_rate": round(summary["disabled_matches"] / matches, 4),
+        }
+    return results
+
+
+@transaction.atomic
+def refresh_action_summaries(competition, team_ids=None) -> dict:
+    """
+    Recompute and store the TeamActionSummary rows of a competition.
+
+    Called with the teams of each stored submission, so only their rows are
+    aggregated again; without team_ids every team is refreshed. Summaries of
+    teams that no longer have actions are removed.
+
+    Args:
+        competition: Competition instance
+        team_ids: Teams whose actions changed (default: all)
+
+    Returns:
+        dict with the rows updated, created and removed
+    """
+    from backend.models import TeamActionSummary, TeamInfo
+
+    results = compute_action_summaries(competition, team_ids)
+
+    infos = TeamInfo.objects.filter(competition=competition)
+    if team_ids is not None:
+        infos = infos.filter(team_id__in=list(team_ids))
+    info_ids = dict(infos.values_list("team_id", "pk"))
+    missing = [team_id for team_id in results if team_id not in info_ids]
+    if missing:
+        created = create_team_infos(competition.pk, missing)
+        info_ids.update({team_id: info.pk for team_id, info in created.items()})
+
+    existing = {
+        summary.team_info_id: summary
+        for summary in TeamActionSummary.objects.select_for_update().filter(
+            team_info_id__in=info_ids.values()
+        )
+    }
+
+    to_update, to_create = [], []
+    for team_id, values in results.items():
+        summary = existing.pop(info_ids[team_id], None) or TeamActionSummary(
+            team_info_id=info_ids[team_id]
+        )
+        for field, value in values.items():
+            setattr(summary, field, value)
+        (to_update if summary.pk else to_create).append(summary)
+
+    TeamActionSummary.objects.bulk_update(to_update, SUMMARY_FIELDS)
+    TeamActionSummary.objects.bulk_create(to_create)
+    # Rows left over belong to teams without actions any more
+    removed = TeamActionSummary.objects.filter(
+        pk__in=[summary.pk for summary in existing.values()]
+    ).delete()[0]
+
+    logger.debug(
+        f"Refreshed action summaries at {competition.code}: {len(to_update)} updated, "
+        f"{len(to_create)} created, {removed} removed"
+    )
+    return {"updated": len(to_update), "created": len(to_create), "removed": removed}
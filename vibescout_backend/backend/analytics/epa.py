@@ -0,0 +1,442 @@
+"""Expected points added (EPA) ratings updated match by match"""
+
+import hashlib
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, IntegerField, Min, Q, Value, When
+
+from .opr import ALLIANCE_TEAM_FIELDS, COMPONENTS
+from .running_stats import create_team_infos
+
+logger = logging.getLogger(__name__)
+
+# Rated score components, in the order EPA vectors hold them
+EPA_COMPONENTS = ["total", "auto", "teleop", "endgame"]
+
+# A team's share of its alliance's prediction error moves its EPA by this
+# rate, decaying from START towards MIN with every match it plays in a season
+LEARNING_RATE_START = 0.5
+LEARNING_RATE_MIN = 0.2
+LEARNING_RATE_DECAY = 0.8
+
+# A team's EPA from its previous event moves this far towards the season
+# average before its next event starts
+SEED_REVERSION = 0.2
+
+# Chronological order of match types within an event
+MATCH_TYPE_ORDER = ["qualification", "quarterfinal", "semifinal", "final"]
+
+# Packed time series row: the match (0 for the starting value) and the EPA
+# vector after it
+HISTORY_DTYPE = np.dtype([("match", "<i4"), ("epa", "<f4", (len(EPA_COMPONENTS),))])
+
+MATCH_COLUMNS = (
+    ["id"]
+    + ALLIANCE_TEAM_FIELDS[0]
+    + ALLIANCE_TEAM_FIELDS[1]
+    + [COMPONENTS[name][0] for name in EPA_COMPONENTS]
+    + [COMPONENTS[name][1] for name in EPA_COMPONENTS]
+)
+
+
+def learning_rate(season_matches: int) -> float:
+    """Update rate of a team that has played season_matches matches this season"""
+    return LEARNING_RATE_MIN + (LEARNING_RATE_START - LEARNING_RATE_MIN) * (
+        LEARNING_RATE_DECAY**season_matches
+    )
+
+
+def pack_history(rows: list) -> bytes:
+    """Pack [(match_id, epa vector), ...] into TeamEpa.history bytes"""
+    return np.array(rows, dtype=HISTORY_DTYPE).tobytes()
+
+
+def unpack_history(data: bytes) -> np.ndarray:
+    """Structured array with match and epa columns from TeamEpa.history"""
+    return np.frombuffer(bytes(data), dtype=HISTORY_DTYPE)
+
+
+def season_of(competition) -> str:
+    """Season of a competition: the year its code starts with, else the code"""
+    code = competition.code
+    return code[:4] if code[:4].isdigit() else code
+
+
+def season_competitions(season: str) -> list:
+    """
+    Competitions of a season in the order they were played.
+
+    Competitions are ordered by their earliest known match time, then by id.
+    """
+    from backend.models import Competition
+
+    competitions = Competition.objects.filter(
+        Q(code__startswith=season) if season.isdigit() else Q(code=season)
+    ).annotate(
+        first_match_time=Min(
+            "matches__predicted_match_time",
+            filter=Q(matches__predicted_match_time__gt=0),
+        )
+    )
+    return sorted(
+        competitions,
+        key=lambda c: (c.first_match_time is None, c.first_match_time or 0, c.pk),
+    )
+
+
+def chronological_matches(competitions):
+    """
+    Played matches of the competitions, event by event in match order.
+
+    Args:
+        competitions: Competition instances in the order to rate them
+
+    Returns:
+        values_list queryset of (competition_id, *MATCH_COLUMNS) rows
+    """
+    from backend.models import Match
+
+    competition_order = Case(
+        *[When(competition_id=c.pk, then=Value(i)) for i, c in enumerate(competitions)],
+        output_field=IntegerField(),
+    )
+    type_order = Case(
+        *[When(match_type=t, then=Value(i)) for i, t in enumerate(MATCH_TYPE_ORDER)],
+        default=Value(len(MATCH_TYPE_ORDER)),
+        output_field=IntegerField(),
+    )
+    return (
+        Match.objects.filter(competition__in=competitions, has_played=True)
+        .order_by(competition_order, type_order, "set_number", "match_number", "pk")
+        .values_list("competition_id", *MATCH_COLUMNS)
+    )
+
+
+class EpaState:
+    """
+    Ratings of one competition while its matches are applied in order.
+
+    Teams without a rating start at the season average of an alliance
+    score split over its three robots when they first play, or from their
+    previous event's rating when seeds has one.
+    """
+
+    def __init__(self, seeds: dict, season_totals=None, season_alliances: int = 0):
+        # team_id -> {"epa", "season_matches", "competition_id"} from earlier events
+        self.seeds = seeds
+        self.season_totals = (
+            np.zeros(len(EPA_COMPONENTS)) if season_totals is None else season_totals
+        )
+        self.season_alliances = season_alliances
+        self.teams = {}
+        self.digest = hashlib.sha1()
+        self.match_count = 0
+        # Sum of absolute errors of the total score predicted before each match
+        self.prediction_error = 0.0
+
+    def baseline(self) -> np.ndarray:
+        """Average robot contribution of the season so far"""
+        return self.season_totals / max(self.season_alliances, 1) / 3
+
+    def team(self, team_id: int) -> dict:
+        rating = self.teams.get(team_id)
+        if rating is None:
+            seed = self.seeds.get(team_id)
+            if seed is not None:
+                epa = seed["epa"] + SEED_REVERSION * (self.baseline() - seed["epa"])
+                season_matches = seed["season_matches"]
+                seeded_from = seed["competition_id"]
+            else:
+                epa, season_matches, seeded_from = self.baseline(), 0, None
+            rating = self.teams[team_id] = {
+                "epa": epa,
+                "match_count": 0,
+                "season_matches": season_matches,
+                "seeded_from": seeded_from,
+                "history": [(0, epa)],
+            }
+        return rating
+
+    def apply(self, row) -> None:
+        """
+        Add one played match (a MATCH_COLUMNS row).
+
+        Each robot moves its EPA by its learning rate times a third of its
+        alliance's prediction error, all six from their ratings before the
+        match.
+        """
+        match_id = row[0]
+        team_ids = np.array(row[1:7]).reshape(2, 3)
+        scores = np.array(row[7:], dtype=np.float64).reshape(2, len(EPA_COMPONENTS))
+
+        ratings = [[self.team(team_id) for team_id in alliance] for alliance in team_ids]
+        for alliance, actual in zip(ratings, scores):
+            error = (actual - sum(rating["epa"] for rating in alliance)) / 3
+            self.prediction_error += abs(3 * error[0])
+            for rating in alliance:
+                rating["epa"] = rating["epa"] + learning_rate(rating["season_matches"]) * error
+                rating["match_count"] += 1
+                rating["season_matches"] += 1
+                rating["history"].append((match_id, rating["epa"]))
+
+        self.season_totals = self.season_totals + scores.sum(axis=0)
+        self.season_alliances += 2
+        self.digest.update(np.array(row, dtype=np.int64).tobytes())
+        self.match_count += 1
+
+    def source_digest(self) -> str:
+        return self.digest.hexdigest()[:16]
+
+
+def _season_seeds(competition, season_order: list) -> tuple:
+    """
+    Latest ratings and alliance score totals from a competition's earlier season events.
+
+    Returns:
+        (seeds, season_totals, season_alliances) for EpaState
+    """
+    from backend.models import Match, TeamEpa
+
+    earlier = season_order[: [c.pk for c in season_order].index(competition.pk)]
+    if not earlier:
+        return {}, None, 0
+    position = {c.pk: i for i, c in enumerate(earlier)}
+
+    seeds = {}
+    for epa in TeamEpa.objects.filter(
+        team_info__competition__in=earlier, match_count__gt=0
+    ).select_related("team_info"):
+        team_id = epa.team_info.team_id
+        known = seeds.get(team_id)
+        if known is None or position[epa.team_info.competition_id] > known["position"]:
+            seeds[team_id] = {
+                "epa": np.array(epa.epa_vector()),
+                "season_matches": epa.season_matches,
+                "competition_id": epa.team_info.competition_id,
+                "position": position[epa.team_info.competition_id],
+            }
+
+    rows = Match.objects.filter(competition__in=earlier, has_played=True).values_list(
+        *MATCH_COLUMNS[7:]
+    )
+    scores = np.array(list(rows), dtype=np.float64).reshape(-1, 2, len(EPA_COMPONENTS))
+    return seeds, scores.sum(axis=(0, 1)), 2 * len(scores)
+
+
+def _save_state(competition, state: EpaState, existing: dict, team_ids) -> dict:
+    """
+    Write the ratings of some of a state's teams.
+
+    Every other stored rating of the competition is marked as rated up to
+    the state's matches.
+
+    Args:
+        competition: Competition instance
+        state: EpaState after its matches were applied
+        existing: team_id -> TeamEpa rows loaded for the competition
+        team_ids: Teams whose ratings changed
+
+    Returns:
+        dict with the rows updated and created
+    """
+    from backend.models import TeamEpa, TeamInfo
+
+    infos = dict(
+        TeamInfo.objects.filter(competition=competition).values_list("team_id", "pk")
+    )
+    missing = [team_id for team_id in team_ids if team_id not in infos]
+    if missing:
+        created = create_team_infos(competition.pk, missing)
+        infos.update({team_id: info.pk for team_id, info in created.items()})
+
+    digest = state.source_digest()
+    to_update, to_create = [], []
+    for team_id in team_ids:
+        rating = state.teams[team_id]
+        epa = existing.get(team_id) or TeamEpa(team_info_id=infos[team_id])
+        epa.set_epa_vector(rating["epa"])
+        epa.match_count = rating["match_count"]
+        epa.season_matches = rating["season_matches"]
+        epa.seeded_from_id = rating["seeded_from"]
+        epa.history = pack_history(rating["history"])
+        epa.rated_matches = state.match_count
+        epa.source_digest = digest
+        (to_update if epa.pk else to_create).append(epa)
+
+    if to_update:
+        TeamEpa.objects.bulk_update(
+            to_update,
+            [
+                *[f"epa_{name}" for name in EPA_COMPONENTS],
+                "match_count",
+                "season_matches",
+                "seeded_from",
+                "history",
+                "rated_matches",
+                "source_digest",
+            ],
+        )
+    TeamEpa.objects.bulk_create(to_create)
+
+    unchanged = [epa.pk for team_id, epa in existing.items() if team_id not in team_ids]
+    if unchanged:
+        TeamEpa.objects.filter(pk__in=unchanged).update(
+            rated_matches=state.match_count, source_digest=digest
+        )
+    return {"updated": len(to_update), "created": len(to_create)}
+
+
+def _restore_state(state: EpaState, existing: dict, rows: list) -> None:
+    """Load stored ratings that were computed from rows into a state"""
+    for row in rows:
+        scores = np.array(row[7:], dtype=np.float64).reshape(2, len(EPA_COMPONENTS))
+        state.season_totals = state.season_totals + scores.sum(axis=0)
+        state.season_alliances += 2
+        state.digest.update(np.array(row, dtype=np.int64).tobytes())
+        state.match_count += 1
+
+    for team_id, epa in existing.items():
+        state.teams[team_id] = {
+            "epa": np.array(epa.epa_vector()),
+            "match_count": epa.match_count,
+            "season_matches": epa.season_matches,
+            "seeded_from": epa.seeded_from_id,
+            "history": [
+                (int(row["match"]), row["epa"]) for row in unpack_history(epa.history)
+            ],
+        }
+
+
+def update_competition_epa(competition) -> dict:
+    """
+    Bring a competition's EPA ratings up to date with its played matches.
+
+    Matches played after the last rated one are applied to the stored
+    ratings one by one, and only the teams that played them are written.
+    When a rated match was corrected, removed or played out of order (the
+    digest of the rated matches no longer matches), the competition is
+    rated again from its seeds.
+
+    Args:
+        competition: Competition instance
+
+    Returns:
+        dict with method ("incremental", "rebuilt" or "unchanged"), applied
+        matches and the rows written
+    """
+    from backend.models import TeamEpa
+
+    season_order = season_competitions(season_of(competition))
+    with transaction.atomic():
+        existing = {
+            epa.team_info.team_id: epa
+            for epa in TeamEpa.objects.select_for_update()
+            .filter(team_info__competition=competition)
+            .select_related("team_info")
+        }
+        rows = [row[1:] for row in chronological_matches([competition])]
+        seeds = _season_seeds(competition, season_order)
+        state = EpaState(*seeds)
+
+        stored = next(iter(existing.values()), None)
+        rated = stored.rated_matches if stored else 0
+        if stored and rated <= len(rows):
+            _restore_state(state, existing, rows[:rated])
+
+        if stored and rated <= len(rows) and state.source_digest() == stored.source_digest:
+            if rated == len(rows):
+                return {"method": "unchanged", "applied": 0, "updated": 0, "created": 0}
+            method = "incremental"
+            new_rows = rows[rated:]
+        else:
+            method = "rebuilt"
+            new_rows = rows
+            state = EpaState(*seeds)
+
+        for row in new_rows:
+            state.apply(row)
+
+        if method == "incremental":
+            changed = {team_id for row in new_rows for team_id in row[1:7]}
+        else:
+            # Teams no longer in any rated match lose their rating
+            stale = [
+                epa.pk for team_id, epa in existing.items() if team_id not in state.teams
+            ]
+            TeamEpa.objects.filter(pk__in=stale).delete()
+            existing = {t: e for t, e in existing.items() if t in state.teams}
+            changed = list(state.teams)
+        written = _save_state(competition, state, existing, changed)
+
+    logger.debug(
+        f"EPA at {competition.code}: {method}, {len(new_rows)} matches applied"
+    )
+    return {"method": method, "applied": len(new_rows), **written}
+
+
+def replay_season(season: str, batch_size: int = 2000) -> dict:
+    """
+    Rate every competition of a season again in one pass over its matches.
+
+    Played matches are streamed event by event in match order; each event
+    starts from the ratings its teams finished their previous event with,
+    and its ratings are written as soon as its last match is applied.
+
+    Args:
+        season: Season (year) as returned by season_of
+        batch_size: Rows fetched from the database at a time
+
+    Returns:
+        dict with competitions, matches and ratings written, and the mean
+        absolute error of the alliance totals predicted before each match
+    """
+    from backend.models import TeamEpa
+
+    competitions = season_competitions(season)
+    by_pk = {c.pk: c for c in competitions}
+    seeds = {}
+    totals = np.zeros(len(EPA_COMPONENTS))
+    alliances = 0
+    written = {"competitions": 0, "matches": 0, "ratings": 0, "prediction_error": 0.0}
+
+    def finish(competition_id, state):
+        nonlocal totals, alliances
+        _save_state(by_pk[competition_id], state, {}, list(state.teams))
+        for team_id, rating in state.teams.items():
+            seeds[team_id] = {
+                "epa": rating["epa"],
+                "season_matches": rating["season_matches"],
+                "competition_id": competition_id,
+            }
+        totals, alliances = state.season_totals, state.season_alliances
+        written["competitions"] += 1
+        written["matches"] += state.match_count
+        written["ratings"] += len(state.teams)
+        written["prediction_error"] += state.prediction_error
+
+    with transaction.atomic():
+        TeamEpa.objects.filter(team_info__competition__in=competitions).delete()
+        current, state = None, None
+        for competition_id, *row in chronological_matches(competitions).iterator(
+            chunk_size=batch_size
+        ):
+            if competition_id != current:
+                if state is not None:
+                    finish(current, state)
+                current = competition_id
+                state = EpaState(dict(seeds), totals, alliances)
+            state.apply(row)
+        if state is not None:
+            finish(current, state)
+
+    # Mean absolute error of the alliance totals predicted before each match
+    written["prediction_error"] = float(
+        written["prediction_error"] / max(2 * written["matches"], 1)
+    )
+    logger.info(
+        f"Replayed EPA for season {season}: {written['matches']} matches at "
+        f"{written['competitions']} competitions"
+    )
+    return written
@@ -0,0 +1,285 @@
+"""Monte Carlo match outcome predictions from OPR-based team score distributions"""
+
+import hashlib
+import logging
+
+import numpy as np
+from django.core.cache import cache
+
+from .opr import (
+    ALLIANCE_TEAM_FIELDS,
+    incidence_matrix,
+    load_alliance_arrays,
+    solve_ratings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Match columns of the six alliance team ids, blue first
+MATCH_TEAM_FIELDS = ALLIANCE_TEAM_FIELDS[0] + ALLIANCE_TEAM_FIELDS[1]
+
+# Simulated plays of every predicted match
+DEFAULT_DRAWS = 5000
+MAX_DRAWS = 20000
+
+# Match result ranking points (2025+ rules); bonus RPs are not simulated
+WIN_RANKING_POINTS = 3
+TIE_RANKING_POINTS = 1
+
+# Matches of residual history a team's own score spread counts as; fewer
+# played matches lean on the competition-wide spread
+SPREAD_PRIOR_MATCHES = 3
+
+# Residual degrees of freedom the prior alliance variance (the spread of
+# alliance scores about their mean) counts as. Until there are more played
+# alliances than teams the OPR fit is exact and only the prior is used
+VARIANCE_PRIOR_DEGREES = 10
+
+# Predictions are keyed by data version, so they only expire to free memory
+PREDICTION_CACHE_SECONDS = 3600
+
+
+def team_distributions(competition) -> dict:
+    """
+    Per-robot score distributions of every team at a competition.
+
+    A robot's expected contribution is its total OPR. Its spread combines
+    the OPR fit's residuals on the alliances it played on (shrunk toward
+    the competition-wide residual spread and split evenly over the three
+    robots of an alliance) with the standard error of its OPR. The
+    competition-wide spread is shrunk toward the variance of alliance
+    scores, which replaces it while the fit has no residual degrees of
+    freedom. Teams without played matches get the average OPR, spread by
+    the competition's OPR variance.
+
+    Args:
+        competition: Competition instance
+
+    Returns:
+        dict with version (changes whenever a played match does), teams
+        (sorted team ids), mean and sd arrays following teams, and
+        default_mean and default_sd for unrated teams
+    """
+    arrays = load_alliance_arrays(competition)
+    version = hashlib.sha1(
+        arrays["team_ids"].tobytes() + arrays["scores"].tobytes()
+    ).hexdigest()[:16]
+
+    if not len(arrays["team_ids"]):
+        return {
+            "version": version,
+            "teams": np.zeros(0, dtype=np.int64),
+            "mean": np.zeros(0),
+            "sd": np.zeros(0),
+            "default_mean": 0.0,
+            "default_sd": 0.0,
+        }
+
+    ratings = solve_ratings(arrays, (competition.pk, False))
+    opr = ratings["opr"]["total"]
+
+    teams, matrix = incidence_matrix(arrays["team_ids"])
+    scores = arrays["scores"][:, :, 0].reshape(-1)
+    residuals = scores - matrix @ opr
+    prior_variance = float(scores.var())
+
+    # In-sample residuals are smaller than prediction errors: correct for
+    # the degrees of freedom the fitted ratings used up, and shrink toward
+    # the prior while there are few of them left
+    degrees = len(residuals) - len(teams)
+    if degrees > 0:
+        squared = residuals**2 * len(residuals) / degrees
+        alliance_variance = (
+            degrees * squared.mean() + VARIANCE_PRIOR_DEGREES * prior_variance
+        ) / (degrees + VARIANCE_PRIOR_DEGREES)
+    else:
+        # Residuals of an exact fit say nothing about the spread
+        alliance_variance = prior_variance
+        squared = np.full(len(residuals), prior_variance)
+
+    # Sum of squared residuals over the alliances each team played on
+    coo = matrix.tocoo()
+    team_squared = np.bincount(coo.col, weights=squared[coo.row], minlength=len(teams))
+    played = ratings["matches"]
+    variance = (team_squared + SPREAD_PRIOR_MATCHES * alliance_variance) / (
+        played + SPREAD_PRIOR_MATCHES
+    )
+    # Plus the uncertainty of the rating itself, large after few matches.
+    # Ratings the played matches do not pin down are still only uncertain
+    # within the spread of robot contributions, a third of the prior
+    rating_variance = ratings["rating_variance"] * alliance_variance
+    robot_variance = prior_variance / 3
+    if robot_variance > 0:
+        rating_variance = (
+            rating_variance * robot_variance / (rating_variance + robot_variance)
+        )
+
+    return {
+        "version": version,
+        "teams": teams,
+        "mean": opr,
+        "sd": np.sqrt(variance / 3 + rating_variance),
+        "default_mean": float(opr.mean()),
+        "default_sd": float(np.sqrt(alliance_variance / 3 + opr.var())),
+    }
+
+
+def robot_parameters(distributions: dict, team_ids: np.ndarray):
+    """
+    Mean and SD of every robot's contribution.
+
+    Args:
+        distributions: Output of team_distributions
+        team_ids: (matches, 2, 3) array of alliance team ids (alliance 0 is blue)
+
+    Returns:
+        (mean, sd) float arrays shaped like team_ids
+    """
+    teams = distributions["teams"]
+    mean = np.full(team_ids.shape, distributions["default_mean"])
+    sd = np.full(team_ids.shape, distributions["default_sd"])
+    if len(teams):
+        index = np.minimum(np.searchsorted(teams, team_ids), len(teams) - 1)
+        known = teams[index] == team_ids
+        mean[known] = distributions["mean"][index[known]]
+        sd[known] = distributions["sd"][index[known]]
+    return mean, sd
+
+
+def sample_scores(mean: np.ndarray, sd: np.ndarray, draws: int, rng) -> np.ndarray:
+    """
+    Sample alliance scores by drawing every robot's contribution.
+
+    Args:
+        mean, sd: (matches, 2, 3) arrays from robot_parameters
+        draws: Simulated plays of every match
+        rng: numpy Generator
+
+    Returns:
+        int array of shape (draws, matches, 2) with rounded, non-negative
+        alliance scores
+    """
+    # Robot position first, so summing an alliance adds contiguous blocks
+    mean = np.moveaxis(mean, 2, 0)[:, None]
+    sd = np.moveaxis(sd, 2, 0)[:, None]
+    robots = rng.standard_normal((3, draws, *mean.shape[2:])) * sd + mean
+    return np.maximum(np.rint(robots.sum(axis=0)), 0).astype(np.int64)
+
+
+def summarize_scores(scores: np.ndarray) -> list:
+    """
+    Win probabilities, score distribution and ranking-point odds per match.
+
+    Args:
+        scores: (draws, matches, 2) array from sample_scores
+
+    Returns:
+        list with one dict per match, in the order of the simulated matches
+    """
+    blue, red = scores[:, :, 0], scores[:, :, 1]
+    blue_win = (blue > red).mean(axis=0)
+    red_win = (red > blue).mean(axis=0)
+    tie = 1 - blue_win - red_win
+    expected = scores.mean(axis=0)
+    low, median, high = np.percentile(scores, [10, 50, 90], axis=0)
+
+    def ranking_point_odds(win, loss):
+        return {
+            str(WIN_RANKING_POINTS): round(float(win), 4),
+            str(TIE_RANKING_POINTS): round(float(1 - win - loss), 4),
+            "0": round(float(loss), 4),
+        }
+
+    return [
+        {
+            "blue_win_probability": round(float(blue_win[row]), 4),
+            "red_win_probability": round(float(red_win[row]), 4),
+            "tie_probability": round(float(tie[row]), 4),
+            "blue_expected_score": round(float(expected[row, 0]), 1),
+            "red_expected_score": round(float(expected[row, 1]), 1),
+            "blue_score_range": [
+                float(low[row, 0]), float(median[row, 0]), float(high[row, 0])
+            ],
+            "red_score_range": [
+                float(low[row, 1]), float(median[row, 1]), float(high[row, 1])
+            ],
+            "blue_ranking_point_odds": ranking_point_odds(blue_win[row], red_win[row]),
+            "red_ranking_point_odds": ranking_point_odds(red_win[row], blue_win[row]),
+        }
+        for row in range(scores.shape[1])
+    ]
+
+
+def _cache_key(match, version: str, draws: int) -> str:
+    teams = "-".join(str(getattr(match, field)) for field in MATCH_TEAM_FIELDS)
+    return f"match_prediction:{match.pk}:{version}:{draws}:{teams}"
+
+
+def predict_matches(competition, matches, draws: int = DEFAULT_DRAWS) -> dict:
+    """
+    Predict scheduled matches of a competition.
+
+    Matches missing from the cache are simulated in one call. Predictions
+    are cached per match, data version (the played results the
+    distributions were fitted to), draw count and alliance teams, so they
+    are reused until a result is posted or the schedule changes. Every
+    match has its own random stream, seeded from the data version and the
+    match id, so a prediction does not depend on which other matches were
+    predicted with it.
+
+    Args:
+        competition: Competition instance
+        matches: Match instances to predict
+        draws: Simulated plays of each match
+
+    Returns:
+        dict mapping match id to its prediction (see summarize_scores), with
+        the data version included
+    """
+    matches = list(matches)
+    distributions = team_distributions(competition)
+    version = distributions["version"]
+
+    keys = {match.pk: _cache_key(match, version, draws) for match in matches}
+    cached = cache.get_many(keys.values())
+    predictions = {
+        match_id: cached[key] for match_id, key in keys.items() if key in cached
+    }
+
+    missing = [match for match in matches if match.pk not in predictions]
+    if missing:
+        team_ids = np.array(
+            [
+                [getattr(match, field) for field in MATCH_TEAM_FIELDS]
+                for match in missing
+            ],
+            dtype=np.int64,
+        ).reshape(len(missing), 2, 3)
+        mean, sd = robot_parameters(distributions, team_ids)
+        scores = np.concatenate(
+            [
+                sample_scores(
+                    mean[index : index + 1],
+                    sd[index : index + 1],
+                    draws,
+                    np.random.default_rng([int(version, 16), match.pk]),
+                )
+                for index, match in enumerate(missing)
+            ],
+            axis=1,
+        )
+        summaries = summarize_scores(scores)
+
+        fresh = {}
+        for match, summary in zip(missing, summaries):
+            predictions[match.pk] = fresh[keys[match.pk]] = {
+                **summary,
+                "data_version": version,
+            }
+        cache.set_many(fresh, PREDICTION_CACHE_SECONDS)
+
+    logger.debug(
+        f"Predicted {len(matches)} matches at {competition.code} "
+        f"({len(missing)} simulated, {len(matches) - len(missing)} cached)"
+    )
+    return predictions
@@ -0,0 +1,311 @@
+"""Opponent-adjusted team ratings (OPR, DPR, CCWM) from alliance scores"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
+
+logger = logging.getLogger(__name__)
+
+# Rated score components and their (blue, red) Match columns
+COMPONENTS = {
+    "total": ("blue_total_score", "red_total_score"),
+    "auto": ("blue_auto_points", "red_auto_points"),
+    "teleop": ("blue_teleop_points", "red_teleop_points"),
+    "endgame": ("blue_endgame_points", "red_endgame_points"),
+    "fuel": ("total_blue_fuels", "total_red_fuels"),
+}
+
+ALLIANCE_TEAM_FIELDS = [
+    ["blue_team_1_id", "blue_team_2_id", "blue_team_3_id"],
+    ["red_team_1_id", "red_team_2_id", "red_team_3_id"],
+]
+
+# Added to the normal equations' diagonal so they stay positive definite
+# before every team has played enough matches for a unique solution
+RIDGE = 1e-6
+
+# Largest relative residual of the normal equations accepted after
+# incremental updates before the ratings are solved from scratch
+DRIFT_TOLERANCE = 1e-9
+
+# Solver states kept per process, least recently used dropped first
+STATE_CACHE_SIZE = 32
+
+_states = OrderedDict()
+_states_lock = threading.Lock()
+
+
+def load_alliance_arrays(competition, include_playoffs: bool = False) -> dict:
+    """
+    Load a competition's played matches as per-alliance arrays.
+
+    One query. Qualification matches only unless include_playoffs is set,
+    since playoff alliances are not drawn at random.
+
+    Args:
+        competition: Competition instance
+        include_playoffs: Also rate playoff matches
+
+    Returns:
+        dict with int64 arrays match_ids shaped (matches,) in ascending
+        order, team_ids shaped (matches, 2, 3) and scores shaped
+        (matches, 2, len(COMPONENTS)); alliance 0 is blue
+    """
+    from backend.models import Match
+
+    matches = Match.objects.filter(competition=competition, has_played=True)
+    if not include_playoffs:
+        matches = matches.filter(match_type="qualification")
+
+    columns = (
+        ["id"]
+        + ALLIANCE_TEAM_FIELDS[0]
+        + ALLIANCE_TEAM_FIELDS[1]
+        + [fields[0] for fields in COMPONENTS.values()]
+        + [fields[1] for fields in COMPONENTS.values()]
+    )
+    rows = list(matches.order_by("pk").values_list(*columns))
+    data = np.array(rows, dtype=np.int64).reshape(len(rows), len(columns))
+
+    return {
+        "match_ids": data[:, 0],
+        "team_ids": data[:, 1:7].reshape(len(rows), 2, 3),
+        "scores": data[:, 7:].reshape(len(rows), 2, len(COMPONENTS)),
+    }
+
+
+def incidence_matrix(team_ids: np.ndarray):
+    """
+    Sparse alliance-team incidence matrix.
+
+    Args:
+        team_ids: (matches, 2, 3) array from load_alliance_arrays
+
+    Returns:
+        (teams, matrix) with the sorted unique team ids and a CSR matrix of
+        shape (2 * matches, teams) holding a 1 for each team on each alliance
+    """
+    teams, columns = np.unique(team_ids.reshape(-1, 3), return_inverse=True)
+    alliances = len(team_ids) * 2
+    matrix = sparse.csr_matrix(
+        (
+            np.ones(alliances * 3),
+            columns.ravel(),
+            np.arange(0, alliances * 3 + 1, 3),
+        ),
+        shape=(alliances, len(teams)),
+    )
+    return teams, matrix
+
+
+def _right_hand_sides(scores: np.ndarray) -> np.ndarray:
+    """
+    Per-alliance targets: every component's own score, then the opposing total.
+
+    Rows alternate blue, red; the opponent of row 2i is row 2i + 1.
+    """
+    own = scores.reshape(-1, len(COMPONENTS)).astype(np.float64)
+    opposing_total = scores[:, ::-1, 0].reshape(-1).astype(np.float64)
+    return np.column_stack([own, opposing_total])
+
+
+def _full_solve(arrays: dict) -> dict:
+    """Factor the normal equations of all matches and solve them"""
+    teams, matrix = incidence_matrix(arrays["team_ids"])
+    normal = (matrix.T @ matrix).toarray()
+    normal[np.diag_indices_from(normal)] += RIDGE
+    factor = cho_factor(normal)
+
+    rhs = matrix.T @ _right_hand_sides(arrays["scores"])
+    return {
+        "arrays": arrays,
+        "teams": teams,
+        "normal": normal,
+        # Kept for Sherman-Morrison-Woodbury updates as matches arrive
+        "inverse": cho_solve(factor, np.eye(len(teams))),
+        "rhs": rhs,
+        "ratings": cho_solve(factor, rhs),
+        "updates": 0,
+    }
+
+
+def _new_matches(state: dict, arrays: dict):
+    """
+    Mask of the matches in arrays that the state has not seen yet.
+
+    Returns None when the state cannot be updated incrementally: a match it
+    rated was corrected or removed, or a team without a rating played.
+    """
+    previous = state["arrays"]
+    known = np.isin(arrays["match_ids"], previous["match_ids"])
+    if known.sum() != len(previous["match_ids"]):
+        return None  # A rated match was removed (or un-played)
+    for name in ("team_ids", "scores"):
+        if not np.array_equal(arrays[name][known], previous[name]):
+            return None  # A rated match was corrected
+    if not np.isin(arrays["team_ids"][~known], state["teams"]).all():
+        return None  # A new team needs its own row in the equations
+    return ~known
+
+
+def _update_state(state: dict, arrays: dict, new: np.ndarray) -> bool:
+    """
+    Add new matches to a solver state with a low-rank update.
+
+    Each alliance adds a rank-one term a a^T (a = its 0/1 team vector) to
+    the normal equations. The inverse is updated for all new alliances at
+    once with the Sherman-Morrison-Woodbury identity, so no factorization
+    is repeated.
+
+    Returns:
+        False when the updated solution drifted beyond DRIFT_TOLERANCE
+    """
+    columns = np.searchsorted(state["teams"], arrays["team_ids"][new].reshape(-1, 3))
+    update = np.zeros((len(columns), len(state["teams"])))
+    np.put_along_axis(update, columns, 1.0, axis=1)
+
+    inverse = state["inverse"]
+    projected = inverse @ update.T
+    capacitance = np.eye(len(columns)) + update @ projected
+    inverse = inverse - projected @ np.linalg.solve(capacitance, projected.T)
+
+    normal = state["normal"] + update.T @ update
+    rhs = state["rhs"] + update.T @ _right_hand_sides(arrays["scores"][new])
+    ratings = inverse @ rhs
+
+    # Rounding accumulates over many updates; check the equations still hold
+    residual = np.abs(normal @ ratings - rhs).max() / max(np.abs(rhs).max(), 1.0)
+    if residual > DRIFT_TOLERANCE:
+        logger.info(f"OPR update drifted (residual {residual:.2e}); solving again")
+        return False
+
+    state.update(
+        arrays=arrays,
+        normal=normal,
+        inverse=inverse,
+        rhs=rhs,
+        ratings=ratings,
+        updates=state["updates"] + 1,
+    )
+    return True
+
+
+def solve_ratings(arrays: dict, state_key=None) -> dict:
+    """
+    Least-squares OPR for every component plus DPR and CCWM.
+
+    OPR solves A x = own alliance score, DPR solves A x = opposing
+    alliance score and CCWM is their difference (the rating of the
+    winning margin). All right-hand sides share one factorization.
+
+    With a state_key, the solver state is kept between calls: matches that
+    arrived since the last call are added with a low-rank update, and the
+    ratings are solved from scratch only when a rated match was corrected
+    or removed, a new team played, or the update drifted numerically.
+
+    Args:
+        arrays: Output of load_alliance_arrays
+        state_key: Hashable key of the competition the arrays belong to
+
+    Returns:
+        dict with teams (sorted team ids), matches (played per team),
+        opr (component -> ratings), dpr, ccwm, rating_variance, match_count
+        and method ("full", "incremental" or "cached"); arrays follow teams
+    """
+    if not len(arrays["team_ids"]):
+        empty = np.zeros(0)
+        return {
+            "teams": np.zeros(0, dtype=np.int64),
+            "matches": np.zeros(0, dtype=np.int64),
+            "opr": {component: empty for component in COMPONENTS},
+            "dpr": empty,
+            "ccwm": empty,
+            "rating_variance": empty,
+            "match_count": 0,
+            "method": "full",
+        }
+
+    with _states_lock:
+        state = _states.get(state_key) if state_key is not None else None
+        method = "full"
+        if state is not None:
+            new = _new_matches(state, arrays)
+            if new is not None and not new.any():
+                method = "cached"
+            elif new is not None and _update_state(state, arrays, new):
+                method = "incremental"
+
+        if method == "full":
+            state = _full_solve(arrays)
+        if state_key is not None:
+            _states[state_key] = state
+            _states.move_to_end(state_key)
+            while len(_states) > STATE_CACHE_SIZE:
+                _states.popitem(last=False)
+
+    ratings = state["ratings"]
+    opr = {
+        component: ratings[:, index] for index, component in enumerate(COMPONENTS)
+    }
+    dpr = ratings[:, -1]
+    matches = np.bincount(
+        np.searchsorted(state["teams"], arrays["team_ids"].ravel()),
+        minlength=len(state["teams"]),
+    )
+
+    return {
+        "teams": state["teams"],
+        "matches": matches,
+        "opr": opr,
+        "dpr": dpr,
+        "ccwm": opr["total"] - dpr,
+        # Variance of each rating per unit of alliance score variance
+        "rating_variance": np.diag(state["inverse"]).copy(),
+        "match_count": len(arrays["team_ids"]),
+        "method": method,
+    }
+
+
+def competition_ratings(competition, include_playoffs: bool = False) -> dict:
+    """
+    OPR, component OPRs, DPR and CCWM of every team at a competition.
+
+    Args:
+        competition: Competition instance
+        include_playoffs: Also rate playoff matches
+
+    Returns:
+        dict with match_count and teams, a list of per-team dicts (team_id,
+        matches, opr, dpr, ccwm, components) ordered by OPR
+    """
+    ratings = solve_ratings(
+        load_alliance_arrays(competition, include_playoffs),
+        (competition.pk, include_playoffs),
+    )
+
+    teams = [
+        {
+            "team_id": team_id,
+            "matches": int(ratings["matches"][row]),
+            "opr": float(ratings["opr"]["total"][row]),
+            "dpr": float(ratings["dpr"][row]),
+            "ccwm": float(ratings["ccwm"][row]),
+            "components": {
+                component: float(values[row])
+                for component, values in ratings["opr"].items()
+                if component != "total"
+            },
+        }
+        for row, team_id in enumerate(ratings["teams"].tolist())
+    ]
+    teams.sort(key=lambda team: team["opr"], reverse=True)
+
+    logger.debug(
+        f"Rated {len(teams)} teams at {competition.code} from "
+        f"{ratings['match_count']} matches ({ratings['method']} solve)"
+    )
+    return {"match_count": ratings["match_count"], "teams": teams}
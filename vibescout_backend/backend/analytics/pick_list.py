@@ -0,0 +1,390 @@
+"""Alliance selection pick lists from a simulated serpentine draft"""
+
+import concurrent.futures
+import logging
+import math
+import os
+
+import numpy as np
+
+from .match_predictor import team_distributions
+from .opr import COMPONENTS, load_alliance_arrays, solve_ratings
+
+logger = logging.getLogger(__name__)
+
+# Playoff alliances and picks per captain
+ALLIANCE_COUNT = 8
+PICKS_PER_ALLIANCE = 2
+
+# Teleop scoring shares the field's game pieces, so an alliance's teleop
+# points saturate at this multiple of the best alliance teleop score seen;
+# auto and endgame points add up robot by robot
+TELEOP_CAPACITY_FACTOR = 1.5
+
+# Below this many first-pick candidates the process pool costs more than it saves
+PARALLEL_THRESHOLD = 24
+
+
+def pick_list_workers() -> int:
+    """
+    Worker processes for a pick list (PICK_LIST_WORKERS, default: 1).
+
+    Requests run in-process by default so a web worker never forks a pool;
+    0 uses every CPU.
+    """
+    return max(int(os.getenv("PICK_LIST_WORKERS", "1")) or os.cpu_count() or 1, 1)
+
+
+def build_draft(competition, exclude=()) -> dict:
+    """
+    Team ratings and draft order of a competition's alliance selection.
+
+    Captains are the top ranked teams (by OPR when fewer teams have an
+    official rank). Every other team at the competition can be picked unless
+    its id is in exclude (declined invitations or teams already picked).
+
+    Args:
+        competition: Competition instance
+        exclude: Team ids that cannot be picked
+
+    Returns:
+        dict with team_ids, the per-team arrays base (auto, endgame and
+        other OPR), teleop (teleop OPR) and floor (lowest value a team can
+        add to an alliance), capacity, sigma (SD of an alliance score),
+        captains (team positions in seed order) and pool (pickable positions)
+    """
+    from backend.models import TeamInfo
+
+    infos = list(
+        TeamInfo.objects.filter(competition=competition).values_list("team_id", "rank")
+    )
+    team_ids = np.array(sorted(team_id for team_id, _ in infos), dtype=np.int64)
+
+    arrays = load_alliance_arrays(competition)
+    ratings = solve_ratings(arrays, (competition.pk, False))
+    distributions = team_distributions(competition)
+
+    components = {name: np.zeros(len(team_ids)) for name in COMPONENTS}
+    rated = np.isin(team_ids, ratings["teams"])
+    rows = np.searchsorted(ratings["teams"], team_ids[rated])
+    for name, values in ratings["opr"].items():
+        components[name][rated] = values[rows]
+
+    other = (
+        components["total"]
+        - components["auto"]
+        - components["teleop"]
+        - components["endgame"]
+    )
+    base = components["auto"] + components["endgame"] + other
+    teleop = components["teleop"]
+
+    teleop_column = list(COMPONENTS).index("teleop")
+    best_teleop = float(arrays["scores"][:, :, teleop_column].max(initial=0))
+    sd = distributions["sd"]
+    robot_sd = float(np.median(sd)) if len(sd) else distributions["default_sd"]
+
+    # Officially ranked teams first, the rest by OPR
+    ranks = dict(infos)
+    opr = components["total"]
+    ranked = sorted(
+        range(len(team_ids)),
+        key=lambda row: (
+            not ranks[int(team_ids[row])],
+            ranks[int(team_ids[row])] or 0,
+            -opr[row],
+        ),
+    )
+    alliances = min(ALLIANCE_COUNT, len(team_ids) // (PICKS_PER_ALLIANCE + 1))
+    captains = ranked[:alliances]
+    excluded = set(exclude)
+    pool = [
+        row
+        for row in range(len(team_ids))
+        if row not in captains and int(team_ids[row]) not in excluded
+    ]
+
+    return {
+        "team_ids": team_ids,
+        "base": base,
+        "teleop": teleop,
+        # Teleop points can only add up to the capacity, and at most their OPR
+        "floor": base + np.minimum(teleop, 0),
+        "capacity": TELEOP_CAPACITY_FACTOR * best_teleop,
+        "sigma": max(robot_sd * math.sqrt(3), 1.0),
+        "captains": captains,
+        "pool": pool,
+    }
+
+
+def _alliance_scorer(draft: dict):
+    """
+    Memoized expected score of a (partial) alliance.
+
+    Returns:
+        (value, memo) where value takes a sorted tuple of team positions
+    """
+    base = draft["base"]
+    teleop = draft["teleop"]
+    capacity = draft["capacity"]
+    memo = {}
+
+    def value(members: tuple) -> float:
+        score = memo.get(members)
+        if score is None:
+            teleop_points = float(sum(teleop[m] for m in members))
+            if capacity > 0 and teleop_points > 0:
+                teleop_points = capacity * -math.expm1(-teleop_points / capacity)
+            score = memo[members] = float(sum(base[m] for m in members)) + teleop_points
+        return score
+
+    return value, memo
+
+
+def _join(alliance: list, team: int) -> tuple:
+    return tuple(sorted(alliance + [team]))
+
+
+def _win_probability(ours: float, theirs: float, sigma: float) -> float:
+    """Probability an alliance outscores another, both with score SD sigma"""
+    return 0.5 * (1 + math.erf((ours - theirs) / (2 * sigma)))
+
+
+def _greedy_pick(alliance: list, pool: list, value) -> int:
+    """The team a captain is expected to pick: the best addition to its alliance"""
+    return max(pool, key=lambda team: (value(_join(alliance, team)), -team))
+
+
+def _search_first_picks(draft: dict, seed: int, first_picks: list) -> dict:
+    """
+    Play the draft out for each of our possible first picks.
+
+    Other captains pick the team that adds the most to their own alliance.
+    For our second pick every team left at our turn is a candidate, tried
+    best-first; the rest are pruned once even the most favorable outcome
+    they allow (captains still to pick getting the worst team they could
+    be left with) can no longer beat the best plan found.
+
+    Module level so process pool workers can run it.
+
+    Returns:
+        dict with plans (one per first pick), evaluated and pruned second
+        picks, and memoized alliance scores
+    """
+    value, memo = _alliance_scorer(draft)
+    captains = draft["captains"]
+    sigma = draft["sigma"]
+    least_added = min(0.0, float(draft["floor"][draft["pool"]].min(initial=0)))
+    evaluated = pruned = 0
+    plans = []
+
+    def objective(ours: float, others: list) -> float:
+        return sum(_win_probability(ours, v, sigma) for v in others) / max(len(others), 1)
+
+    for first_pick in first_picks:
+        pool = [team for team in draft["pool"] if team != first_pick]
+        alliances = [[captain] for captain in captains]
+
+        def pick(index):
+            if pool:
+                team = _greedy_pick(alliances[index], pool, value)
+                alliances[index].append(team)
+                pool.remove(team)
+
+        for index in range(seed):
+            pick(index)
+        alliances[seed].append(first_pick)
+        for index in range(seed + 1, len(captains)):
+            pick(index)
+        for index in range(len(captains) - 1, seed, -1):
+            pick(index)
+
+        # Captains ahead of us still to make their second pick
+        pending = list(range(seed - 1, -1, -1))
+        settled = [
+            value(tuple(sorted(alliances[index])))
+            for index in range(len(captains))
+            if index > seed
+        ]
+        available = list(pool)
+        # Whatever we take, the captain p-th in line still picks at least its
+        # (p + 2)-th best option, as only p + 1 teams go before its turn
+        floors = []
+        for position, index in enumerate(pending):
+            options = sorted(
+                (value(_join(alliances[index], team)) for team in available),
+                reverse=True,
+            )
+            floors.append(
+                options[position + 1]
+                if position + 1 < len(options)
+                else value(tuple(sorted(alliances[index]))) + least_added
+            )
+        candidates = sorted(
+            available, key=lambda team: -value(_join(alliances[seed], team))
+        )
+
+        best = None
+        for position, second_pick in enumerate(candidates):
+            ours = value(_join(alliances[seed], second_pick))
+            if best and objective(ours, settled + floors) <= best["win_probability"]:
+                pruned += len(candidates) - position
+                break
+            evaluated += 1
+
+            final = [list(alliance) for alliance in alliances]
+            final[seed].append(second_pick)
+            remaining = [team for team in available if team != second_pick]
+            for index in pending[: len(remaining)]:
+                team = _greedy_pick(final[index], remaining, value)
+                final[index].append(team)
+                remaining.remove(team)
+
+            others = [
+                value(tuple(sorted(alliance)))
+                for index, alliance in enumerate(final)
+                if index != seed
+            ]
+            win_probability = objective(ours, others)
+            if best is None or win_probability > best["win_probability"]:
+                best = {
+                    "first_pick": first_pick,
+                    "second_pick": second_pick,
+                    "alliance_score": ours,
+                    "win_probability": win_probability,
+                    "alliances": final,
+                    "available_at_second_pick": available,
+                }
+
+        if best is None:  # Too few teams left for a second pick
+            ours = value(tuple(sorted(alliances[seed])))
+            best = {
+                "first_pick": first_pick,
+                "second_pick": None,
+                "alliance_score": ours,
+                "win_probability": objective(
+                    ours,
+                    [value(tuple(sorted(a))) for i, a in enumerate(alliances) if i != seed],
+                ),
+                "alliances": alliances,
+                "available_at_second_pick": [],
+            }
+        plans.append(best)
+
+    return {
+        "plans": plans,
+        "evaluated": evaluated,
+        "pruned": pruned,
+        "memoized": len(memo),
+    }
+
+
+def build_pick_list(competition, team_id: int, exclude=(), workers: int = None) -> dict:
+    """
+    Recommend a captain's first and second picks.
+
+    Alliances are scored from OPR components: auto, endgame and other
+    points add up robot by robot, while teleop points saturate at the
+    field's game piece capacity, so a strong climber complements a strong
+    scorer better than another scorer does. A plan's value is its
+    alliance's average win probability against the other alliances, with
+    alliance score spreads from the match predictor. The serpentine draft
+    (captains 1-8, then 8-1) is simulated for every first pick with the
+    other captains taking their best addition; captains are not picked.
+
+    Args:
+        competition: Competition instance
+        team_id: Team id of the captain to plan for
+        exclude: Team ids that cannot be picked
+        workers: Worker processes (default: pick_list_workers())
+
+    Returns:
+        dict with seed, captains, first_picks (plans ordered by win
+        probability), second_picks (candidates for the best first pick),
+        alliances (projected by the best plan) and search statistics
+
+    Raises:
+        ValueError: If the team is not an alliance captain
+    """
+    draft = build_draft(competition, exclude)
+    team_ids = draft["team_ids"]
+    captains = draft["captains"]
+    row = int(np.searchsorted(team_ids, team_id))
+    if row >= len(team_ids) or team_ids[row] != team_id or row not in captains:
+        raise ValueError("Team is not an alliance captain")
+    seed = captains.index(row)
+
+    first_picks = list(draft["pool"])
+    workers = min(workers or pick_list_workers(), max(len(first_picks), 1))
+    if len(first_picks) < PARALLEL_THRESHOLD:
+        workers = 1
+    if workers > 1:
+        chunks = [first_picks[start::workers] for start in range(workers)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _search_first_picks, [draft] * workers, [seed] * workers, chunks
+                )
+            )
+    else:
+        results = [_search_first_picks(draft, seed, first_picks)]
+
+    plans = sorted(
+        (plan for result in results for plan in result["plans"]),
+        key=lambda plan: (-plan["win_probability"], plan["first_pick"]),
+    )
+    if not plans:
+        raise ValueError("No teams left to pick")
+
+    # Teams the captains ahead of us are expected to take in round one
+    value, _ = _alliance_scorer(draft)
+    pool = list(draft["pool"])
+    taken_before = set()
+    for index in range(seed):
+        team = _greedy_pick([captains[index]], pool, value)
+        pool.remove(team)
+        taken_before.add(team)
+
+    best = plans[0]
+    ours = [captains[seed], best["first_pick"]]
+    available = set(best["available_at_second_pick"])
+    second_picks = sorted(
+        (team for team in draft["pool"] if team != best["first_pick"]),
+        key=lambda team: (-value(_join(ours, team)), team),
+    )
+
+    def team_id_of(position):
+        return None if position is None else int(team_ids[position])
+
+    logger.debug(
+        f"Pick list for team {team_id} (seed {seed + 1}) at {competition.code}: "
+        f"{len(plans)} first picks on {workers} worker(s)"
+    )
+    return {
+        "seed": seed + 1,
+        "captains": [team_id_of(captain) for captain in captains],
+        "first_picks": [
+            {
+                "team_id": team_id_of(plan["first_pick"]),
+                "win_probability": round(plan["win_probability"], 4),
+                "alliance_score": round(plan["alliance_score"], 1),
+                "expected_second_pick": team_id_of(plan["second_pick"]),
+                "likely_available": plan["first_pick"] not in taken_before,
+            }
+            for plan in plans
+        ],
+        "second_picks": [
+            {
+                "team_id": team_id_of(team),
+                "alliance_score": round(value(_join(ours, team)), 1),
+                "likely_available": team in available,
+            }
+            for team in second_picks
+        ],
+        "alliances": [
+            [team_id_of(team) for team in alliance] for alliance in best["alliances"]
+        ],
+        "evaluated": sum(result["evaluated"] for result in results),
+        "pruned": sum(result["pruned"] for result in results),
+        "memoized": sum(result["memoized"] for result in results),
+    }
@@ -0,0 +1,288 @@
+"""Projected final qualification ranks from simulating the remaining schedule"""
+
+import concurrent.futures
+import hashlib
+import logging
+import os
+
+import numpy as np
+from django.core.cache import cache
+
+from .match_predictor import (
+    MATCH_TEAM_FIELDS,
+    TIE_RANKING_POINTS,
+    WIN_RANKING_POINTS,
+    robot_parameters,
+    sample_scores,
+    team_distributions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Simulated events per event count
+DEFAULT_SIMULATIONS = 10000
+MAX_SIMULATIONS = 100000
+
+# Simulated events per task; every chunk has its own random stream, so
+# results do not depend on how many workers ran them
+CHUNK_SIMULATIONS = 500
+
+# Below this many simulated events the process pool costs more than it saves
+PARALLEL_THRESHOLD = 2000
+
+# Ranks that captain a playoff alliance
+CAPTAIN_RANKS = 8
+
+# Projections are keyed by the schedule and results, so they only expire to
+# free memory
+PROJECTION_CACHE_SECONDS = 3600
+
+
+def projection_workers() -> int:
+    """
+    Worker processes for a projection (RANK_PROJECTION_WORKERS, default: 1).
+
+    Requests run in-process by default so a web worker never forks a pool;
+    0 uses every CPU.
+    """
+    return max(int(os.getenv("RANK_PROJECTION_WORKERS", "1")) or os.cpu_count() or 1, 1)
+
+
+def load_qualification_schedule(competition) -> dict:
+    """
+    Load a competition's qualification schedule as arrays.
+
+    One query.
+
+    Args:
+        competition: Competition instance
+
+    Returns:
+        dict with int64 arrays team_ids (matches, 2, 3), scores (matches, 2),
+        ranking_points (matches, 2) and played (matches,) bool; alliance 0
+        is blue
+    """
+    from backend.models import Match
+
+    columns = MATCH_TEAM_FIELDS + [
+        "blue_total_score",
+        "red_total_score",
+        "blue_ranking_points",
+        "red_ranking_points",
+        "has_played",
+    ]
+    rows = list(
+        Match.objects.filter(competition=competition, match_type="qualification")
+        .order_by("pk")
+        .values_list(*columns)
+    )
+    data = np.array(rows, dtype=np.int64).reshape(len(rows), len(columns))
+
+    return {
+        "team_ids": data[:, :6].reshape(len(rows), 2, 3),
+        "scores": data[:, 6:8],
+        "ranking_points": data[:, 8:10],
+        "played": data[:, 10].astype(bool),
+    }
+
+
+def result_ranking_points(scores: np.ndarray) -> np.ndarray:
+    """
+    Match result ranking points of each alliance.
+
+    Args:
+        scores: (..., 2) array of blue and red scores
+
+    Returns:
+        int array shaped like scores
+    """
+    margin = scores - scores[..., ::-1]
+    return np.where(
+        margin > 0, WIN_RANKING_POINTS, np.where(margin == 0, TIE_RANKING_POINTS, 0)
+    )
+
+
+def _alliance_matrix(team_ids: np.ndarray, teams: np.ndarray) -> np.ndarray:
+    """Dense (2 * matches, teams) 0/1 matrix of the teams on each alliance"""
+    columns = np.searchsorted(teams, team_ids.reshape(-1, 3))
+    matrix = np.zeros((len(columns), len(teams)))
+    np.put_along_axis(matrix, columns, 1.0, axis=1)
+    return matrix
+
+
+def _simulate_chunk(problem: dict, seed, simulations: int):
+    """
+    Play the remaining schedule out a number of times and rank every event.
+
+    Module level so process pool workers can run it.
+
+    Returns:
+        (counts, ranking_points) with counts[team, rank] the events a team
+        finished at that rank (0 is first) and the summed final ranking
+        points of every team
+    """
+    rng = np.random.default_rng(seed)
+    base_points = problem["base_ranking_points"]
+    base_scores = problem["base_scores"]
+    scheduled = problem["scheduled"]
+    matrix = problem["matrix"]
+    team_count = len(base_points)
+
+    scores = sample_scores(problem["mean"], problem["sd"], simulations, rng)
+    flat_scores = scores.reshape(simulations, -1).astype(np.float64)
+    points = base_points + result_ranking_points(scores).reshape(simulations, -1) @ matrix
+    match_points = base_scores + flat_scores @ matrix
+
+    # Ranking score (average RP), then average match points, then at random
+    order = np.lexsort(
+        (
+            rng.random((simulations, team_count)),
+            -match_points / scheduled,
+            -points / scheduled,
+        ),
+        axis=-1,
+    )
+    ranks = np.empty_like(order)
+    np.put_along_axis(
+        ranks, order, np.broadcast_to(np.arange(team_count), order.shape), axis=1
+    )
+
+    counts = np.bincount(
+        (np.arange(team_count) * team_count + ranks).ravel(),
+        minlength=team_count * team_count,
+    ).reshape(team_count, team_count)
+    return counts, points.sum(axis=0)
+
+
+def _rank_percentiles(probabilities: np.ndarray, percentiles) -> list:
+    """Ranks (1-based) at the given percentiles of a rank distribution"""
+    cumulative = np.cumsum(probabilities)
+    return [
+        int(np.searchsorted(cumulative, p / 100 - 1e-9) + 1) for p in percentiles
+    ]
+
+
+def project_ranks(
+    competition, simulations: int = DEFAULT_SIMULATIONS, workers: int = None
+) -> dict:
+    """
+    Project final qualification ranks with a Monte Carlo simulation.
+
+    Played matches count with their posted ranking points (or their match
+    result when none were posted); every unplayed qualification match is
+    simulated with the match predictor's team distributions and earns match
+    result ranking points. Teams are ranked by average ranking points, then
+    average match points, then at random; bonus ranking points of unplayed
+    matches and the later official tiebreakers are not simulated.
+
+    Simulations run in chunks of CHUNK_SIMULATIONS, each with its own random
+    stream spawned from a seed of the schedule and results, so a projection
+    is reproducible and split over a process pool when large enough. As
+    matches complete only the shrinking remainder of the schedule is
+    simulated, and projections are cached until a result or the schedule
+    changes.
+
+    Args:
+        competition: Competition instance
+        simulations: Simulated events
+        workers: Worker processes (default: projection_workers())
+
+    Returns:
+        dict with simulations, played_matches, remaining_matches,
+        data_version and teams, a list of per-team dicts (team_id,
+        scheduled_matches, current_ranking_points, expected_ranking_points,
+        mean_rank, rank_range, captain_probability, rank_probabilities)
+        ordered by mean rank
+    """
+    schedule = load_qualification_schedule(competition)
+    distributions = team_distributions(competition)
+    digest = hashlib.sha1(distributions["version"].encode())
+    for values in schedule.values():
+        digest.update(values.tobytes())
+    version = digest.hexdigest()[:16]
+
+    key = f"rank_projection:{competition.pk}:{version}:{simulations}"
+    projection = cache.get(key)
+    if projection is not None:
+        return projection
+
+    played = schedule["played"]
+    team_ids = schedule["team_ids"]
+    teams = np.unique(team_ids)
+    team_count = len(teams)
+
+    # Standings from played matches; results without posted ranking points
+    # (e.g. generated data) earn their match result points
+    ranking_points = schedule["ranking_points"][played]
+    if not ranking_points.any():
+        ranking_points = result_ranking_points(schedule["scores"][played])
+    played_matrix = _alliance_matrix(team_ids[played], teams)
+    base_ranking_points = ranking_points.reshape(-1) @ played_matrix
+    base_scores = schedule["scores"][played].reshape(-1) @ played_matrix
+
+    remaining = team_ids[~played]
+    mean, sd = robot_parameters(distributions, remaining)
+    problem = {
+        "mean": mean,
+        "sd": sd,
+        "matrix": _alliance_matrix(remaining, teams),
+        "base_ranking_points": base_ranking_points,
+        "base_scores": base_scores,
+        "scheduled": np.maximum(
+            np.bincount(np.searchsorted(teams, team_ids.ravel()), minlength=team_count),
+            1,
+        ),
+    }
+
+    sizes = [CHUNK_SIMULATIONS] * (simulations // CHUNK_SIMULATIONS)
+    if simulations % CHUNK_SIMULATIONS:
+        sizes.append(simulations % CHUNK_SIMULATIONS)
+    seeds = np.random.SeedSequence(int(version, 16)).spawn(len(sizes))
+
+    workers = min(workers or projection_workers(), len(sizes))
+    if simulations < PARALLEL_THRESHOLD or not len(remaining):
+        workers = 1
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(_simulate_chunk, [problem] * len(sizes), seeds, sizes)
+            )
+    else:
+        results = [_simulate_chunk(problem, s, n) for s, n in zip(seeds, sizes)]
+
+    counts = sum(result[0] for result in results)
+    total_points = sum(result[1] for result in results)
+
+    probabilities = counts / simulations
+    mean_rank = probabilities @ np.arange(1, team_count + 1)
+    team_rows = [
+        {
+            "team_id": team_id,
+            "scheduled_matches": int(problem["scheduled"][row]),
+            "current_ranking_points": float(base_ranking_points[row]),
+            "expected_ranking_points": round(float(total_points[row] / simulations), 2),
+            "mean_rank": round(float(mean_rank[row]), 2),
+            "rank_range": _rank_percentiles(probabilities[row], (10, 50, 90)),
+            "captain_probability": round(
+                float(probabilities[row, :CAPTAIN_RANKS].sum()), 4
+            ),
+            "rank_probabilities": [round(float(p), 4) for p in probabilities[row]],
+        }
+        for row, team_id in enumerate(teams.tolist())
+    ]
+    team_rows.sort(key=lambda team: team["mean_rank"])
+
+    projection = {
+        "simulations": simulations,
+        "played_matches": int(played.sum()),
+        "remaining_matches": len(remaining),
+        "data_version": version,
+        "teams": team_rows,
+    }
+    cache.set(key, projection, PROJECTION_CACHE_SECONDS)
+
+    logger.debug(
+        f"Projected ranks at {competition.code}: {simulations} events over "
+        f"{len(remaining)} remaining matches on {workers} worker(s)"
+    )
+    return projection
@@ -0,0 +1,403 @@
+"""Per-team running aggregates updated match by match"""
+
+import logging
+import math
+from decimal import Decimal
+
+from django.db import transaction
+
+from .scoring import CLIMB_POINTS, SLOTS, STAT_FIELDS, slot_team_field
+
+logger = logging.getLogger(__name__)
+
+# Metrics of a slot's stats contribution, in order after the team id
+METRICS = ["fuel", "auto_fuel", "climb_points"]
+
+# TeamRunningStats columns holding the aggregates
+RUNNING_FIELDS = ["match_count"] + [
+    f"{metric}_{part}" for metric in METRICS for part in ("sum", "m2")
+]
+
+# Largest difference from a full recompute that is treated as rounding
+DRIFT_TOLERANCE = 1e-6
+
+
+def match_contribution(match) -> list:
+    """
+    What a match adds to its teams' running stats.
+
+    Args:
+        match: Match instance
+
+    Returns:
+        list of [team_id, fuel, auto_fuel, climb_points] per slot in SLOTS
+        order, or an empty list when the match has not been played
+    """
+    if not match.has_played:
+        return []
+    return [
+        [
+            getattr(match, slot_team_field(slot)),
+            getattr(match, f"{slot}_fuel_scored"),
+            getattr(match, f"{slot}_auto_fuel"),
+            CLIMB_POINTS.get(getattr(match, f"{slot}_climb"), 0),
+        ]
+        for slot in SLOTS
+    ]
+
+
+def welford_add(count: int, total: int, m2: float, value: int) -> tuple:
+    """(sum, M2) of ``count`` values with the given sum and M2 after adding value"""
+    mean = total / count if count else value
+    total += value
+    return total, m2 + (value - mean) * (value - total / (count + 1))
+
+
+def welford_remove(count: int, total: int, m2: float, value: int) -> tuple:
+    """(sum, M2) of ``count`` values with the given sum and M2 after removing value"""
+    if count <= 1:
+        return 0, 0.0
+    mean = total / count
+    total -= value
+    # Rounding can leave a tiny negative M2 behind
+    return total, max(m2 - (value - mean) * (value - total / (count - 1)), 0.0)
+
+
+def _apply_slot(stats, values, remove: bool) -> None:
+    step = welford_remove if remove else welford_add
+    for metric, value in zip(METRICS, values):
+        total, m2 = step(
+            stats.match_count,
+            getattr(stats, f"{metric}_sum"),
+            getattr(stats, f"{metric}_m2"),
+            value,
+        )
+        setattr(stats, f"{metric}_sum", total)
+        setattr(stats, f"{metric}_m2", m2)
+    stats.match_count = max(stats.match_count + (-1 if remove else 1), 0)
+
+
+def running_team_stats(stats) -> dict:
+    """
+    STAT_FIELDS from a TeamRunningStats row, defined as in compute_team_stats.
+
+    Returns:
+        dict mapping STAT_FIELDS to floats (all 0 for a team without matches)
+    """
+    count = stats.match_count
+    if not count:
+        return {field: 0.0 for field in STAT_FIELDS}
+
+    mean = {metric: getattr(stats, f"{metric}_sum") / count for metric in METRICS}
+    sd = {
+        metric: math.sqrt(getattr(stats, f"{metric}_m2") / (count - 1))
+        if count > 1
+        else 0.0
+        for metric in METRICS
+    }
+
+    # Consistency 0-100 from the coefficient of variation of fuel scored
+    consistency = 100.0
+    if count > 1 and mean["fuel"] > 0:
+        consistency = min(max(100 - sd["fuel"] / mean["fuel"] * 100, 0.0), 100.0)
+
+    return {
+        "avg_fuel_scored": mean["fuel"],
+        "avg_auto_fuel": mean["auto_fuel"],
+        "avg_climb_points": mean["climb_points"],
+        "avg_fuel_sd": sd["fuel"],
+        "avg_auto_fuel_sd": sd["auto_fuel"],
+        "avg_climb_points_sd": sd["climb_points"],
+        "avg_points_contributed": mean["fuel"],
+        "consistency_rating": consistency,
+    }
+
+
+def _set_moments(stats, moments) -> None:
+    """Set a TeamRunningStats row to compute_team_moments values (None: no matches)"""
+    stats.match_count = moments["count"] if moments else 0
+    for metric in METRICS:
+        total, m2 = moments[metric] if moments else (0, 0.0)
+        setattr(stats, f"{metric}_sum", total)
+        setattr(stats, f"{metric}_m2", m2)
+
+
+def seed_running_stats(competition_id: int, team_infos: list) -> set:
+    """
+    Create the running stats of teams that have none from their played matches.
+
+    The aggregates are computed from scratch with compute_team_moments, so
+    match changes applied later start from the team's whole history rather
+    than from the match that happened to create the row. The teams' TeamInfo
+    stats are set from the seeded aggregates.
+
+    Args:
+        competition_id: Primary key of the teams' competition
+        team_infos: TeamInfo instances without TeamRunningStats
+
+    Returns:
+        set of the seeded team ids
+    """
+    from backend.models import TeamInfo, TeamRunningStats
+
+    from .team_stats import compute_team_moments, load_match_arrays
+
+    if not team_infos:
+        return set()
+
+    moments = compute_team_moments(
+        load_match_arrays(competition_id), [info.team_id for info in team_infos]
+    )
+    seeded = []
+    for team_info in team_infos:
+        stats = TeamRunningStats(team_info=team_info)
+        _set_moments(stats, moments.get(team_info.team_id))
+        seeded.append(stats)
+        for field, value in running_team_stats(stats).items():
+            setattr(team_info, field, Decimal(f"{value:.2f}"))
+
+    # A concurrent writer may have seeded the same team from the same matches
+    TeamRunningStats.objects.bulk_create(seeded, ignore_conflicts=True)
+    TeamInfo.objects.bulk_update(team_infos, STAT_FIELDS)
+    return {info.team_id for info in team_infos}
+
+
+def create_team_infos(competition_id: int, team_ids) -> dict:
+    """
+    TeamInfo rows of teams at a competition, creating the missing ones.
+
+    Created teams get running stats seeded from the matches already stored
+    (see seed_running_stats). Every code path that registers teams goes
+    through here, so no team's running stats start part way through its
+    matches.
+
+    Args:
+        competition_id: Primary key of the competition
+        team_ids: Team primary keys
+
+    Returns:
+        dict mapping team id to TeamInfo for every given team
+    """
+    from backend.models import TeamInfo
+
+    team_ids = set(team_ids)
+    team_infos = {
+        info.team_id: info
+        for info in TeamInfo.objects.filter(
+            competition_id=competition_id, team_id__in=team_ids
+        )
+    }
+    missing = team_ids - team_infos.keys()
+    if missing:
+        # Ignoring conflicts keeps concurrent registrations of a team safe
+        TeamInfo.objects.bulk_create(
+            [
+                TeamInfo(team_id=team_id, competition_id=competition_id)
+                for team_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        created = list(
+            TeamInfo.objects.filter(
+                competition_id=competition_id,
+                team_id__in=missing,
+                running_stats__isnull=True,
+            )
+        )
+        seed_running_stats(competition_id, created)
+        team_infos.update(
+            (info.team_id, info)
+            for info in TeamInfo.objects.filter(
+                competition_id=competition_id, team_id__in=missing
+            )
+        )
+    return team_infos
+
+
+def apply_contributions(competition_id: int, changes: list) -> dict:
+    """
+    Move match contributions into or out of the teams' running stats.
+
+    Each change is an (old, new) pair of match_contribution lists. The old
+    contribution is subtracted before the new one is added, so a corrected
+    result replaces the stale one; a new match passes an empty old list and
+    a deleted match an empty new list. Only the teams in the changes are
+    read and written, with a fixed number of queries for any batch size.
+    Call inside the transaction that writes the matches, after writing them:
+    teams without running stats (or not registered at the competition yet)
+    are seeded from the stored matches, which already include the changes.
+
+    Args:
+        competition_id: Primary key of the matches' competition
+        changes: list of (old, new) contribution pairs
+
+    Returns:
+        dict with the number of teams updated
+    """
+    from backend.models import TeamInfo, TeamRunningStats
+
+    team_ids = {slot[0] for old, new in changes for slot in old + new}
+    if not team_ids:
+        return {"teams": 0}
+
+    team_infos = {
+        info.team_id: info
+        for info in TeamInfo.objects.filter(
+            competition_id=competition_id, team_id__in=team_ids
+        ).only("id", "team_id", *STAT_FIELDS)
+    }
+    missing = team_ids - team_infos.keys()
+    if missing:
+        team_infos.update(create_team_infos(competition_id, missing))
+    # Lock the rows so concurrent match writes apply their changes one at a time
+    running = {
+        stats.team_info_id: stats
+        for stats in TeamRunningStats.objects.select_for_update().filter(
+            team_info__in=list(team_infos.values())
+        )
+    }
+    # Seeded rows already count these changes
+    seeded = missing | seed_running_stats(
+        competition_id,
+        [info for info in team_infos.values() if info.pk not in running],
+    )
+    infos_by_pk = {info.pk: info for info in team_infos.values()}
+    running = {
+        pk: stats
+        for pk, stats in running.items()
+        if infos_by_pk[pk].team_id not in seeded
+    }
+
+    for old, new in changes:
+        for remove, contribution in ((True, old), (False, new)):
+            for team_id, *values in contribution:
+                if team_id not in seeded:
+                    _apply_slot(running[team_infos[team_id].pk], values, remove)
+
+    changed_infos = []
+    for stats in running.values():
+        team_info = infos_by_pk[stats.team_info_id]
+        values = {
+            field: Decimal(f"{value:.2f}")
+            for field, value in running_team_stats(stats).items()
+        }
+        if any(getattr(team_info, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(team_info, field, value)
+            changed_infos.append(team_info)
+
+    if running:
+        TeamRunningStats.objects.bulk_update(running.values(), RUNNING_FIELDS)
+    if changed_infos:
+        TeamInfo.objects.bulk_update(changed_infos, STAT_FIELDS)
+
+    return {"teams": len(running) + len(seeded)}
+
+
+def verify_running_stats(competition, tolerance: float = DRIFT_TOLERANCE) -> dict:
+    """
+    Check the running stats of a competition against a full recompute.
+
+    Recomputes every team's count, sums and M2 from the played matches and
+    every match's expected contribution. Aggregates that drifted by more
+    than ``tolerance`` (M2 relative to its size) and stale contributions
+    are overwritten with the recomputed values, and TeamInfo stats are
+    refreshed by update_team_stats.
+
+    Args:
+        competition: Competition instance
+        tolerance: Largest difference accepted as rounding
+
+    Returns:
+        dict with teams, drift (largest difference found), repaired_teams,
+        initialized_teams (no running stats yet), repaired_contributions and
+        the update_team_stats counts
+    """
+    import numpy as np
+
+    from backend.models import Match, TeamInfo, TeamRunningStats
+
+    from .team_stats import compute_team_moments, load_match_arrays, update_team_stats
+
+    with transaction.atomic():
+        # Locked first, so match writes waiting on these rows apply their
+        # changes on top of the repaired values
+        running = {
+            stats.team_info_id: stats
+            for stats in TeamRunningStats.objects.select_for_update().filter(
+                team_info__competition=competition
+            )
+        }
+        arrays = load_match_arrays(competition)
+        team_infos = list(
+            TeamInfo.objects.filter(competition=competition).only("id", "team_id")
+        )
+        moments = compute_team_moments(arrays, [info.team_id for info in team_infos])
+
+        drift = 0.0
+        repaired = []
+        created = []
+        for team_info in team_infos:
+            expected = moments.get(team_info.team_id) or {
+                "count": 0,
+                **{metric: (0, 0.0) for metric in METRICS},
+            }
+            stats = running.get(team_info.pk)
+            if stats is None:
+                stats = TeamRunningStats(team_info=team_info)
+                created.append(stats)
+            else:
+                differences = [abs(stats.match_count - expected["count"])]
+                for metric in METRICS:
+                    total, m2 = expected[metric]
+                    differences.append(abs(getattr(stats, f"{metric}_sum") - total))
+                    differences.append(
+                        abs(getattr(stats, f"{metric}_m2") - m2) / max(m2, 1.0)
+                    )
+                drift = max(drift, *differences)
+                if max(differences) <= tolerance:
+                    continue
+                repaired.append(stats)
+
+            _set_moments(stats, expected)
+
+        # (matches, 6 slots, 4) -> [team_id, fuel, auto_fuel, climb_points] per slot
+        contributions = dict(
+            zip(
+                arrays["match_ids"].tolist(),
+                np.stack(
+                    [arrays[name] for name in ["team_ids", *METRICS]], axis=2
+                ).tolist(),
+            )
+        )
+        stale = [
+            Match(pk=match_id, stats_contribution=contributions.get(match_id, []))
+            for match_id, stored in Match.objects.filter(
+                competition=competition
+            ).values_list("id", "stats_contribution")
+            if stored != contributions.get(match_id, [])
+        ]
+
+        if repaired:
+            TeamRunningStats.objects.bulk_update(repaired, RUNNING_FIELDS)
+        if created:
+            TeamRunningStats.objects.bulk_create(created)
+        if stale:
+            Match.objects.bulk_update(stale, ["stats_contribution"], batch_size=500)
+
+        team_stats = update_team_stats(competition)
+
+    if repaired or stale:
+        logger.warning(
+            f"Running stats for {competition.code} drifted by {drift:.3g}: "
+            f"repaired {len(repaired)} teams and {len(stale)} match contributions"
+        )
+
+    return {
+        "teams": len(team_infos),
+        "drift": drift,
+        "repaired_teams": len(repaired),
+        "initialized_teams": len(created),
+        "repaired_contributions": len(stale),
+        **team_stats,
+    }
@@ -0,0 +1,24 @@
+"""Per-slot scoring fields shared by the team stats engines"""
+
+# Alliance slots in the order the per-slot Match fields are loaded
+SLOTS = ["blue_1", "blue_2", "blue_3", "red_1", "red_2", "red_3"]
+
+CLIMB_POINTS = {"L1": 3, "L2": 6, "L3": 10}
+
+# TeamInfo fields written by the team stats engines
+STAT_FIELDS = [
+    "avg_fuel_scored",
+    "avg_auto_fuel",
+    "avg_climb_points",
+    "avg_fuel_sd",
+    "avg_auto_fuel_sd",
+    "avg_climb_points_sd",
+    "avg_points_contributed",
+    "consistency_rating",
+]
+
+
+def slot_team_field(slot: str) -> str:
+    # "blue_1" -> "blue_team_1_id"
+    alliance, position = slot.split("_")
+    return f"{alliance}_team_{position}_id"
@@ -0,0 +1,233 @@
+"""Per-team scoring statistics computed from a competition's played matches"""
+
+import logging
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Case, IntegerField, Value, When
+
+from .scoring import CLIMB_POINTS, SLOTS, STAT_FIELDS, slot_team_field
+
+logger = logging.getLogger(__name__)
+
+
+def load_match_arrays(competition) -> dict:
+    """
+    Load a competition's played matches as (matches x 6 slots) arrays.
+
+    One query; climb levels are converted to points in SQL so every column
+    is an integer.
+
+    Args:
+        competition: Competition instance
+
+    Returns:
+        dict of int64 arrays: match_ids shaped (matches,) and team_ids,
+        fuel, auto_fuel and climb_points, each shaped (matches, 6) in SLOTS order
+    """
+    from backend.models import Match
+
+    climb_points = {
+        f"{slot}_climb_points": Case(
+            *[
+                When(**{f"{slot}_climb": level}, then=Value(points))
+                for level, points in CLIMB_POINTS.items()
+            ],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for slot in SLOTS
+    }
+
+    columns = (
+        ["id"]
+        + [slot_team_field(slot) for slot in SLOTS]
+        + [f"{slot}_fuel_scored" for slot in SLOTS]
+        + [f"{slot}_auto_fuel" for slot in SLOTS]
+        + list(climb_points)
+    )
+    rows = list(
+        Match.objects.filter(competition=competition, has_played=True)
+        .annotate(**climb_points)
+        .values_list(*columns)
+    )
+    data = np.array(rows, dtype=np.int64).reshape(len(rows), len(columns))
+    slots = data[:, 1:].reshape(len(rows), 4, len(SLOTS))
+
+    return {
+        "match_ids": data[:, 0],
+        "team_ids": slots[:, 0],
+        "fuel": slots[:, 1],
+        "auto_fuel": slots[:, 2],
+        "climb_points": slots[:, 3],
+    }
+
+
+def _sum_and_m2(index: np.ndarray, values: np.ndarray, counts: np.ndarray):
+    """Per-team sum and M2 (sum of squared deviations) of the flattened values"""
+    values = values.ravel().astype(np.float64)
+    played = counts > 0
+    size = len(counts)
+
+    sums = np.bincount(index, weights=values, minlength=size)
+    mean = np.zeros(size)
+    mean[played] = sums[played] / counts[played]
+
+    # Two-pass variance: squared deviations from each team's own mean
+    m2 = np.bincount(index, weights=(values - mean[index]) ** 2, minlength=size)
+    return sums, mean, m2
+
+
+def _mean_and_sd(index: np.ndarray, values: np.ndarray, counts: np.ndarray):
+    """Per-team mean and sample standard deviation of the flattened values"""
+    _, mean, m2 = _sum_and_m2(index, values, counts)
+    sd = np.zeros(len(counts))
+    several = counts > 1
+    sd[several] = np.sqrt(m2[several] / (counts[several] - 1))
+    return mean, sd
+
+
+def _team_index(arrays: dict, team_ids):
+    """
+    Row of every slot's team in the sorted team_ids.
+
+    Teams not in team_ids go to an extra last row. Returns the sorted
+    team_ids, the flattened slot index and the per-row slot counts.
+    """
+    team_ids = np.unique(np.asarray(list(team_ids), dtype=np.int64))
+    slot_teams = arrays["team_ids"].ravel()
+
+    index = np.searchsorted(team_ids, slot_teams)
+    index[index >= len(team_ids)] = 0
+    known = team_ids[index] == slot_teams if len(team_ids) else np.zeros(0, bool)
+    index = np.where(known, index, len(team_ids))
+
+    return team_ids, index, np.bincount(index, minlength=len(team_ids) + 1)
+
+
+def compute_team_stats(arrays: dict, team_ids) -> dict:
+    """
+    Compute STAT_FIELDS for many teams in one vectorized pass.
+
+    Args:
+        arrays: Output of load_match_arrays
+        team_ids: Team primary keys to compute stats for
+
+    Returns:
+        dict mapping team id to a dict of STAT_FIELDS floats and "matches"
+        (teams without played matches are left out)
+    """
+    team_ids, index, counts = _team_index(arrays, team_ids)
+
+    fuel, fuel_sd = _mean_and_sd(index, arrays["fuel"], counts)
+    auto_fuel, auto_fuel_sd = _mean_and_sd(index, arrays["auto_fuel"], counts)
+    climb, climb_sd = _mean_and_sd(index, arrays["climb_points"], counts)
+
+    # Consistency 0-100 from the coefficient of variation of fuel scored
+    consistency = np.full(len(counts), 100.0)
+    varied = (counts > 1) & (fuel > 0)
+    consistency[varied] = np.clip(100 - fuel_sd[varied] / fuel[varied] * 100, 0, 100)
+
+    stats = {}
+    for row, team_id in enumerate(team_ids.tolist()):
+        if not counts[row]:
+            continue
+        stats[team_id] = {
+            "matches": int(counts[row]),
+            "avg_fuel_scored": fuel[row],
+            "avg_auto_fuel": auto_fuel[row],
+            "avg_climb_points": climb[row],
+            "avg_fuel_sd": fuel_sd[row],
+            "avg_auto_fuel_sd": auto_fuel_sd[row],
+            "avg_climb_points_sd": climb_sd[row],
+            "avg_points_contributed": fuel[row],
+            "consistency_rating": consistency[row],
+        }
+    return stats
+
+
+def compute_team_moments(arrays: dict, team_ids) -> dict:
+    """
+    Count, sum and M2 of every scoring metric per team, computed from scratch.
+
+    The reference the running aggregates in backend.analytics.running_stats
+    are checked against.
+
+    Args:
+        arrays: Output of load_match_arrays
+        team_ids: Team primary keys to compute moments for
+
+    Returns:
+        dict mapping team id to {"count": int, metric: (sum, m2)} for the
+        fuel, auto_fuel and climb_points metrics (teams without played
+        matches are left out)
+    """
+    team_ids, index, counts = _team_index(arrays, team_ids)
+    metrics = {
+        metric: _sum_and_m2(index, arrays[metric], counts)
+        for metric in ("fuel", "auto_fuel", "climb_points")
+    }
+
+    moments = {}
+    for row, team_id in enumerate(team_ids.tolist()):
+        if not counts[row]:
+            continue
+        moments[team_id] = {"count": int(counts[row])}
+        for metric, (sums, _, m2) in metrics.items():
+            moments[team_id][metric] = (int(round(sums[row])), float(m2[row]))
+    return moments
+
+
+def update_team_stats(competition) -> dict:
+    """
+    Recompute every team's stats at a competition and store the changes.
+
+    Loads the played matches and the TeamInfo rows with one query each and
+    writes the changed rows with a single bulk_update.
+
+    Args:
+        competition: Competition instance
+
+    Returns:
+        dict with matches, teams, updated and unchanged counts
+    """
+    from backend.models import TeamInfo
+
+    arrays = load_match_arrays(competition)
+    team_infos = list(
+        TeamInfo.objects.filter(competition=competition).only(
+            "id", "team_id", *STAT_FIELDS
+        )
+    )
+    stats = compute_team_stats(arrays, [info.team_id for info in team_infos])
+
+    changed = []
+    for team_info in team_infos:
+        team_stats = stats.get(team_info.team_id)
+        if team_stats is None:
+            continue
+
+        values = {
+            field: Decimal(f"{team_stats[field]:.2f}") for field in STAT_FIELDS
+        }
+        if all(getattr(team_info, field) == value for field, value in values.items()):
+            continue
+
+        for field, value in values.items():
+            setattr(team_info, field, value)
+        changed.append(team_info)
+
+    if changed:
+        TeamInfo.objects.bulk_update(changed, STAT_FIELDS)
+
+    logger.info(
+        f"Team stats for {competition.code}: {len(changed)} updated from "
+        f"{len(arrays['fuel'])} played matches"
+    )
+
+    return {
+        "matches": len(arrays["fuel"]),
+        "teams": len(stats),
+        "updated": len(changed),
+        "unchanged": len(stats) - len(changed),
+    }
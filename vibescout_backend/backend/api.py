@@ -6,21 +6,30 @@ from typing import List
 
 from django.conf import settings
 from django.core.serializers import serialize
-from django.http import FileResponse, Http404
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import NinjaAPI
 
 from .models import Competition, Match, RobotAction, Team, TeamInfo
 from .schemas import (
+    BatchRobotActionsResultSchema,
+    BatchRobotActionsSchema,
     BulkRobotActionsSchema,
     CompetitionSchema,
+    EpaRankingSchema,
+    MatchPredictionSchema,
     MatchSchema,
+    OprRankingSchema,
+    PickListSchema,
     PrescouttingUpdateSchema,
+    RankProjectionSchema,
     RobotActionCreateSchema,
     RobotActionSchema,
+    TeamActionSummarySchema,
     TeamInfoSchema,
     TeamInfoWithoutPictureSchema,
     TeamSchema,
+    TeamTimelinesSchema,
 )
 
 api = NinjaAPI()
@@ -63,6 +72,91 @@ def sync(request):
     return {"hash": db_hash}
 
 
+@api.post("/tba/webhook")
+def tba_webhook(request):
+    """
+    Receive push notifications from The Blue Alliance.
+
+    Configure the webhook URL as `https://<host>/api/tba/webhook` on the TBA account
+    page and set the same secret in the `TBA_WEBHOOK_SECRET` environment variable.
+
+    **Handled message types:**
+    - `match_score`: the match payload is imported directly
+    - `upcoming_match`: the match's predicted time is updated
+    - `schedule_updated`: a schedule sync task is queued
+    - `verification`: the verification key is written to the log
+
+    **Error Responses:**
+    - 400: Body is not valid JSON
+    - 401: Missing or invalid `X-TBA-HMAC` signature
+    - 503: `TBA_WEBHOOK_SECRET` is not configured
+    """
+    from ninja.errors import HttpError
+
+    from .utils.tba_webhooks import (
+        get_webhook_secret,
+        handle_webhook,
+        record_payload,
+        verify_signature,
+    )
+
+    secret = get_webhook_secret()
+    if not secret:
+        raise HttpError(503, "TBA webhooks are not configured")
+
+    body = request.body
+    if not verify_signature(body, request.headers.get("X-TBA-HMAC", ""), secret):
+        raise HttpError(401, "Invalid webhook signature")
+
+    record_payload(body)
+
+    try:
+        message = json.loads(body)
+    except ValueError:
+        raise HttpError(400, "Invalid JSON body")
+
+    return handle_webhook(message)
+
+
+@api.get("/tasks/coalescing")
+def task_coalescing_stats(request):
+    """
+    Duplicate background work avoided by task coalescing.
+
+    Video downloads are deduplicated per match and webhook schedule syncs are
+    debounced per competition; triggers that merge into a queued or running
+    execution count as suppressed.
+
+    **Response:**
+    - `requests`, `runs`, `suppressed` and `suppressed_ratio` over all tasks
+    - `tasks`: the same counters per task function, with the number of keys
+      and executions currently in flight
+    """
+    from .utils.task_coalescing import coalescing_stats
+
+    return coalescing_stats()
+
+
+@api.get("/tasks/queues")
+def task_queue_status(request):
+    """
+    Status of the background task queues.
+
+    Tasks run on named queues (`sync`, `video`, `analytics`) with their
+    own workers, timeout and retry policy; anything else runs on `default`.
+
+    **Response:** per queue
+    - `queued`: tasks waiting for a worker
+    - `running`: tasks a worker has pulled and not finished
+    - `oldest_queued_seconds`: how long the oldest waiting task has waited
+    - `workers`, `timeout`, `retry`: the queue's settings
+    - `tasks`: tasks routed to the queue
+    """
+    from .task_queues import queue_status
+
+    return queue_status()
+
+
 @api.get("/competitions", response=List[CompetitionSchema])
 def list_competitions(request):
     return Competition.objects.all()
@@ -355,6 +449,475 @@ def get_competition_matches_by_code(request, code: str):
     return [MatchSchema.from_orm(match) for match in matches]
 
 
+def _prediction_response(match, prediction: dict) -> dict:
+    return {
+        "match_number": match.match_number,
+        "match_type": match.match_type,
+        "has_played": match.has_played,
+        "blue_teams": [
+            match.blue_team_1.number,
+            match.blue_team_2.number,
+            match.blue_team_3.number,
+        ],
+        "red_teams": [
+            match.red_team_1.number,
+            match.red_team_2.number,
+            match.red_team_3.number,
+        ],
+        **prediction,
+    }
+
+
+def _validate_draws(draws: int) -> None:
+    from ninja.errors import HttpError
+
+    from .analytics.match_predictor import MAX_DRAWS
+
+    if not 100 <= draws <= MAX_DRAWS:
+        raise HttpError(400, f"draws must be between 100 and {MAX_DRAWS}")
+
+
+@api.get("/competitions/{code}/epa", response=EpaRankingSchema)
+def get_competition_epa(
+    request,
+    response: HttpResponse,
+    code: str,
+    sort: str = "total",
+    include_history: bool = False,
+):
+    """
+    Rank a competition's teams by expected points added (EPA).
+
+    EPA is updated after every played match: each robot takes a share of its
+    alliance's prediction error, at a learning rate that decays over the
+    season. Teams start from their rating at their previous event of the
+    season, pulled towards the season average.
+
+    **Query parameters:**
+    - `sort`: `total` (default), `auto`, `teleop` or `endgame`
+    - `include_history`: Also return every team's rating after each match
+
+    **Error Responses:**
+    - 400: Unknown sort
+    """
+    from ninja.errors import HttpError
+
+    from .analytics.epa import EPA_COMPONENTS, unpack_history
+    from .models import TeamEpa
+    from .utils.server_timing import ServerTiming
+
+    if sort not in EPA_COMPONENTS:
+        raise HttpError(400, f"sort must be one of: {', '.join(EPA_COMPONENTS)}")
+
+    competition = get_object_or_404(Competition, code=code)
+
+    with ServerTiming() as timing:
+        ratings = list(
+            TeamEpa.objects.filter(team_info__competition=competition)
+            .select_related("team_info__team", "seeded_from")
+            .order_by(f"-epa_{sort}")
+        )
+        histories = {}
+        matches = {}
+        if include_history:
+            histories = {epa.pk: unpack_history(epa.history) for epa in ratings}
+            match_ids = {
+                int(match_id)
+                for history in histories.values()
+                for match_id in history["match"]
+            }
+            matches = Match.objects.only(
+                "match_type", "match_number", "set_number"
+            ).in_bulk(match_ids - {0})
+
+    def point(row):
+        match = matches.get(int(row["match"]))
+        return {
+            "match_type": match.match_type if match else None,
+            "match_number": match.match_number if match else None,
+            "set_number": match.set_number if match else None,
+            "epa": {
+                name: round(float(value), 2)
+                for name, value in zip(EPA_COMPONENTS, row["epa"])
+            },
+        }
+
+    response["Server-Timing"] = timing.header()
+    return {
+        "competition_code": competition.code,
+        "sort": sort,
+        "rated_matches": ratings[0].rated_matches if ratings else 0,
+        "teams": [
+            {
+                "rank": rank,
+                "team_number": epa.team_info.team.number,
+                "team_name": epa.team_info.team.name,
+                "matches": epa.match_count,
+                "epa": {
+                    name: round(value, 2)
+                    for name, value in zip(EPA_COMPONENTS, epa.epa_vector())
+                },
+                "seeded_from": epa.seeded_from.code if epa.seeded_from else None,
+                "history": [point(row) for row in histories.get(epa.pk, [])],
+            }
+            for rank, epa in enumerate(ratings, 1)
+        ],
+    }
+
+
+@api.get(
+    "/competitions/{code}/action-summaries", response=List[TeamActionSummarySchema]
+)
+def get_competition_action_summaries(request, code: str, sort: str = "team_number"):
+    """
+    Per-team metrics derived from the robot actions scouted at a competition.
+
+    The summaries are stored, refreshed for a team whenever its robot actions
+    are submitted, so this only reads one row per team.
+
+    **Metrics:**
+    - `avg_cycle_time`: Seconds between the starts of consecutive shooting
+      actions in a match
+    - `fuel_per_shooting_second`: Fuel scored by shooting actions per second shooting
+    - `time_share`: Share of scouted time per action type
+    - `defense_seconds_per_match`, `disabled_rate` (share of matches disabled)
+
+    **Query parameters:**
+    - `sort`: `team_number` (default) or a metric, highest first
+
+    **Error Responses:**
+    - 400: Unknown sort
+    """
+    from django.db.models import F
+    from ninja.errors import HttpError
+
+    from .models import TeamActionSummary
+
+    sortable = [
+        "fuel_scored",
+        "fuel_per_shooting_second",
+        "avg_cycle_time",
+        "defense_seconds_per_match",
+        "disabled_rate",
+        "scouted_matches",
+    ]
+    if sort != "team_number" and sort not in sortable:
+        raise HttpError(
+            400, f"sort must be one of: team_number, {', '.join(sortable)}"
+        )
+
+    competition = get_object_or_404(Competition, code=code)
+    summaries = TeamActionSummary.objects.filter(
+        team_info__competition=competition
+    ).select_related("team_info__team")
+    if sort == "team_number":
+        summaries = summaries.order_by("team_info__team__number")
+    else:
+        summaries = summaries.order_by(
+            F(sort).desc(nulls_last=True), "team_info__team__number"
+        )
+
+    return [
+        {
+            "team_number": summary.team_info.team.number,
+            "team_name": summary.team_info.team.name,
+            **{
+                field: getattr(summary, field)
+                for field in TeamActionSummarySchema.model_fields
+                if field not in ("team_number", "team_name")
+            },
+        }
+        for summary in summaries
+    ]
+
+
+@api.get("/competitions/{code}/predictions", response=List[MatchPredictionSchema])
+def get_competition_predictions(
+    request,
+    code: str,
+    match_type: str = "qualification",
+    include_played: bool = False,
+    draws: int = 5000,
+):
+    """
+    Predict a competition's scheduled matches with a Monte Carlo simulation.
+
+    Every robot's contribution is drawn from a normal distribution around its
+    OPR, with a spread taken from how far its alliances' scores missed their
+    OPR sums. Predictions are cached until a new result is posted.
+
+    **Query parameters:**
+    - `match_type`: Matches to predict (default: `qualification`)
+    - `include_played`: Also predict matches that have been played
+    - `draws`: Simulated plays per match (100-20000, default: 5000)
+
+    **Returns:**
+    Per match: win and tie probabilities, expected scores, 10th/50th/90th
+    percentile scores and the odds of each match result ranking point value
+    """
+    from .analytics.match_predictor import predict_matches
+    from .utils.match_utils import TEAM_SLOT_FIELDS
+
+    _validate_draws(draws)
+    competition = get_object_or_404(Competition, code=code)
+    matches = (
+        Match.objects.select_related(*TEAM_SLOT_FIELDS)
+        .filter(competition=competition, match_type=match_type)
+        .order_by("set_number", "match_number")
+    )
+    if not include_played:
+        matches = matches.filter(has_played=False)
+    matches = list(matches)
+
+    predictions = predict_matches(competition, matches, draws)
+    return [_prediction_response(match, predictions[match.pk]) for match in matches]
+
+
+@api.get(
+    "/competitions/{code}/matches/{match_number}/prediction",
+    response=MatchPredictionSchema,
+)
+def get_match_prediction(
+    request,
+    code: str,
+    match_number: int,
+    match_type: str = "qualification",
+    set_number: int = 1,
+    draws: int = 5000,
+):
+    """
+    Predict one match; see `/competitions/{code}/predictions`.
+    """
+    from .analytics.match_predictor import predict_matches
+    from .utils.match_utils import TEAM_SLOT_FIELDS
+
+    _validate_draws(draws)
+    competition = get_object_or_404(Competition, code=code)
+    match = get_object_or_404(
+        Match.objects.select_related(*TEAM_SLOT_FIELDS),
+        competition=competition,
+        match_type=match_type,
+        set_number=set_number,
+        match_number=match_number,
+    )
+    prediction = predict_matches(competition, [match], draws)[match.pk]
+    return _prediction_response(match, prediction)
+
+
+@api.get("/competitions/{code}/opr", response=OprRankingSchema)
+def get_competition_opr(
+    request,
+    response: HttpResponse,
+    code: str,
+    sort: str = "opr",
+    include_playoffs: bool = False,
+):
+    """
+    Rank a competition's teams by opponent-adjusted ratings.
+
+    Ratings are least-squares fits of the alliance scores of played
+    qualification matches (add `include_playoffs=true` for playoffs too):
+    - `opr`: points a team adds to its alliance's score
+    - `dpr`: points a team's opponents score; lower is better
+    - `ccwm`: OPR minus DPR, the team's share of the winning margin
+    - `components`: OPR of auto, teleop and endgame points and of fuel scored
+
+    **Query parameters:**
+    - `sort`: `opr` (default), `dpr`, `ccwm` or a component name
+
+    **Error Responses:**
+    - 400: Unknown sort
+    """
+    from ninja.errors import HttpError
+
+    from .analytics.opr import COMPONENTS, competition_ratings
+    from .utils.server_timing import ServerTiming
+
+    sort_keys = ["opr", "dpr", "ccwm", *[c for c in COMPONENTS if c != "total"]]
+    if sort not in sort_keys:
+        raise HttpError(400, f"sort must be one of: {', '.join(sort_keys)}")
+
+    competition = get_object_or_404(Competition, code=code)
+
+    with ServerTiming() as timing:
+        ratings = competition_ratings(competition, include_playoffs)
+        teams = Team.objects.in_bulk([team["team_id"] for team in ratings["teams"]])
+
+    def sort_value(team):
+        value = team[sort] if sort in team else team["components"][sort]
+        return value if sort == "dpr" else -value
+
+    response["Server-Timing"] = timing.header()
+    return {
+        "competition_code": competition.code,
+        "sort": sort,
+        "match_count": ratings["match_count"],
+        "teams": [
+            {
+                **team,
+                "rank": rank,
+                "team_number": teams[team["team_id"]].number,
+                "team_name": teams[team["team_id"]].name,
+            }
+            for rank, team in enumerate(sorted(ratings["teams"], key=sort_value), 1)
+        ],
+    }
+
+
+@api.get("/competitions/{code}/rank-projection", response=RankProjectionSchema)
+def get_rank_projection(
+    request, response: HttpResponse, code: str, simulations: int = 10000
+):
+    """
+    Project final qualification ranks by simulating the remaining schedule.
+
+    Every unplayed qualification match is played out with the match
+    predictor in each simulated event; teams are ranked by average ranking
+    points, then average match points. Projections are cached until a new
+    result is posted or the schedule changes.
+
+    **Query parameters:**
+    - `simulations`: Simulated events (100-100000, default: 10000)
+
+    **Returns:**
+    Per team, ordered by mean projected rank: current and expected ranking
+    points, 10th/50th/90th percentile rank, the probability of finishing in
+    the top 8 and the probability of every final rank
+
+    **Error Responses:**
+    - 400: simulations out of range
+    """
+    from ninja.errors import HttpError
+
+    from .analytics.rank_projection import MAX_SIMULATIONS, project_ranks
+    from .utils.server_timing import ServerTiming
+
+    if not 100 <= simulations <= MAX_SIMULATIONS:
+        raise HttpError(400, f"simulations must be between 100 and {MAX_SIMULATIONS}")
+
+    competition = get_object_or_404(Competition, code=code)
+
+    with ServerTiming() as timing:
+        projection = project_ranks(competition, simulations)
+        infos = {
+            info.team_id: info
+            for info in TeamInfo.objects.select_related("team").filter(
+                competition=competition,
+                team_id__in=[team["team_id"] for team in projection["teams"]],
+            )
+        }
+        teams = Team.objects.in_bulk(
+            [t["team_id"] for t in projection["teams"] if t["team_id"] not in infos]
+        )
+
+    def team_fields(team_id):
+        info = infos.get(team_id)
+        team = info.team if info else teams[team_id]
+        return {
+            "team_number": team.number,
+            "team_name": team.name,
+            "current_rank": info.rank if info else None,
+        }
+
+    response["Server-Timing"] = timing.header()
+    return {
+        "competition_code": competition.code,
+        **{key: value for key, value in projection.items() if key != "teams"},
+        "teams": [
+            {**team, **team_fields(team["team_id"])} for team in projection["teams"]
+        ],
+    }
+
+
+@api.get("/competitions/{code}/pick-list", response=PickListSchema)
+def get_pick_list(
+    request, response: HttpResponse, code: str, team: int, exclude: str = ""
+):
+    """
+    Recommend an alliance captain's picks by simulating the serpentine draft.
+
+    Alliances are scored from OPR components, with teleop scoring saturating
+    so climbers complement scorers. For every first pick the draft is played
+    out with the other captains taking their best addition, and the second
+    pick is searched with pruning.
+
+    **Query parameters:**
+    - `team`: Team number of the captain
+    - `exclude`: Comma-separated team numbers that cannot be picked
+      (declined or already picked)
+
+    **Returns:**
+    First picks ordered by the alliance's average win probability against the
+    other projected alliances, second picks for the best first pick, and the
+    projected alliances
+
+    **Error Responses:**
+    - 400: Invalid exclude list, or the team is not an alliance captain
+    """
+    from ninja.errors import HttpError
+
+    from .analytics.pick_list import build_pick_list
+    from .utils.server_timing import ServerTiming
+
+    try:
+        excluded = [int(number) for number in exclude.split(",") if number.strip()]
+    except ValueError:
+        raise HttpError(400, "exclude must be comma-separated team numbers")
+
+    competition = get_object_or_404(Competition, code=code)
+    captain = get_object_or_404(Team, number=team)
+
+    with ServerTiming() as timing:
+        excluded_ids = list(
+            Team.objects.filter(number__in=excluded).values_list("id", flat=True)
+        )
+        try:
+            pick_list = build_pick_list(competition, captain.pk, excluded_ids)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        teams = Team.objects.in_bulk(
+            [pick["team_id"] for pick in pick_list["first_picks"]]
+            + [pick["expected_second_pick"] for pick in pick_list["first_picks"]]
+            + [pick["team_id"] for pick in pick_list["second_picks"]]
+            + pick_list["captains"]
+        )
+
+    def team_fields(pick):
+        return {
+            "team_number": teams[pick["team_id"]].number,
+            "team_name": teams[pick["team_id"]].name,
+        }
+
+    response["Server-Timing"] = timing.header()
+    return {
+        "competition_code": competition.code,
+        "team_number": captain.number,
+        "seed": pick_list["seed"],
+        "captains": [teams[team_id].number for team_id in pick_list["captains"]],
+        "first_picks": [
+            {
+                **pick,
+                **team_fields(pick),
+                "expected_second_pick": (
+                    teams[pick["expected_second_pick"]].number
+                    if pick["expected_second_pick"]
+                    else None
+                ),
+            }
+            for pick in pick_list["first_picks"]
+        ],
+        "second_picks": [
+            {**pick, **team_fields(pick)} for pick in pick_list["second_picks"]
+        ],
+        "alliances": [
+            [teams[team_id].number for team_id in alliance]
+            for alliance in pick_list["alliances"]
+        ],
+        "evaluated": pick_list["evaluated"],
+        "pruned": pick_list["pruned"],
+    }
+
+
 @api.post("/robot-actions", response=RobotActionSchema)
 def create_robot_action(
     request,
@@ -362,11 +925,23 @@ def create_robot_action(
     match_number: int,
     team_number: int,
     payload: RobotActionCreateSchema,
+    is_playoff: bool = False,
+    set_number: int = None,
 ):
     from ninja.errors import HttpError
 
+    from .utils.robot_action_utils import resolve_match
+
     competition = get_object_or_404(Competition, code=competition_code)
-    match = get_object_or_404(Match, competition=competition, match_number=match_number)
+    match, error = resolve_match(
+        Match.objects.filter(competition=competition, match_number=match_number),
+        competition_code,
+        match_number,
+        is_playoff,
+        set_number,
+    )
+    if match is None:
+        raise HttpError(404, error)
     team = get_object_or_404(Team, number=team_number)
 
     # Get the user from the request if authenticated
@@ -387,6 +962,9 @@ def create_robot_action(
                 f"Only the original scouter can add more actions.",
             )
 
+    from .analytics.action_summary import refresh_action_summaries
+    from .utils.robot_action_utils import rebuild_match_timelines
+
     robot_action = RobotAction.objects.create(
         match=match,
         team=team,
@@ -396,6 +974,8 @@ def create_robot_action(
         notes=payload.notes,
         recorded_by=recorded_by,
     )
+    rebuild_match_timelines([match], team)
+    refresh_action_summaries(competition, [team.pk])
     return robot_action
 
 
@@ -416,8 +996,127 @@ def list_robot_actions(
     return queryset
 
 
-@api.post("/robot-actions/bulk")
-def bulk_create_robot_actions(request, payload: BulkRobotActionsSchema):
+@api.get(
+    "/competitions/{code}/teams/{team_number}/timelines", response=TeamTimelinesSchema
+)
+def get_team_timelines(request, code: str, team_number: int, format: str = "json"):
+    """
+    A team's scouted action timelines at a competition, read in one query.
+
+    Timelines are the compact per-match copies of the team's robot actions,
+    written along with them. Times are integer centiseconds from match start
+    and actions are codes into `action_types`.
+
+    **Query parameters:**
+    - `format`: `json` (default) returns the columns as lists; `binary`
+      returns `application/octet-stream`:
+      - one 12-byte little-endian header per match, in match order: int32
+        match_number, int16 set_number, uint8 match_type (index into the
+        `X-Match-Types` header), uint8 is_playoff, uint32 action_count
+      - then every action as a 11-byte record: uint8 action (index into the
+        `X-Action-Types` header), int32 start, int32 end, int16 fuel
+      - `X-Timeline-Count` holds the number of matches
+
+    **Error Responses:**
+    - 400: Unknown format
+    - 404: Competition not found
+    """
+    import numpy as np
+    from django.db.models import Case, IntegerField, When
+    from ninja.errors import HttpError
+
+    from .models import MatchTimeline
+    from .utils.robot_action_utils import (
+        ACTION_TYPES,
+        TIMELINE_DTYPE,
+        unpack_timeline,
+    )
+
+    if format not in ("json", "binary"):
+        raise HttpError(400, "format must be json or binary")
+
+    match_types = [match_type for match_type, _ in Match.TYPE_CHOICES]
+    match_type_order = Case(
+        *[When(match__match_type=t, then=i) for i, t in enumerate(match_types)],
+        default=len(match_types),
+        output_field=IntegerField(),
+    )
+    rows = list(
+        MatchTimeline.objects.filter(
+            match__competition__code=code, team__number=team_number
+        )
+        .order_by(match_type_order, "match__set_number", "match__match_number")
+        .values_list(
+            "match__match_number",
+            "match__set_number",
+            "match__match_type",
+            "is_playoff",
+            "action_count",
+            "notes",
+            "actions",
+        )
+    )
+    if not rows:
+        get_object_or_404(Competition, code=code)
+
+    records = (
+        np.concatenate([unpack_timeline(row[-1]) for row in rows])
+        if rows
+        else np.empty(0, dtype=TIMELINE_DTYPE)
+    )
+
+    if format == "binary":
+        type_codes = {match_type: code for code, match_type in enumerate(match_types)}
+        headers = np.array(
+            [
+                (number, set_number, type_codes.get(match_type, 255), playoff, count)
+                for number, set_number, match_type, playoff, count, _, _ in rows
+            ],
+            dtype=[
+                ("match_number", "<i4"),
+                ("set_number", "<i2"),
+                ("match_type", "u1"),
+                ("is_playoff", "u1"),
+                ("action_count", "<u4"),
+            ],
+        )
+        binary = HttpResponse(
+            headers.tobytes() + records.tobytes(),
+            content_type="application/octet-stream",
+        )
+        binary["X-Timeline-Count"] = str(len(rows))
+        binary["X-Action-Types"] = ",".join(ACTION_TYPES)
+        binary["X-Match-Types"] = ",".join(match_types)
+        return binary
+
+    counts = [row[4] for row in rows]
+    return {
+        "competition_code": code,
+        "team_number": team_number,
+        "action_types": ACTION_TYPES,
+        "matches": [
+            {
+                "match_number": number,
+                "set_number": set_number,
+                "match_type": match_type,
+                "is_playoff": playoff,
+                "action_count": count,
+                "notes": notes,
+            }
+            for number, set_number, match_type, playoff, count, notes, _ in rows
+        ],
+        "offsets": [0] + np.cumsum(counts, dtype=np.int64).tolist(),
+        "action": records["action"].tolist(),
+        "start": records["start"].tolist(),
+        "end": records["end"].tolist(),
+        "fuel": records["fuel"].tolist(),
+    }
+
+
+@api.post("/robot-actions/bulk", response=List[RobotActionSchema])
+def bulk_create_robot_actions(
+    request, response: HttpResponse, payload: BulkRobotActionsSchema
+):
     """
     Bulk create robot actions from auto and teleop periods.
 
@@ -431,6 +1130,7 @@ def bulk_create_robot_actions(request, payload: BulkRobotActionsSchema):
         "competition_code": "2025gacmp",
         "match_number": 1,
         "is_playoff": false,
+        "set_number": null,
         "notes": "General match notes",
         "auto": [
             {"duration": 2, "action": "shoot", "fuel": 2},
@@ -444,89 +1144,124 @@ def bulk_create_robot_actions(request, payload: BulkRobotActionsSchema):
     ```
 
     **Behavior:**
+    - Playoff matches are found by `is_playoff` and, when several sets share
+      the match number, `set_number`; an ambiguous match returns 404
     - Calculates start_time and end_time based on cumulative duration
     - Auto period starts at 0 seconds
     - Teleop period starts at 15 seconds (after auto)
-    - Creates individual RobotAction records for each action
+    - Replaces the team's earlier actions for the match with a single bulk insert
     - Prevents multiple scouts from recording the same team/match
+    - Writes the compact match timeline (see `/teams/{team_number}/timelines`)
+    - Refreshes the team's action summary (see `/action-summaries`)
+    - Reports server and database time in the `Server-Timing` header
 
     **Returns:**
     List of created RobotAction objects
     """
+    from django.core.exceptions import PermissionDenied
     from django.db import transaction
     from ninja.errors import HttpError
 
-    competition = get_object_or_404(Competition, code=payload.competition_code)
-    match = get_object_or_404(
-        Match, competition=competition, match_number=payload.match_number
+    from .analytics.action_summary import refresh_action_summaries
+    from .utils.robot_action_utils import (
+        build_robot_actions,
+        replace_robot_actions,
+        resolve_match,
     )
-    team = get_object_or_404(Team, number=payload.team_number)
+    from .utils.server_timing import ServerTiming
+
+    with ServerTiming() as timing:
+        match, error = resolve_match(
+            Match.objects.filter(
+                competition__code=payload.competition_code,
+                match_number=payload.match_number,
+            ).select_related("competition"),
+            payload.competition_code,
+            payload.match_number,
+            payload.is_playoff,
+            payload.set_number,
+        )
+        if match is None:
+            raise HttpError(404, error)
+        team = get_object_or_404(Team, number=payload.team_number)
 
-    # Get the user from the request if authenticated
-    recorded_by = request.user if request.user.is_authenticated else None
+        # Get the user from the request if authenticated
+        recorded_by = request.user if request.user.is_authenticated else None
 
-    # Check if there are existing robot actions for this team and match
-    existing_actions = RobotAction.objects.filter(match=match, team=team)
+        actions = build_robot_actions(payload, match, team, recorded_by)
+        try:
+            with transaction.atomic():
+                replace_robot_actions(match, team, recorded_by, actions)
+                refresh_action_summaries(match.competition, [team.pk])
+        except PermissionDenied as e:
+            raise HttpError(403, str(e))
 
-    if existing_actions.exists():
-        # Get the first existing action to check who recorded it
-        first_action = existing_actions.first()
+    response["Server-Timing"] = timing.header()
+    return actions
 
-        # If there's a different scouter, don't allow the creation
-        if first_action.recorded_by != recorded_by:
-            raise HttpError(
-                403,
-                "This team and match combination has already been scouted by another user. "
-                "Only the original scouter can add more actions.",
-            )
 
-        # Delete existing actions to replace with new bulk upload
-        existing_actions.delete()
-
-    created_actions = []
-
-    with transaction.atomic():
-        # Process auto actions (start at 0 seconds)
-        current_time = 0.0
-        for action_item in payload.auto:
-            start_time = current_time
-            end_time = current_time + action_item.duration
-
-            robot_action = RobotAction.objects.create(
-                match=match,
-                team=team,
-                action_type=action_item.action,
-                start_time=start_time,
-                end_time=end_time,
-                is_playoff=payload.is_playoff,
-                fuel=action_item.fuel,
-                notes=payload.notes if payload.notes else None,
-                recorded_by=recorded_by,
-            )
-            created_actions.append(robot_action)
-            current_time = end_time
-
-        # Process teleop actions (start at 15 seconds - after auto period)
-        current_time = 15.0
-        for action_item in payload.tele:
-            start_time = current_time
-            end_time = current_time + action_item.duration
-
-            robot_action = RobotAction.objects.create(
-                match=match,
-                team=team,
-                action_type=action_item.action,
-                start_time=start_time,
-                end_time=end_time,
-                is_playoff=payload.is_playoff,
-                fuel=action_item.fuel,
-                notes=payload.notes if payload.notes else None,
-                recorded_by=recorded_by,
-            )
-            created_actions.append(robot_action)
-            current_time = end_time
+@api.post("/robot-actions/batch", response=BatchRobotActionsResultSchema)
+def batch_create_robot_actions(
+    request, response: HttpResponse, payload: BatchRobotActionsSchema
+):
+    """
+    Upload several queued team-match submissions in one request.
+
+    Meant for scouting tablets coming back online: send everything queued
+    offline at once, each submission with an `idempotency_key` generated when it
+    was recorded. The body may be gzip compressed (`Content-Encoding: gzip`).
+
+    **Request Format:**
+    ```json
+    {
+        "submissions": [
+            {
+                "idempotency_key": "3f2b9c1e-...",
+                "team_number": 254,
+                "competition_code": "2025gacmp",
+                "match_number": 1,
+                "auto": [{"duration": 2, "action": "shooting", "fuel": 2}],
+                "tele": [{"duration": 20, "action": "shooting", "fuel": 20}]
+            }
+        ]
+    }
+    ```
+
+    **Behavior:**
+    - Each submission replaces the team's actions for the match, as in
+      `/robot-actions/bulk`
+    - Submissions are written in one transaction, each in its own savepoint
+    - A key that was already applied is reported as `duplicate` and not written
+      again, so retrying a whole batch after a timeout is safe
+    - Reports server and database time in the `Server-Timing` header
+
+    **Returns:**
+    Counts and a result per submission, in request order, with `status`
+    `created`, `duplicate`, `not_found` (including a playoff match number
+    shared by several sets without `set_number`) or `rejected` (scouted by
+    another user)
+
+    **Error Responses:**
+    - 413: More than 200 submissions in one batch
+    """
+    from ninja.errors import HttpError
+
+    from .utils.robot_action_utils import MAX_BATCH_SUBMISSIONS, apply_submission_batch
+    from .utils.server_timing import ServerTiming
+
+    if len(payload.submissions) > MAX_BATCH_SUBMISSIONS:
+        raise HttpError(
+            413, f"At most {MAX_BATCH_SUBMISSIONS} submissions per batch"
+        )
+
+    # Get the user from the request if authenticated
+    recorded_by = request.user if request.user.is_authenticated else None
+
+    with ServerTiming() as timing:
+        result = apply_submission_batch(payload.submissions, recorded_by)
 
-    return created_actions
+    response["Server-Timing"] = timing.header()
+    return result
 
 
 @api.get("/scary-api")
@@ -1,10 +1,43 @@
 import logging
 import os
+import pkgutil
+from pathlib import Path
 
 from django.apps import AppConfig
 
 logger = logging.getLogger(__name__)
 
+# Apps whose tables task setup reads and writes
+TASK_SETUP_APPS = ["backend", "django_q"]
+
+
+def migrations_applied(app_labels=None) -> bool:
+    """
+    Whether the latest migration of each app has been applied.
+
+    Cheaper than building a MigrationExecutor plan: migration modules are
+    listed without importing them and django_migrations is read with one
+    query. Relies on migration names sorting in order (the numeric prefix).
+    """
+    from django.apps import apps
+    from django.db.migrations.recorder import MigrationRecorder
+
+    latest = {}
+    for label in app_labels or TASK_SETUP_APPS:
+        migrations_dir = Path(apps.get_app_config(label).path) / "migrations"
+        names = [
+            module.name
+            for module in pkgutil.iter_modules([str(migrations_dir)])
+            if module.name[:1].isdigit()
+        ]
+        if names:
+            latest[label] = max(names)
+
+    applied = MigrationRecorder.Migration.objects.filter(
+        app__in=list(latest), name__in=list(latest.values())
+    ).values_list("app", "name")
+    return set(latest.items()) <= set(applied)
+
 
 class BackendConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
@@ -21,13 +54,8 @@ class BackendConfig(AppConfig):
             return
 
         # Skip during migrations
-        from django.db import connection
-        from django.db.migrations.executor import MigrationExecutor
-
         try:
-            executor = MigrationExecutor(connection)
-            # Check if there are pending migrations
-            if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            if not migrations_applied():
                 logger.info("Pending migrations detected - skipping task setup")
                 return
         except Exception as e:
@@ -0,0 +1,110 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import Competition, defer_epa_updates
+from backend.utils.match_utils import import_matches_bulk
+from backend.utils.tba_dump import DEFAULT_CHUNK_SIZE, iter_dump_matches
+
+
+class Command(BaseCommand):
+    help = "Import matches from TBA JSON dump files or season dump directories (no API key needed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            type=str,
+            help="Dump files or directories of dumps (e.g., ../2020_data)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of matches written per batch (default: 500)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Characters read per parser chunk (default: {DEFAULT_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--event",
+            type=str,
+            default=None,
+            help="Only import matches for this event key (e.g., 2020gagai)",
+        )
+
+    # One EPA update per competition instead of one per stored result
+    @defer_epa_updates()
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        self.stdout.write(self.style.SUCCESS("\n=== Importing TBA Dumps ==="))
+        started = time.perf_counter()
+
+        self.competitions = {}
+        self.totals = {}
+        pending = {}  # event key -> list of match dicts waiting to be written
+        read_count = 0
+
+        for dump_path, match_data in iter_dump_matches(
+            options["paths"], chunk_size=options["chunk_size"]
+        ):
+            event_key = match_data.get("event_key") or match_data["key"].split("_")[0]
+            if options["event"] and event_key != options["event"]:
+                continue
+
+            read_count += 1
+            pending.setdefault(event_key, []).append(match_data)
+            if len(pending[event_key]) >= batch_size:
+                self.flush(event_key, pending.pop(event_key), batch_size)
+
+        for event_key, matches in pending.items():
+            self.flush(event_key, matches, batch_size)
+
+        elapsed = time.perf_counter() - started
+
+        # Summary
+        for event_key, totals in self.totals.items():
+            self.stdout.write(
+                f"  {event_key}: {totals['created']} created, "
+                f"{totals['updated']} updated, {totals['unchanged']} unchanged, "
+                f"{totals['skipped']} skipped, "
+                f"{len(totals['team_numbers'])} teams"
+            )
+        rate = read_count / elapsed if elapsed > 0 else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ Imported {read_count} matches from {len(self.totals)} events "
+                f"in {elapsed:.2f}s ({rate:.0f} matches/s)"
+            )
+        )
+
+    def flush(self, event_key, matches, batch_size):
+        """Write a batch of matches for one event through the bulk importer"""
+        competition = self.competitions.get(event_key)
+        if competition is None:
+            competition, created = Competition.objects.get_or_create(
+                code=event_key, defaults={"name": event_key}
+            )
+            self.competitions[event_key] = competition
+            if created:
+                self.stdout.write(f"  Created competition: {event_key}")
+            else:
+                self.stdout.write(f"  Using existing competition: {competition.name}")
+
+        stats = import_matches_bulk(
+            matches, competition, batch_size=batch_size, stdout=self.stdout
+        )
+
+        totals = self.totals.setdefault(
+            event_key,
+            {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "team_numbers": set()},
+        )
+        for count in ("created", "updated", "unchanged", "skipped"):
+            totals[count] += stats[count]
+        totals["team_numbers"] |= stats["team_numbers"]
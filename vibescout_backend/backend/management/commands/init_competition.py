@@ -1,12 +1,12 @@
 import os
 from pathlib import Path
 
-import tbapy
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from dotenv import load_dotenv
 
 from backend.models import Competition, Team, TeamInfo
+from backend.utils.tba_client import get_tba_client
 
 
 class Command(BaseCommand):
@@ -60,6 +60,11 @@ class Command(BaseCommand):
             default="",
             help="Stream link day 3",
         )
+        parser.add_argument(
+            "--monitor",
+            action="store_true",
+            help="Enable background sync for this competition",
+        )
 
     def handle(self, *args, **options):
         # Load environment variables
@@ -88,7 +93,7 @@ class Command(BaseCommand):
         self.stdout.write(f"Event key: {event_key}")
 
         try:
-            tba = tbapy.TBA(api_key)
+            tba = get_tba_client(api_key)
             self.initialize_competition(tba, event_key, options)
             self.stdout.write(
                 self.style.SUCCESS(f"\n✓ Successfully initialized {event_key}")
@@ -127,6 +132,8 @@ class Command(BaseCommand):
             defaults["stream_link_day_2"] = options.get("stream_link_day_2")
         if options.get("stream_link_day_3"):
             defaults["stream_link_day_3"] = options.get("stream_link_day_3")
+        if options.get("monitor"):
+            defaults["monitoring_enabled"] = True
 
         # Create competition
         competition, created = Competition.objects.update_or_create(
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import Competition, Match
+from backend.utils.robot_action_utils import rebuild_match_timelines
+
+
+class Command(BaseCommand):
+    help = "Rebuild the compact match timelines from the stored robot actions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes",
+            nargs="*",
+            type=str,
+            help="Competition codes (default: every competition with robot actions)",
+        )
+
+    def handle(self, *args, **options):
+        competitions = Competition.objects.order_by("code")
+        if options["codes"]:
+            competitions = competitions.filter(code__in=options["codes"])
+            missing = set(options["codes"]) - set(competitions.values_list("code", flat=True))
+            if missing:
+                raise CommandError(f"Unknown competitions: {', '.join(sorted(missing))}")
+        else:
+            competitions = competitions.filter(matches__robot_actions__isnull=False).distinct()
+
+        started = time.perf_counter()
+        for competition in competitions:
+            written = rebuild_match_timelines(Match.objects.filter(competition=competition))
+            self.stdout.write(f"  {competition.code}: {written} timelines")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Rebuilt in {elapsed:.2f}s"))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.action_summary import refresh_action_summaries
+from backend.models import Competition
+
+
+class Command(BaseCommand):
+    help = "Recompute the scouted action summaries of every team at competitions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes",
+            nargs="*",
+            type=str,
+            help="Competition codes (default: every competition with robot actions)",
+        )
+
+    def handle(self, *args, **options):
+        competitions = Competition.objects.order_by("code")
+        if options["codes"]:
+            competitions = competitions.filter(code__in=options["codes"])
+            missing = set(options["codes"]) - set(competitions.values_list("code", flat=True))
+            if missing:
+                raise CommandError(f"Unknown competitions: {', '.join(sorted(missing))}")
+        else:
+            competitions = competitions.filter(matches__robot_actions__isnull=False).distinct()
+
+        started = time.perf_counter()
+        for competition in competitions:
+            result = refresh_action_summaries(competition)
+            self.stdout.write(
+                f"  {competition.code}: {result['updated']} updated, "
+                f"{result['created']} created, {result['removed']} removed"
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Refreshed in {elapsed:.2f}s"))
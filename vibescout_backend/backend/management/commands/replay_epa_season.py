@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.epa import replay_season
+
+
+class Command(BaseCommand):
+    help = "Rebuild the EPA ratings of every competition in a season in one pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "season",
+            type=str,
+            help="Season year (e.g., 2025), or the code of a competition without one",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Matches fetched from the database at a time (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        self.stdout.write(self.style.SUCCESS(f"\n=== Replaying EPA: {options['season']} ==="))
+        started = time.perf_counter()
+        result = replay_season(options["season"], options["batch_size"])
+        elapsed = time.perf_counter() - started
+
+        if not result["competitions"]:
+            raise CommandError(f"No played matches found for {options['season']}")
+
+        self.stdout.write(
+            f"  {result['matches']} matches at {result['competitions']} competitions, "
+            f"{result['ratings']} team ratings written"
+        )
+        self.stdout.write(
+            f"  mean absolute error of predicted alliance scores: "
+            f"{result['prediction_error']:.1f} points"
+        )
+        self.stdout.write(self.style.SUCCESS(f"\n✓ Replayed in {elapsed:.2f}s"))
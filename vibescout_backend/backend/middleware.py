@@ -0,0 +1,38 @@
+"""Request middleware for VibeScout."""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.http import HttpResponse
+
+
+class GzipRequestMiddleware:
+    """
+    Decompress request bodies sent with `Content-Encoding: gzip`.
+
+    Lets scouting tablets compress batch uploads. The decompressed size is
+    capped at DATA_UPLOAD_MAX_MEMORY_SIZE (or 2.5 MB), so a small compressed
+    body cannot expand without bound.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get("HTTP_CONTENT_ENCODING", "").lower() == "gzip":
+            limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 2621440
+            try:
+                with gzip.GzipFile(fileobj=request) as body:
+                    data = body.read(limit + 1)
+            except (OSError, EOFError, zlib.error):
+                return HttpResponse("Invalid gzip request body", status=400)
+            if len(data) > limit:
+                return HttpResponse("Request body too large", status=413)
+
+            # Django reads request.body from _body once it is set
+            request._body = data
+            request.META["CONTENT_LENGTH"] = str(len(data))
+            del request.META["HTTP_CONTENT_ENCODING"]
+
+        return self.get_response(request)
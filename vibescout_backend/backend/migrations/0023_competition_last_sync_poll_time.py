@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0022_match_video_available'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='last_sync_poll_time',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0023_competition_last_sync_poll_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='monitoring_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='sync_interval_minutes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='competition',
+            name='video_sync_enabled',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0024_competition_monitoring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoalescedTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('func', models.CharField(max_length=255)),
+                ('args', models.JSONField(default=list)),
+                ('kwargs', models.JSONField(default=dict)),
+                ('task_name', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(choices=[('idle', 'Idle'), ('queued', 'Queued'), ('running', 'Running')], default='idle', max_length=10)),
+                ('rerun_requested', models.BooleanField(default=False)),
+                ('run_after', models.DateTimeField(blank=True, null=True)),
+                ('requested_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requests', models.IntegerField(default=0)),
+                ('runs', models.IntegerField(default=0)),
+                ('suppressed', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['key'],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Scoring rules as of this migration, so later changes to backend.analytics
+# do not change what it computes
+SLOTS = ['blue_1', 'blue_2', 'blue_3', 'red_1', 'red_2', 'red_3']
+CLIMB_POINTS = {'L1': 3, 'L2': 6, 'L3': 10}
+METRICS = ['fuel', 'auto_fuel', 'climb_points']
+
+
+def match_contribution(match):
+    """[team_id, fuel, auto_fuel, climb_points] per slot of a played match"""
+    contribution = []
+    for slot in SLOTS:
+        alliance, position = slot.split('_')
+        contribution.append([
+            getattr(match, f'{alliance}_team_{position}_id'),
+            getattr(match, f'{slot}_fuel_scored'),
+            getattr(match, f'{slot}_auto_fuel'),
+            CLIMB_POINTS.get(getattr(match, f'{slot}_climb'), 0),
+        ])
+    return contribution
+
+
+def backfill_running_stats(apps, schema_editor):
+    """Start the running stats from the matches played before they existed"""
+    Match = apps.get_model('backend', 'Match')
+    TeamInfo = apps.get_model('backend', 'TeamInfo')
+    TeamRunningStats = apps.get_model('backend', 'TeamRunningStats')
+
+    competition_ids = (
+        Match.objects.filter(has_played=True)
+        .order_by()
+        .values_list('competition_id', flat=True)
+        .distinct()
+    )
+    for competition_id in competition_ids:
+        matches = list(Match.objects.filter(competition_id=competition_id, has_played=True))
+        team_values = {}
+        for match in matches:
+            match.stats_contribution = match_contribution(match)
+            for team_id, *values in match.stats_contribution:
+                team_values.setdefault(team_id, []).append(values)
+        Match.objects.bulk_update(matches, ['stats_contribution'], batch_size=500)
+
+        team_infos = dict(
+            TeamInfo.objects.filter(competition_id=competition_id).values_list(
+                'team_id', 'id'
+            )
+        )
+        running = []
+        for team_id, rows in team_values.items():
+            if team_id not in team_infos:
+                continue
+            stats = TeamRunningStats(
+                team_info_id=team_infos[team_id], match_count=len(rows)
+            )
+            # Sum and M2 (squared deviations from the team's mean) per metric
+            for metric, values in zip(METRICS, zip(*rows)):
+                mean = sum(values) / len(values)
+                setattr(stats, f'{metric}_sum', sum(values))
+                setattr(stats, f'{metric}_m2', sum((value - mean) ** 2 for value in values))
+            running.append(stats)
+        TeamRunningStats.objects.bulk_create(running, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0026_submissionreceipt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='stats_contribution',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='TeamRunningStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_count', models.IntegerField(default=0)),
+                ('fuel_sum', models.IntegerField(default=0)),
+                ('fuel_m2', models.FloatField(default=0.0)),
+                ('auto_fuel_sum', models.IntegerField(default=0)),
+                ('auto_fuel_m2', models.FloatField(default=0.0)),
+                ('climb_points_sum', models.IntegerField(default=0)),
+                ('climb_points_m2', models.FloatField(default=0.0)),
+                ('team_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='running_stats', to='backend.teaminfo')),
+            ],
+        ),
+        migrations.RunPython(backfill_running_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0027_match_stats_contribution_teamrunningstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamEpa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('epa_total', models.FloatField(default=0.0)),
+                ('epa_auto', models.FloatField(default=0.0)),
+                ('epa_teleop', models.FloatField(default=0.0)),
+                ('epa_endgame', models.FloatField(default=0.0)),
+                ('match_count', models.IntegerField(default=0)),
+                ('season_matches', models.IntegerField(default=0)),
+                ('history', models.BinaryField(default=bytes)),
+                ('rated_matches', models.IntegerField(default=0)),
+                ('source_digest', models.CharField(blank=True, default='', max_length=16)),
+                ('seeded_from', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='backend.competition')),
+                ('team_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='epa', to='backend.teaminfo')),
+            ],
+        ),
+    ]
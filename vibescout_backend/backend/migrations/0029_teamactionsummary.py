@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0028_teamepa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamActionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scouted_matches', models.IntegerField(default=0)),
+                ('scouted_seconds', models.FloatField(default=0.0)),
+                ('action_seconds', models.JSONField(default=dict)),
+                ('time_share', models.JSONField(default=dict)),
+                ('fuel_scored', models.IntegerField(default=0)),
+                ('shooting_seconds', models.FloatField(default=0.0)),
+                ('fuel_per_shooting_second', models.FloatField(blank=True, null=True)),
+                ('cycle_count', models.IntegerField(default=0)),
+                ('avg_cycle_time', models.FloatField(blank=True, null=True)),
+                ('defense_seconds_per_match', models.FloatField(default=0.0)),
+                ('disabled_rate', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('team_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='action_summary', to='backend.teaminfo')),
+            ],
+        ),
+    ]
@@ -1,10 +1,89 @@
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
 
+# Competitions with EPA updates held back by the enclosing defer_epa_updates block
+_deferred_epa_updates = ContextVar("deferred_epa_updates", default=None)
+
+
+def _in_update_fields(name: str, update_fields) -> bool:
+    """Whether a save with update_fields writes a field (or its *_id attribute)"""
+    return (
+        update_fields is None
+        or name in update_fields
+        or name.removesuffix("_id") in update_fields
+    )
+
+
+class TrackedFieldsMixin:
+    """
+    Remember the database values of ``tracked_fields`` so saves can tell
+    what changed without querying the row again.
+
+    Values are captured when an instance is loaded from the database and
+    refreshed after every save.
+    """
+
+    tracked_fields = []
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.tracked_fields and value is not models.DEFERRED
+        }
+        return instance
+
+    def loaded_value(self, field_name):
+        """
+        Value of a tracked field as last read from or written to the database.
+
+        Returns None for unsaved instances. Falls back to a query for instances
+        that were not loaded from the database (e.g. built with an explicit pk).
+        """
+        loaded_values = getattr(self, "_loaded_values", {})
+        if field_name in loaded_values:
+            return loaded_values[field_name]
+        if self.pk is None:
+            return None
+        return (
+            type(self)
+            ._base_manager.filter(pk=self.pk)
+            .values_list(field_name, flat=True)
+            .first()
+        )
+
+    def changed_fields(self, update_fields=None) -> list:
+        """Tracked fields whose value differs from the database (all of them when unsaved)"""
+        names = [
+            name
+            for name in self.tracked_fields
+            if _in_update_fields(name, update_fields)
+        ]
+        if self._state.adding:
+            return names
+        return [name for name in names if getattr(self, name) != self.loaded_value(name)]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        loaded_values = getattr(self, "_loaded_values", {})
+        for name in self.tracked_fields:
+            if _in_update_fields(name, update_fields):
+                loaded_values[name] = getattr(self, name)
+        self._loaded_values = loaded_values
+
 
 class Team(models.Model):
     number = models.IntegerField(unique=True)
@@ -17,7 +96,7 @@ class Team(models.Model):
         ordering = ["number"]
 
 
-class Competition(models.Model):
+class Competition(TrackedFieldsMixin, models.Model):
     name = models.CharField(max_length=255)
     code = models.CharField(max_length=50, unique=True)
     offset_stream_time_to_unix_timestamp_day_1 = models.IntegerField(
@@ -32,10 +111,37 @@ class Competition(models.Model):
     stream_link_day_1 = models.CharField(max_length=255, blank=True, null=True)
     stream_link_day_2 = models.CharField(max_length=255, blank=True, null=True)
     stream_link_day_3 = models.CharField(max_length=255, blank=True, null=True)
+    last_sync_poll_time = models.IntegerField(default=0)  # Unix timestamp
+    # Background sync settings (see schedule_setup)
+    monitoring_enabled = models.BooleanField(default=False)
+    sync_interval_minutes = models.IntegerField(
+        default=0
+    )  # 0 uses the server's default scheduler
+    video_sync_enabled = models.BooleanField(default=True)
+
+    # Fields that decide the competition's background schedules
+    tracked_fields = [
+        "monitoring_enabled",
+        "sync_interval_minutes",
+        "video_sync_enabled",
+        "stream_link_day_1",
+        "stream_link_day_2",
+        "stream_link_day_3",
+    ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Override save to keep this competition's background schedules in step"""
+        schedule_changed = bool(self.changed_fields(kwargs.get("update_fields")))
+        super().save(*args, **kwargs)
+
+        if schedule_changed:
+            from .schedule_setup import update_competition_schedules
+
+            update_competition_schedules(self)
+
     class Meta:
         ordering = ["name"]
 
@@ -140,7 +246,105 @@ class TeamInfo(models.Model):
         unique_together = ["team", "competition"]
 
 
-class Match(models.Model):
+class TeamRunningStats(models.Model):
+    """
+    Running aggregates of a team's played matches at a competition.
+
+    Kept up to date match by match by backend.analytics.running_stats, so the
+    stats on TeamInfo can be refreshed without reading the team's other
+    matches. Sums are exact; M2 is the Welford sum of squared deviations
+    from the mean.
+    """
+
+    team_info = models.OneToOneField(
+        TeamInfo, on_delete=models.CASCADE, related_name="running_stats"
+    )
+    match_count = models.IntegerField(default=0)
+
+    fuel_sum = models.IntegerField(default=0)
+    fuel_m2 = models.FloatField(default=0.0)
+    auto_fuel_sum = models.IntegerField(default=0)
+    auto_fuel_m2 = models.FloatField(default=0.0)
+    climb_points_sum = models.IntegerField(default=0)
+    climb_points_m2 = models.FloatField(default=0.0)
+
+    def __str__(self):
+        return f"{self.team_info} - {self.match_count} matches"
+
+
+class TeamEpa(models.Model):
+    """
+    A team's expected points added (EPA) at a competition.
+
+    Updated match by match by backend.analytics.epa. history packs the
+    rating after every match the team played (see epa.HISTORY_DTYPE).
+    """
+
+    team_info = models.OneToOneField(
+        TeamInfo, on_delete=models.CASCADE, related_name="epa"
+    )
+    epa_total = models.FloatField(default=0.0)
+    epa_auto = models.FloatField(default=0.0)
+    epa_teleop = models.FloatField(default=0.0)
+    epa_endgame = models.FloatField(default=0.0)
+
+    match_count = models.IntegerField(default=0)  # At this competition
+    season_matches = models.IntegerField(default=0)  # Including earlier events
+    # Earlier event the starting rating came from
+    seeded_from = models.ForeignKey(
+        Competition, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
+    history = models.BinaryField(default=bytes)
+
+    # Played matches of the competition rated so far and a digest of them,
+    # the same on every row of the competition
+    rated_matches = models.IntegerField(default=0)
+    source_digest = models.CharField(max_length=16, blank=True, default="")
+
+    def epa_vector(self) -> list:
+        return [self.epa_total, self.epa_auto, self.epa_teleop, self.epa_endgame]
+
+    def set_epa_vector(self, values):
+        self.epa_total, self.epa_auto, self.epa_teleop, self.epa_endgame = (
+            float(value) for value in values
+        )
+
+    def __str__(self):
+        return f"{self.team_info.team} - {self.epa_total:.1f} EPA"
+
+
+class TeamActionSummary(models.Model):
+    """
+    Metrics derived from the robot actions scouted for a team at a competition.
+
+    Refreshed for the submitting team whenever robot actions are stored, by
+    backend.analytics.action_summary. Times are in seconds.
+    """
+
+    team_info = models.OneToOneField(
+        TeamInfo, on_delete=models.CASCADE, related_name="action_summary"
+    )
+    scouted_matches = models.IntegerField(default=0)
+    scouted_seconds = models.FloatField(default=0.0)
+    # Seconds and share of scouted time per action type
+    action_seconds = models.JSONField(default=dict)
+    time_share = models.JSONField(default=dict)
+
+    fuel_scored = models.IntegerField(default=0)
+    shooting_seconds = models.FloatField(default=0.0)
+    fuel_per_shooting_second = models.FloatField(blank=True, null=True)
+    # Gaps between the starts of consecutive shooting actions in a match
+    cycle_count = models.IntegerField(default=0)
+    avg_cycle_time = models.FloatField(blank=True, null=True)
+    defense_seconds_per_match = models.FloatField(default=0.0)
+    disabled_rate = models.FloatField(default=0.0)  # Share of matches disabled
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.team_info} - {self.scouted_matches} scouted matches"
+
+
+class Match(TrackedFieldsMixin, models.Model):
     CLIMB_CHOICES = [
         ("None", "None"),
         ("L1", "Level 1"),
@@ -258,77 +462,190 @@ class Match(models.Model):
 
     video_available = models.BooleanField(default=False)
 
+    # Per-slot [team_id, fuel, auto_fuel, climb_points] last added to the
+    # teams' running stats; empty until the match has been played
+    stats_contribution = models.JSONField(default=list, blank=True)
+
+    # Columns backend.analytics.epa rates played matches from
+    EPA_INPUT_FIELDS = [
+        "has_played",
+        "blue_team_1_id",
+        "blue_team_2_id",
+        "blue_team_3_id",
+        "red_team_1_id",
+        "red_team_2_id",
+        "red_team_3_id",
+        "blue_total_score",
+        "red_total_score",
+        "blue_auto_points",
+        "red_auto_points",
+        "blue_teleop_points",
+        "red_teleop_points",
+        "blue_endgame_points",
+        "red_endgame_points",
+    ]
+
+    tracked_fields = EPA_INPUT_FIELDS
+
     def __str__(self):
         return f"Match {self.match_number} - {self.competition.name}"
 
-    def save(self, *args, **kwargs):
-        """Override save to trigger video download when match has_played changes to True"""
-        # Track if has_played just changed to True
-        should_download_video = False
-
-        if self.pk:
-            # If updating existing match, check if has_played changed from False to True
-            try:
-                old_match = Match.objects.get(pk=self.pk)
-                if not old_match.has_played and self.has_played:
-                    should_download_video = True
-                    logger.info(
-                        f"Match {self.match_number} ({self.competition.code}) "
-                        f"has_played changed from False to True"
-                    )
-            except Match.DoesNotExist:
-                pass
-        else:
-            # New match that's already played
-            if self.has_played:
-                should_download_video = True
-                logger.info(
-                    f"New match {self.match_number} ({self.competition.code}) "
-                    f"created with has_played=True"
-                )
+    def epa_inputs_changed(self, changed: list) -> bool:
+        """Whether changing these attributes can change the competition's EPA"""
+        return bool(set(changed) & set(self.EPA_INPUT_FIELDS)) and (
+            self.has_played or "has_played" in changed
+        )
 
-        # Save the match first
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        """
+        Override save to trigger video download when match has_played changes to True,
+        to keep the teams' running stats in step with the match result and to
+        queue an EPA update when a played match's teams or scores change
+        """
+        from .analytics.running_stats import apply_contributions, match_contribution
+
+        # Compare with the loaded values instead of re-reading the row
+        changed = self.changed_fields(kwargs.get("update_fields"))
+        should_download_video = self.has_played and "has_played" in changed
+        should_update_epa = self.epa_inputs_changed(changed)
+
+        previous = self.stats_contribution
+        contribution = match_contribution(self)
+        if contribution != previous:
+            self.stats_contribution = contribution
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = [*kwargs["update_fields"], "stats_contribution"]
+
+        # Save the match and its stats contribution together
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if contribution != previous:
+                apply_contributions(self.competition_id, [(previous, contribution)])
+
+        if should_update_epa:
+            schedule_competition_epa_update(self.competition_id)
 
-        # Queue video download task if conditions are met
         if should_download_video:
-            # Check if competition has any stream links configured
-            has_stream = any(
-                [
-                    self.competition.stream_link_day_1,
-                    self.competition.stream_link_day_2,
-                    self.competition.stream_link_day_3,
-                ]
+            logger.info(
+                f"Match {self.match_number} (competition {self.competition_id}) "
+                f"has_played changed to True"
             )
-
-            if has_stream:
-                # Queue background task to download video
-                from django_q.tasks import async_task
-
-                task_name = (
-                    f"download_video_match_{self.match_number}_{self.competition.code}"
-                )
-                logger.info(
-                    f"Queueing video download task for match {self.match_number} "
-                    f"({self.competition.code}): {task_name}"
-                )
-
-                async_task(
-                    "backend.tasks.download_match_video_task",
+            # Queue after commit so rolled-back imports never queue downloads
+            transaction.on_commit(
+                partial(
+                    queue_match_video_download,
                     self.pk,
-                    task_name=task_name,
-                )
-            else:
-                logger.debug(
-                    f"No stream links configured for competition {self.competition.code}, "
-                    f"skipping video download for match {self.match_number}"
+                    self.match_number,
+                    self.competition_id,
                 )
+            )
 
     class Meta:
         ordering = ["-id"]
         verbose_name_plural = "Matches"
 
 
+@receiver(post_delete, sender=Match)
+def remove_match_contribution(sender, instance, **kwargs):
+    """Take a deleted match back out of its teams' running stats and EPA"""
+    if instance.stats_contribution:
+        from .analytics.running_stats import apply_contributions
+
+        apply_contributions(instance.competition_id, [(instance.stats_contribution, [])])
+    if instance.has_played:
+        schedule_competition_epa_update(instance.competition_id)
+
+
+@contextmanager
+def defer_epa_updates():
+    """
+    Queue one EPA update per competition for every match write in the block.
+
+    Bulk writers (generate_competition, imports) store many results in a
+    row; each one would otherwise queue an update, and with BACKGROUND_DEV
+    each update runs inline. Usable as a decorator; nested blocks leave the
+    updates to the outermost one.
+    """
+    if _deferred_epa_updates.get() is not None:
+        yield
+        return
+
+    deferred = set()
+    token = _deferred_epa_updates.set(deferred)
+    try:
+        yield
+    finally:
+        _deferred_epa_updates.reset(token)
+        for competition_id in sorted(deferred):
+            schedule_competition_epa_update(competition_id)
+
+
+def schedule_competition_epa_update(competition_id: int):
+    """Queue an EPA update once the current transaction commits (see defer_epa_updates)"""
+    deferred = _deferred_epa_updates.get()
+    if deferred is not None:
+        deferred.add(competition_id)
+    else:
+        transaction.on_commit(partial(queue_competition_epa_update, competition_id))
+
+
+def queue_competition_epa_update(competition_id: int):
+    """Queue an EPA update of a competition whose match results changed"""
+    code = (
+        Competition.objects.filter(pk=competition_id)
+        .values_list("code", flat=True)
+        .first()
+    )
+    if code is None:
+        return
+
+    from .tasks import queue_epa_update
+
+    result = queue_epa_update(code)
+    logger.debug(f"EPA update for {code}: {result['reason']}")
+
+
+def queue_match_video_download(match_id: int, match_number: int, competition_id: int):
+    """Queue a match video download if its competition has streams and video sync on"""
+    competition = (
+        Competition.objects.filter(pk=competition_id)
+        .only(
+            "code",
+            "video_sync_enabled",
+            "stream_link_day_1",
+            "stream_link_day_2",
+            "stream_link_day_3",
+        )
+        .first()
+    )
+    if competition is None:
+        return
+
+    # Check if competition has any stream links configured
+    has_stream = any(
+        [
+            competition.stream_link_day_1,
+            competition.stream_link_day_2,
+            competition.stream_link_day_3,
+        ]
+    )
+
+    if has_stream and competition.video_sync_enabled:
+        # Queue background task to download video (once, however often the match is saved)
+        from .tasks import queue_video_download
+
+        result = queue_video_download(match_id, match_number, competition.code)
+        logger.info(
+            f"Video download for match {match_number} ({competition.code}): "
+            f"{result['reason']}"
+        )
+    else:
+        logger.debug(
+            f"No stream links configured or video sync disabled for competition "
+            f"{competition.code}, skipping video download for match {match_number}"
+        )
+
+
 class RobotAction(models.Model):
     ACTION_CHOICES = [
         ("traveling", "Traveling"),
@@ -374,3 +691,102 @@ class RobotAction(models.Model):
 
     class Meta:
         ordering = ["match", "start_time"]
+
+
+class MatchTimeline(models.Model):
+    """
+    Compact copy of a team's robot actions in a match.
+
+    Written with the RobotActions by backend.utils.robot_action_utils, so a
+    team's timelines can be read one row per match. actions packs one record
+    per action in start order (see robot_action_utils.TIMELINE_DTYPE): the
+    action code, start and end in centiseconds from match start, and fuel.
+    """
+
+    match = models.ForeignKey(
+        Match, on_delete=models.CASCADE, related_name="timelines"
+    )
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="timelines")
+    recorded_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    is_playoff = models.BooleanField(default=False)
+    action_count = models.IntegerField(default=0)
+    actions = models.BinaryField(default=bytes)
+    notes = models.TextField(blank=True, null=True)  # Stored once, not per action
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Team {self.team_id} - Match {self.match_id}: {self.action_count} actions"
+
+    class Meta:
+        unique_together = ["match", "team"]
+
+
+class SubmissionReceipt(models.Model):
+    """
+    Record of an applied robot action submission, keyed by the idempotency key
+    the scouting client generated for it. A retried upload with a known key is
+    answered from its receipt instead of being written again.
+    """
+
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    match = models.ForeignKey(
+        Match, on_delete=models.CASCADE, related_name="submission_receipts"
+    )
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="submission_receipts"
+    )
+    recorded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="submission_receipts",
+    )
+    action_count = models.IntegerField(default=0)  # RobotActions written
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.idempotency_key} (team {self.team_id}, match {self.match_id})"
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class CoalescedTask(models.Model):
+    """
+    Single-flight claim for a background task, one row per idempotency key.
+
+    See backend.utils.task_coalescing. Counters show how many triggers were
+    merged into an already queued or running execution.
+    """
+
+    STATE_CHOICES = [
+        ("idle", "Idle"),
+        ("queued", "Queued"),
+        ("running", "Running"),
+    ]
+
+    key = models.CharField(max_length=255, unique=True)  # e.g. func:match:42
+    func = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    task_name = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default="idle")
+    rerun_requested = models.BooleanField(default=False)
+
+    run_after = models.DateTimeField(null=True, blank=True)  # End of debounce window
+    requested_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    requests = models.IntegerField(default=0)  # Triggers received
+    runs = models.IntegerField(default=0)  # Executions started
+    suppressed = models.IntegerField(default=0)  # Triggers merged into another run
+
+    def __str__(self):
+        return f"{self.key} ({self.state})"
+
+    class Meta:
+        ordering = ["key"]
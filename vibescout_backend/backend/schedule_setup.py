@@ -1,85 +1,301 @@
 """
 Setup scheduled tasks for VibeScout background jobs.
 
-This module configures periodic tasks based on environment variables.
-Tasks are automatically registered when Django starts up.
+This module configures periodic tasks based on environment variables and the
+competitions marked for monitoring in the database. Tasks are automatically
+registered when Django starts up, and a competition's schedules are updated
+whenever it is saved.
 """
 
 import logging
 import os
+from datetime import timedelta
 
+from django.utils import timezone
 from django_q.models import Schedule
 
+from .task_queues import queue_for
+from .utils.task_coalescing import SCHEDULE_PREFIX
+
 logger = logging.getLogger(__name__)
 
+# Prefixes of the per-competition schedule names, followed by the competition code
+COMPETITION_SCHEDULE_PREFIXES = [
+    "sync_matches_",
+    "sync_rankings_",
+    "sync_videos_",
+    "team_stats_",
+]
+
+
+def background_tasks_enabled() -> bool:
+    return os.getenv("BACKGROUND_TASKS_ENABLED", "true").lower() == "true"
+
+
+def get_monitored_competitions() -> dict:
+    """
+    Competitions whose data should be synced in the background.
+
+    Returns:
+        dict mapping competition code to Competition (None when the code
+        comes from COMPCODE and the competition is not in the database yet)
+    """
+    from .models import Competition
+
+    monitored = {
+        competition.code: competition
+        for competition in Competition.objects.filter(monitoring_enabled=True)
+    }
+
+    # COMPCODE predates the monitoring flag and is always monitored
+    competition_code = os.getenv("COMPCODE")
+    if competition_code and competition_code not in monitored:
+        monitored[competition_code] = Competition.objects.filter(
+            code=competition_code
+        ).first()
+
+    return monitored
+
+
+def competition_schedules(competition_code: str, competition=None) -> dict:
+    """
+    Build the schedules one monitored competition needs.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp")
+        competition: Competition instance, if it exists in the database
+
+    Returns:
+        dict mapping schedule name to Schedule field values
+    """
+    schedules = {}
+
+    # Match sync: webhook backstop, per-competition fixed interval, or adaptive tick
+    sync_func = "backend.tasks.check_and_sync_new_matches"
+    sync_interval = int(os.getenv("TASK_CHECK_MATCHES_INTERVAL_MINUTES", "5"))
+    if os.getenv("TBA_WEBHOOK_SECRET"):
+        # Webhooks push results as they post; polling only reconciles missed messages
+        sync_interval = int(os.getenv("TASK_WEBHOOK_BACKSTOP_INTERVAL_MINUTES", "30"))
+    elif competition is not None and competition.sync_interval_minutes > 0:
+        sync_interval = competition.sync_interval_minutes
+    elif os.getenv("TASK_SYNC_SCHEDULER", "adaptive").lower() == "adaptive":
+        # Tick every minute; the task decides whether a TBA poll is due
+        sync_func = "backend.tasks.adaptive_sync_tick"
+        sync_interval = 1
+
+    # Note: args must be a string that can be parsed as a Python literal
+    schedules[f"sync_matches_{competition_code}"] = {
+        "func": sync_func,
+        "args": f'"{competition_code}"',
+        "minutes": sync_interval,
+    }
+
+    schedules[f"sync_rankings_{competition_code}"] = {
+        "func": "backend.tasks.sync_competition_rankings",
+        "args": f'"{competition_code}"',
+        "minutes": int(os.getenv("TASK_SYNC_RANKINGS_INTERVAL_MINUTES", "5")),
+    }
+
+    # Match writes keep team stats current; this full recompute checks for drift
+    schedules[f"team_stats_{competition_code}"] = {
+        "func": "backend.tasks.update_competition_team_stats",
+        "args": f'"{competition_code}"',
+        "minutes": int(os.getenv("TASK_TEAM_STATS_VERIFY_INTERVAL_MINUTES", "30")),
+    }
+
+    has_stream = competition is not None and any(
+        [
+            competition.stream_link_day_1,
+            competition.stream_link_day_2,
+            competition.stream_link_day_3,
+        ]
+    )
+    if has_stream and competition.video_sync_enabled:
+        schedules[f"sync_videos_{competition_code}"] = {
+            "func": "backend.tasks.sync_competition_videos",
+            "args": f'"{competition_code}"',
+            "minutes": int(os.getenv("TASK_VIDEO_SYNC_INTERVAL_MINUTES", "10")),
+        }
+
+    return schedules
+
+
+def _schedule_values(spec: dict) -> dict:
+    return {
+        "func": spec["func"],
+        "args": spec.get("args"),
+        "schedule_type": Schedule.MINUTES,
+        "minutes": spec["minutes"],
+        "repeats": -1,  # Repeat indefinitely
+        "cluster": queue_for(spec["func"]),  # Only that queue's cluster runs it
+    }
+
+
+def reconcile_schedules(wanted: dict, existing) -> dict:
+    """
+    Make the existing schedules match the wanted ones.
+
+    Unchanged schedules are left alone, so their next run time survives a
+    restart. Changed schedules are updated in place (and run no later than
+    one new interval from now), missing ones are created and the rest of
+    ``existing``, including duplicate names, is deleted.
+
+    Args:
+        wanted: dict mapping schedule name to its spec (func, args, minutes)
+        existing: Schedule queryset the wanted schedules are reconciled against
+
+    Returns:
+        dict with created, updated, removed and unchanged counts
+    """
+    counts = {"created": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    current = {}
+    stale = []
+    for schedule in existing:
+        if schedule.name in wanted and schedule.name not in current:
+            current[schedule.name] = schedule
+        else:
+            stale.append(schedule.pk)
+
+    if stale:
+        counts["removed"] = Schedule.objects.filter(pk__in=stale).delete()[0]
+
+    for name, spec in wanted.items():
+        values = _schedule_values(spec)
+        schedule = current.get(name)
+
+        if schedule is None:
+            Schedule.objects.create(name=name, **values)
+            counts["created"] += 1
+            logger.info(
+                f"Scheduled {name} ({spec['func']}) every {spec['minutes']} minutes"
+            )
+            continue
+
+        changed = [
+            field for field, value in values.items() if getattr(schedule, field) != value
+        ]
+        if not changed:
+            counts["unchanged"] += 1
+            continue
+
+        for field, value in values.items():
+            setattr(schedule, field, value)
+        next_run_limit = timezone.now() + timedelta(minutes=spec["minutes"])
+        if schedule.next_run is None or schedule.next_run > next_run_limit:
+            schedule.next_run = next_run_limit
+        schedule.save()
+        counts["updated"] += 1
+        logger.info(f"Updated {name} ({spec['func']}) to every {spec['minutes']} minutes")
+
+    return counts
+
+
+def wanted_schedules() -> dict:
+    """
+    Every schedule the environment and monitored competitions call for.
+
+    Returns:
+        dict mapping schedule name to Schedule field values
+    """
+    schedules = {}
+
+    # One set of schedules per competition; the cluster's workers run them side by side
+    for competition_code, competition in get_monitored_competitions().items():
+        schedules.update(competition_schedules(competition_code, competition))
+
+    # Schedule periodic cleanup task
+    schedules["cleanup_old_tasks_periodic"] = {
+        "func": "backend.tasks.cleanup_old_tasks",
+        "minutes": int(
+            os.getenv("TASK_CLEANUP_INTERVAL_MINUTES", "1440")
+        ),  # 24 hours default
+    }
+
+    return schedules
+
 
 def setup_scheduled_tasks():
     """
     Setup all scheduled tasks based on environment variables.
 
     This function is called automatically when Django starts (via apps.py).
-    It clears existing schedules and recreates them to ensure consistency.
+    It reconciles the existing schedules with the wanted ones, so running it
+    again (e.g. on every dev reload) changes nothing and keeps next run times.
 
     Environment Variables:
-        TASK_CHECK_MATCHES_INTERVAL_MINUTES: How often to check for new matches (default: 5)
+        TASK_SYNC_SCHEDULER: "adaptive" to poll around predicted match times (see
+            utils.sync_scheduler for its intervals) or "fixed" (default: adaptive)
+        TASK_CHECK_MATCHES_INTERVAL_MINUTES: How often to check for new matches with
+            the fixed scheduler (default: 5)
+        TASK_WEBHOOK_BACKSTOP_INTERVAL_MINUTES: Match check interval when TBA webhooks
+            are enabled via TBA_WEBHOOK_SECRET (default: 30)
+        TASK_SYNC_RANKINGS_INTERVAL_MINUTES: How often to sync team rankings (default: 5)
+        TASK_VIDEO_SYNC_INTERVAL_MINUTES: How often to queue missing match videos (default: 10)
         TASK_CLEANUP_INTERVAL_MINUTES: How often to clean up old tasks (default: 1440 = 24h)
         TASK_RETENTION_DAYS: How many days to keep completed tasks (default: 7)
-        COMPCODE: Competition code to monitor for new matches
+        COMPCODE: Competition code to monitor in addition to competitions with
+            monitoring_enabled set
         BACKGROUND_DEV: If true, tasks run immediately; if false, queued for qcluster
+        DJANGO_Q_QUEUES: If true, tasks run on the named queues in task_queues (default: true)
+
+    Returns:
+        dict with created, updated, removed and unchanged counts (None when
+        background tasks are disabled)
     """
 
     # Check if background tasks should be enabled
-    background_enabled = os.getenv("BACKGROUND_TASKS_ENABLED", "true").lower() == "true"
-
-    if not background_enabled:
+    if not background_tasks_enabled():
         logger.info(
             "Background tasks disabled by BACKGROUND_TASKS_ENABLED env variable"
         )
-        return
+        return None
 
-    # Clear existing schedules to prevent duplicates and ensure consistency
-    existing_count = Schedule.objects.count()
-    if existing_count > 0:
-        Schedule.objects.all().delete()
-        logger.info(f"Cleared {existing_count} existing scheduled task(s)")
+    if os.getenv("TBA_WEBHOOK_SECRET"):
+        logger.info("TBA webhooks enabled - match polling is a reconciliation backstop")
 
-    # Get schedule intervals from environment (in minutes)
-    check_matches_interval = int(os.getenv("TASK_CHECK_MATCHES_INTERVAL_MINUTES", "5"))
-    cleanup_interval = int(
-        os.getenv("TASK_CLEANUP_INTERVAL_MINUTES", "1440")
-    )  # 24 hours default
+    wanted = wanted_schedules()
+    if not any(name.startswith("sync_matches_") for name in wanted):
+        logger.warning(
+            "No competitions monitored (set monitoring_enabled or COMPCODE) - "
+            "match checking tasks will not be scheduled"
+        )
 
-    # Get competition code
-    competition_code = os.getenv("COMPCODE")
+    # Pending debounced runs (see utils.task_coalescing) hold task claims, so keep them
+    counts = reconcile_schedules(
+        wanted, Schedule.objects.exclude(name__startswith=SCHEDULE_PREFIX)
+    )
 
-    if not competition_code:
-        logger.warning("COMPCODE not set - match checking task will not be scheduled")
-    else:
-        # Schedule periodic task to check for new matches
-        # Note: args must be a string that can be parsed as a Python literal
-        Schedule.objects.create(
-            name="check_new_matches_periodic",
-            func="backend.tasks.check_and_sync_new_matches",
-            args=f'"{competition_code}"',  # Properly quote the string argument
-            schedule_type=Schedule.MINUTES,
-            minutes=check_matches_interval,
-            repeats=-1,  # Repeat indefinitely
-        )
-        logger.info(
-            f"Scheduled match checking task every {check_matches_interval} minutes for {competition_code}"
-        )
+    logger.info(
+        f"Scheduled tasks configured: {counts['created']} created, "
+        f"{counts['updated']} updated, {counts['removed']} removed, "
+        f"{counts['unchanged']} unchanged"
+    )
+    return counts
 
-    # Schedule periodic cleanup task
-    Schedule.objects.create(
-        name="cleanup_old_tasks_periodic",
-        func="backend.tasks.cleanup_old_tasks",
-        schedule_type=Schedule.MINUTES,
-        minutes=cleanup_interval,
-        repeats=-1,  # Repeat indefinitely
+
+def update_competition_schedules(competition):
+    """
+    Create, update or remove one competition's schedules to match its settings.
+
+    Called from Competition.save so toggling monitoring in the admin takes
+    effect without restarting the server.
+
+    Args:
+        competition: Saved Competition instance
+    """
+    if not background_tasks_enabled():
+        return
+
+    monitored = competition.monitoring_enabled or competition.code == os.getenv(
+        "COMPCODE"
     )
-    logger.info(f"Scheduled cleanup task every {cleanup_interval} minutes")
+    wanted = competition_schedules(competition.code, competition) if monitored else {}
 
-    logger.info("All scheduled tasks configured successfully")
+    names = [f"{prefix}{competition.code}" for prefix in COMPETITION_SCHEDULE_PREFIXES]
+    counts = reconcile_schedules(wanted, Schedule.objects.filter(name__in=names))
+    if counts["removed"]:
+        logger.info(f"Removed {counts['removed']} schedule(s) for {competition.code}")
 
 
 def clear_all_scheduled_tasks():
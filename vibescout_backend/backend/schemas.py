@@ -2,7 +2,7 @@ from decimal import Decimal
 from typing import Optional
 
 from django.contrib.auth.models import User
-from ninja import ModelSchema, Schema
+from ninja import Field, ModelSchema, Schema
 
 from .models import Competition, Match, RobotAction, Team, TeamInfo
 
@@ -348,6 +348,185 @@ class BulkRobotActionsSchema(Schema):
     competition_code: str
     match_number: int
     is_playoff: bool = False
+    set_number: Optional[int] = None  # Playoff set; needed when sets share match_number
     notes: Optional[str] = None
     auto: list[RobotActionItemSchema]  # List of autonomous actions
     tele: list[RobotActionItemSchema]  # List of teleop actions
+
+
+class BatchRobotActionSubmissionSchema(BulkRobotActionsSchema):
+    """One team-match submission in a batch upload"""
+
+    idempotency_key: str = Field(
+        ..., min_length=1, max_length=64
+    )  # Generated by the client, reused on retries
+
+
+class BatchRobotActionsSchema(Schema):
+    """Schema for uploading several queued submissions at once"""
+
+    submissions: list[BatchRobotActionSubmissionSchema]
+
+
+class BatchSubmissionResultSchema(Schema):
+    idempotency_key: str
+    status: str  # created, duplicate, not_found or rejected
+    actions: int = 0  # Robot actions stored for the submission
+    error: Optional[str] = None
+
+
+class BatchRobotActionsResultSchema(Schema):
+    created: int
+    duplicates: int
+    failed: int
+    results: list[BatchSubmissionResultSchema]
+
+
+class OprTeamSchema(Schema):
+    rank: int
+    team_number: int
+    team_name: str
+    matches: int  # Rated matches played
+    opr: float
+    dpr: float
+    ccwm: float
+    components: dict[str, float]  # Component OPRs: auto, teleop, endgame, fuel
+
+
+class OprRankingSchema(Schema):
+    competition_code: str
+    sort: str
+    match_count: int  # Matches the ratings were solved from
+    teams: list[OprTeamSchema]
+
+
+class MatchPredictionSchema(Schema):
+    match_number: int
+    match_type: str
+    has_played: bool
+    blue_teams: list[int]  # Team numbers
+    red_teams: list[int]
+    blue_win_probability: float
+    red_win_probability: float
+    tie_probability: float
+    blue_expected_score: float
+    red_expected_score: float
+    blue_score_range: list[float]  # 10th, 50th and 90th percentile
+    red_score_range: list[float]
+    blue_ranking_point_odds: dict[str, float]  # Match result RP -> probability
+    red_ranking_point_odds: dict[str, float]
+    data_version: str  # Played results the prediction is based on
+
+
+class RankProjectionTeamSchema(Schema):
+    team_number: int
+    team_name: str
+    current_rank: Optional[int]  # Official rank, when synced
+    scheduled_matches: int
+    current_ranking_points: float  # From played qualification matches
+    expected_ranking_points: float  # Mean final total
+    mean_rank: float
+    rank_range: list[int]  # 10th, 50th and 90th percentile rank
+    captain_probability: float  # Probability of finishing in the top 8
+    rank_probabilities: list[float]  # Index 0 is first place
+
+
+class RankProjectionSchema(Schema):
+    competition_code: str
+    simulations: int
+    played_matches: int
+    remaining_matches: int
+    data_version: str  # Schedule and results the projection is based on
+    teams: list[RankProjectionTeamSchema]
+
+
+class FirstPickSchema(Schema):
+    team_number: int
+    team_name: str
+    win_probability: float  # Average against the other projected alliances
+    alliance_score: float  # Expected score of the final alliance
+    expected_second_pick: Optional[int]  # Team number
+    likely_available: bool  # Not expected to go to a higher seed first
+
+
+class SecondPickSchema(Schema):
+    team_number: int
+    team_name: str
+    alliance_score: float  # With the best first pick
+    likely_available: bool  # Expected to be left at our second pick
+
+
+class PickListSchema(Schema):
+    competition_code: str
+    team_number: int
+    seed: int
+    captains: list[int]  # Team numbers in seed order
+    first_picks: list[FirstPickSchema]
+    second_picks: list[SecondPickSchema]
+    alliances: list[list[int]]  # Projected by the best plan, in seed order
+    evaluated: int  # Draft outcomes played out
+    pruned: int  # Second picks skipped by the search bound
+
+
+class EpaPointSchema(Schema):
+    match_type: Optional[str]  # None for the starting rating
+    match_number: Optional[int]
+    set_number: Optional[int]
+    epa: dict[str, float]  # Component -> rating after the match
+
+
+class EpaTeamSchema(Schema):
+    rank: int
+    team_number: int
+    team_name: str
+    matches: int  # Played at this competition
+    epa: dict[str, float]  # total, auto, teleop and endgame
+    seeded_from: Optional[str]  # Code of the earlier event the rating started from
+    history: list[EpaPointSchema] = []
+
+
+class EpaRankingSchema(Schema):
+    competition_code: str
+    sort: str
+    rated_matches: int
+    teams: list[EpaTeamSchema]
+
+
+class TimelineMatchSchema(Schema):
+    match_number: int
+    set_number: int
+    match_type: str
+    is_playoff: bool
+    action_count: int
+    notes: Optional[str]
+
+
+class TeamTimelinesSchema(Schema):
+    competition_code: str
+    team_number: int
+    action_types: list[str]  # Indexed by action code; 255 is any other type
+    matches: list[TimelineMatchSchema]
+    # Actions of every match concatenated in match order, one list per column;
+    # the actions of matches[i] are offsets[i]:offsets[i + 1]
+    offsets: list[int]
+    action: list[int]
+    start: list[int]  # Centiseconds from match start
+    end: list[int]
+    fuel: list[int]
+
+
+class TeamActionSummarySchema(Schema):
+    team_number: int
+    team_name: str
+    scouted_matches: int
+    scouted_seconds: float
+    action_seconds: dict[str, float]  # Action type -> seconds
+    time_share: dict[str, float]  # Action type -> share of scouted time
+    fuel_scored: int
+    shooting_seconds: float
+    fuel_per_shooting_second: Optional[float]
+    cycle_count: int
+    avg_cycle_time: Optional[float]
+    defense_seconds_per_match: float
+    disabled_rate: float
+
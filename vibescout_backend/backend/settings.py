@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.middleware.gzip.GZipMiddleware",  # Compress responses
+    "backend.middleware.GzipRequestMiddleware",  # Decompress gzip request bodies
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -100,6 +102,22 @@ DATABASES = {
     }
 }
 
+# Caches
+# The "tba" cache holds TBA API responses and is file based so every
+# qcluster worker shares it (see backend.utils.tba_client)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "tba": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv(
+            "TBA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vibescout_tba_cache")
+        ),
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -224,3 +242,29 @@ Q_CLUSTER = {
     "cached": False,  # Don't use cache for broker (using ORM)
     "sync": BACKGROUND_DEV,  # Run tasks synchronously in dev, asynchronously in prod
 }
+
+
+def _queue_cluster(queue, workers, timeout, retry, max_attempts):
+    """Settings of a named queue; DJANGO_Q_<QUEUE>_* env variables override them"""
+    prefix = f"DJANGO_Q_{queue.upper()}"
+    return {
+        "workers": int(os.getenv(f"{prefix}_WORKERS", workers)),
+        "timeout": int(os.getenv(f"{prefix}_TIMEOUT", timeout)),  # retry must exceed it
+        "retry": int(os.getenv(f"{prefix}_RETRY", retry)),
+        "max_attempts": int(os.getenv(f"{prefix}_MAX_ATTEMPTS", max_attempts)),
+    }
+
+
+# Named queues, each served by its own `Q_CLUSTER_NAME=<queue> manage.py qcluster`
+# process so a burst of long video downloads cannot hold up TBA syncs. Tasks are routed to
+# them in backend.task_queues; the main cluster runs cleanup and unrouted tasks.
+Q_CLUSTER["ALT_CLUSTERS"] = {
+    # TBA syncs are short and rerun by their schedule, so don't retry them
+    "sync": _queue_cluster("sync", workers=2, timeout=120, retry=180, max_attempts=1),
+    "video": _queue_cluster(
+        "video", workers=2, timeout=1800, retry=2100, max_attempts=2
+    ),
+    "analytics": _queue_cluster(
+        "analytics", workers=1, timeout=600, retry=900, max_attempts=1
+    ),
+}
@@ -0,0 +1,109 @@
+"""
+Named django-q queues for VibeScout background jobs.
+
+Each queue in Q_CLUSTER["ALT_CLUSTERS"] is served by its own qcluster process
+with its own workers, timeout and retry policy (see settings.py). TASK_QUEUES
+declares which queue every task runs on; tasks not listed run on the main
+cluster. Set DJANGO_Q_QUEUES=false to run everything on the main cluster
+when only one `qcluster` process is started.
+"""
+
+import logging
+import os
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Name the main cluster's queue is reported under
+DEFAULT_QUEUE = "default"
+
+TASK_QUEUES = {
+    "backend.tasks.check_and_sync_new_matches": "sync",
+    "backend.tasks.adaptive_sync_tick": "sync",
+    "backend.tasks.sync_all_competition_matches": "sync",
+    "backend.tasks.sync_competition_schedule": "sync",
+    "backend.tasks.sync_competition_rankings": "sync",
+    "backend.tasks.sync_competition_videos": "sync",  # Only queues downloads
+    "backend.tasks.download_match_video_task": "video",
+    "backend.tasks.update_competition_team_stats": "analytics",
+    "backend.tasks.update_competition_epa": "analytics",
+}
+
+
+def queues_enabled() -> bool:
+    return os.getenv("DJANGO_Q_QUEUES", "true").lower() == "true"
+
+
+def queue_for(func: str) -> Optional[str]:
+    """
+    Queue a task runs on.
+
+    Args:
+        func: Dotted path of the task function
+
+    Returns:
+        Queue name to pass as django-q's cluster, or None for the main cluster
+    """
+    if not queues_enabled():
+        return None
+    return TASK_QUEUES.get(func)
+
+
+def queue_setting(queue: Optional[str], name: str):
+    """Q_CLUSTER setting (e.g. "timeout") as it applies to a queue"""
+    alt_clusters = settings.Q_CLUSTER.get("ALT_CLUSTERS", {})
+    return alt_clusters.get(queue, {}).get(name, settings.Q_CLUSTER.get(name))
+
+
+def queue_status() -> dict:
+    """
+    Depth of every queue, read from the ORM broker in one query.
+
+    Queued tasks are waiting for a worker; running tasks have been pulled by
+    a worker and stay locked until they finish or their retry time passes.
+
+    Returns:
+        dict mapping queue name to its queued/running counts, age of the
+        oldest queued task in seconds, and workers/timeout/retry settings
+    """
+    from django_q.models import OrmQ
+
+    now = timezone.now()
+    default_cluster = settings.Q_CLUSTER["name"]
+    queues = [None, *settings.Q_CLUSTER.get("ALT_CLUSTERS", {})]
+
+    depths = {
+        row["key"]: row
+        for row in OrmQ.objects.values("key").annotate(
+            queued=Count("id", filter=Q(lock__lte=now)),
+            running=Count("id", filter=Q(lock__gt=now)),
+            # The lock holds the enqueue time until a worker pulls the task
+            oldest=Min("lock", filter=Q(lock__lte=now)),
+        )
+    }
+
+    status = {}
+    for queue in queues:
+        depth = depths.get(queue or default_cluster, {})
+        oldest = depth.get("oldest")
+        status[queue or DEFAULT_QUEUE] = {
+            "queued": depth.get("queued", 0),
+            "running": depth.get("running", 0),
+            "oldest_queued_seconds": (
+                round((now - oldest).total_seconds()) if oldest else None
+            ),
+            "workers": queue_setting(queue, "workers"),
+            "timeout": queue_setting(queue, "timeout"),
+            "retry": queue_setting(queue, "retry"),
+            "tasks": sorted(
+                func.rsplit(".", 1)[-1]
+                for func, routed in TASK_QUEUES.items()
+                if queue and routed == queue
+            ),
+        }
+
+    return status
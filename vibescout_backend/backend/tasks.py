@@ -7,9 +7,9 @@ and perform other maintenance operations.
 
 import logging
 import os
+import time
 from typing import Optional
 
-import tbapy
 from django.db.models import Max
 
 logger = logging.getLogger(__name__)
@@ -32,7 +32,8 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
         dict with status information about the sync
     """
     from .models import Competition, Match
-    from .utils.match_utils import add_match_from_tba
+    from .utils.match_utils import add_match_from_tba, new_write_stats
+    from .utils.tba_client import get_tba_client
 
     # Get competition code from env if not provided
     if not competition_code:
@@ -59,7 +60,7 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
         return {"success": False, "error": f"Competition {competition_code} not found"}
 
     # Initialize TBA client
-    tba = tbapy.TBA(tba_api_key)
+    tba = get_tba_client(tba_api_key)
 
     # Get the lowest match number with has_played=False, or the next match after the highest
     unplayed_match = (
@@ -92,6 +93,7 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
     try:
         # Use the existing add_match_from_tba utility
         # This will create OR update the match with latest data from TBA
+        write_stats = new_write_stats()
         match = add_match_from_tba(
             tba_client=tba,
             competition_code=competition_code,
@@ -99,10 +101,17 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
             match_type_code="qm",
             set_number=1,
             stdout=None,  # Don't print to stdout in background task
+            stats=write_stats,
+        )
+        write = next(
+            status
+            for status in ("created", "updated", "unchanged")
+            if write_stats[status]
         )
 
         logger.info(
-            f"Successfully updated match {start_match_number} (has_played: {match.has_played})"
+            f"Successfully synced match {start_match_number} (has_played: {match.has_played}, "
+            f"{write}, {write_stats['columns_written']} columns written)"
         )
 
         return {
@@ -111,6 +120,8 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
             "match_number": start_match_number,
             "match_key": match_key,
             "has_played": match.has_played,
+            "write": write,
+            "columns_written": write_stats["columns_written"],
             "blue_teams": [
                 match.blue_team_1.number,
                 match.blue_team_2.number,
@@ -126,7 +137,11 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
     except Exception as e:
         # Match doesn't exist or error occurred
         error_msg = str(e).lower()
-        if "404" in error_msg or "not found" in error_msg:
+        if (
+            "404" in error_msg
+            or "not found" in error_msg
+            or "does not exist" in error_msg
+        ):
             logger.info(f"Match {match_key} not found in TBA")
             return {
                 "success": True,
@@ -143,6 +158,134 @@ def check_and_sync_new_matches(competition_code: Optional[str] = None) -> dict:
             }
 
 
+def adaptive_sync_tick(
+    competition_code: Optional[str] = None, now: Optional[int] = None
+) -> dict:
+    """
+    Run check_and_sync_new_matches only when the adaptive scheduler says a poll is due.
+
+    Scheduled every minute. Polls quickly while a match result is expected and
+    backs off during gaps and overnight, based on the predicted time of the
+    first unplayed qualification match after the latest result (see
+    utils.sync_scheduler), so an overdue result such as a replayed match does
+    not hold back the matches after it. While an earlier match is still
+    unplayed, or the next result is overdue, each poll syncs the whole event
+    schedule in one request instead of the lowest unplayed match.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+        now: Unix timestamp to plan for (defaults to the current time)
+
+    Returns:
+        dict with the poll decision and, if polled, the sync result
+    """
+    from .models import Competition, Match
+    from .utils.sync_scheduler import (
+        CATCH_UP_POLL_LIMIT,
+        RESULT_WINDOW_START_SECONDS,
+        plan_poll,
+    )
+
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    if now is None:
+        now = int(time.time())
+
+    qualification_matches = Match.objects.filter(
+        competition=competition, match_type="qualification"
+    )
+    unplayed = qualification_matches.filter(has_played=False).order_by("match_number")
+
+    def next_match():
+        """(match_number, predicted_match_time) to plan from, and the latest result time"""
+        latest = qualification_matches.filter(has_played=True).aggregate(
+            Max("match_number"), Max("end_match_time")
+        )
+        columns = ("match_number", "predicted_match_time")
+        upcoming = (
+            unplayed.filter(match_number__gt=latest["match_number__max"] or 0)
+            .values_list(*columns)
+            .first()
+            or unplayed.values_list(*columns).first()
+            or (None, None)
+        )
+        return upcoming, latest["end_match_time__max"]
+
+    (next_match_number, next_predicted_time), last_result_time = next_match()
+
+    decision = plan_poll(
+        next_predicted_time=next_predicted_time or 0,
+        last_result_time=last_result_time or 0,
+        last_poll_time=competition.last_sync_poll_time,
+        now=now,
+    )
+    if not decision["poll"]:
+        logger.info(
+            f"Sync scheduler {competition_code}: skip ({decision['mode']}, "
+            f"{decision['reason']}, last poll {decision['since_last_poll']}s ago, "
+            f"interval {decision['interval']}s)"
+        )
+        return {"success": True, "polled": False, **decision}
+
+    # Behind a stuck match, or while the next result is overdue, one request
+    # for the whole event stores every posted result including the stuck one
+    full_sync = decision["mode"] in ("late", "stalled") or (
+        next_match_number is not None
+        and unplayed.filter(match_number__lt=next_match_number).exists()
+    )
+    logger.info(
+        f"Sync scheduler {competition_code}: poll ({decision['mode']}, "
+        f"{decision['reason']}, interval {decision['interval']}s"
+        f"{', full schedule' if full_sync else ''})"
+    )
+    Competition.objects.filter(pk=competition.pk).update(last_sync_poll_time=now)
+    polls = 1
+    if full_sync:
+        result = sync_competition_schedule(competition_code)
+        writes = {
+            status: result.get(f"{status}_matches", 0)
+            for status in ("created", "updated", "unchanged")
+        }
+    else:
+        result = check_and_sync_new_matches(competition_code)
+        writes = {result.get("write"): 1}
+
+    # A result just landed; keep going while the following matches are overdue too
+    while not full_sync and result.get("has_played") and polls < CATCH_UP_POLL_LIMIT:
+        (_, next_predicted_time), _ = next_match()
+        if not next_predicted_time or now < next_predicted_time + RESULT_WINDOW_START_SECONDS:
+            break
+        result = check_and_sync_new_matches(competition_code)
+        polls += 1
+        writes[result.get("write")] = writes.get(result.get("write"), 0) + 1
+
+    if polls > 1:
+        logger.info(f"Sync scheduler {competition_code}: caught up with {polls} polls")
+
+    return {
+        "success": result["success"],
+        "polled": True,
+        "polls": polls,
+        "writes": writes,
+        "full_sync": full_sync,
+        **decision,
+        "sync": result,
+    }
+
+
 def sync_all_competition_matches(competition_code: Optional[str] = None) -> dict:
     """
     Full sync of all matches for a competition from TBA.
@@ -157,8 +300,9 @@ def sync_all_competition_matches(competition_code: Optional[str] = None) -> dict
     Returns:
         dict with status information about the sync
     """
-    from .models import Competition
-    from .utils.match_utils import import_match_from_dict
+    from .models import Competition, defer_epa_updates
+    from .utils.match_utils import import_match_from_dict, new_write_stats
+    from .utils.tba_client import get_tba_client
 
     # Get competition code from env if not provided
     if not competition_code:
@@ -185,29 +329,43 @@ def sync_all_competition_matches(competition_code: Optional[str] = None) -> dict
         return {"success": False, "error": f"Competition {competition_code} not found"}
 
     # Initialize TBA client
-    tba = tbapy.TBA(tba_api_key)
+    tba = get_tba_client(tba_api_key)
 
     try:
         # Fetch all matches for the event
         matches = tba.event_matches(competition_code)
         logger.info(f"Retrieved {len(matches)} matches from TBA")
 
-        # Import each match
+        # Import each match, with one EPA update for all of them
         matches_imported = 0
-        for match_data in matches:
-            try:
-                import_match_from_dict(match_data, competition, stdout=None)
-                matches_imported += 1
-            except Exception as e:
-                logger.error(f"Error importing match {match_data.get('key')}: {str(e)}")
+        write_stats = new_write_stats()
+        with defer_epa_updates():
+            for match_data in matches:
+                try:
+                    import_match_from_dict(
+                        match_data, competition, stdout=None, stats=write_stats
+                    )
+                    matches_imported += 1
+                except Exception as e:
+                    logger.error(
+                        f"Error importing match {match_data.get('key')}: {str(e)}"
+                    )
 
-        logger.info(f"Successfully imported {matches_imported} matches")
+        logger.info(
+            f"Successfully imported {matches_imported} matches "
+            f"({write_stats['created']} created, {write_stats['updated']} updated, "
+            f"{write_stats['unchanged']} unchanged)"
+        )
 
         return {
             "success": True,
             "message": f"Imported {matches_imported} of {len(matches)} matches",
             "total_matches": len(matches),
             "imported_matches": matches_imported,
+            "created_matches": write_stats["created"],
+            "updated_matches": write_stats["updated"],
+            "unchanged_matches": write_stats["unchanged"],
+            "columns_written": write_stats["columns_written"],
         }
 
     except Exception as e:
@@ -215,10 +373,257 @@ def sync_all_competition_matches(competition_code: Optional[str] = None) -> dict
         return {"success": False, "error": f"Error syncing matches: {str(e)}"}
 
 
+def sync_competition_schedule(competition_code: Optional[str] = None) -> dict:
+    """
+    Sync a competition's match schedule from TBA in one request.
+
+    Queued when TBA sends a schedule_updated webhook. Matches are written
+    through the bulk importer, so unplayed matches stay unplayed and new
+    schedule entries are created as blank matches.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+
+    Returns:
+        dict with status information about the sync
+    """
+    from .models import Competition, defer_epa_updates
+    from .utils.match_utils import import_matches_bulk
+    from .utils.tba_client import get_tba_client
+
+    # Get competition code from env if not provided
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    logger.info(f"Syncing match schedule for competition: {competition_code}")
+
+    # Get TBA API key
+    tba_api_key = os.getenv("TBA_API_KEY")
+    if not tba_api_key:
+        logger.error("TBA_API_KEY not set in environment variables")
+        return {"success": False, "error": "TBA_API_KEY not configured"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    tba = get_tba_client(tba_api_key)
+
+    try:
+        matches = tba.event_matches(competition_code)
+        with defer_epa_updates():
+            stats = import_matches_bulk(matches, competition)
+    except Exception as e:
+        logger.error(f"Error syncing schedule for {competition_code}: {str(e)}")
+        return {"success": False, "error": f"Error syncing schedule: {str(e)}"}
+
+    logger.info(
+        f"Schedule sync for {competition_code}: {stats['created']} created, "
+        f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+        f"{stats['skipped']} skipped"
+    )
+
+    return {
+        "success": True,
+        "message": f"Synced schedule of {len(matches)} matches",
+        "created_matches": stats["created"],
+        "updated_matches": stats["updated"],
+        "unchanged_matches": stats["unchanged"],
+        "skipped_matches": stats["skipped"],
+        "columns_written": stats["columns_written"],
+    }
+
+
+def sync_competition_rankings(competition_code: Optional[str] = None) -> dict:
+    """
+    Sync team rankings (rank, record and ranking points) from TBA.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+
+    Returns:
+        dict with status information about the sync
+    """
+    from .models import Competition
+    from .utils.ranking_utils import apply_event_rankings
+    from .utils.tba_client import get_tba_client
+
+    # Get competition code from env if not provided
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    # Get TBA API key
+    tba_api_key = os.getenv("TBA_API_KEY")
+    if not tba_api_key:
+        logger.error("TBA_API_KEY not set in environment variables")
+        return {"success": False, "error": "TBA_API_KEY not configured"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    tba = get_tba_client(tba_api_key)
+
+    try:
+        rankings_data = tba.event_rankings(competition_code)
+    except TypeError:
+        # TBA returns null rankings until the first qualification match is played
+        return {"success": True, "message": "No rankings available yet", "updated": 0}
+    except Exception as e:
+        logger.error(f"Error fetching rankings for {competition_code}: {str(e)}")
+        return {"success": False, "error": f"Error fetching rankings: {str(e)}"}
+
+    stats = apply_event_rankings(rankings_data, competition)
+    logger.info(
+        f"Rankings sync for {competition_code}: {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged"
+    )
+
+    return {
+        "success": True,
+        "message": f"Updated {stats['updated']} team rankings",
+        "updated": stats["updated"],
+        "unchanged": stats["unchanged"],
+        "missing_teams": stats["missing"],
+    }
+
+
+def update_competition_team_stats(competition_code: Optional[str] = None) -> dict:
+    """
+    Check a competition's running team stats against a full recompute.
+
+    Match writes update the running stats incrementally; this periodic task
+    repairs any drift from them and refreshes the stats on every TeamInfo.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+
+    Returns:
+        dict with the largest drift found and the number of teams updated
+    """
+    from .analytics.running_stats import verify_running_stats
+    from .models import Competition
+
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    stats = verify_running_stats(competition)
+
+    return {
+        "success": True,
+        "message": (
+            f"Checked stats of {stats['teams']} teams (drift {stats['drift']:.3g}), "
+            f"updated {stats['updated']}"
+        ),
+        **stats,
+    }
+
+
+def update_competition_epa(competition_code: Optional[str] = None) -> dict:
+    """
+    Apply a competition's newly played matches to its EPA ratings.
+
+    Queued by queue_epa_update whenever a match result is stored; rates the
+    competition again when an already rated match changed.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+
+    Returns:
+        dict with the update method and the matches applied
+    """
+    from .analytics.epa import update_competition_epa as update_epa
+    from .models import Competition
+
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    result = update_epa(competition)
+
+    return {
+        "success": True,
+        "message": f"EPA {result['method']}, {result['applied']} matches applied",
+        **result,
+    }
+
+
+def queue_epa_update(competition_code: str) -> dict:
+    """
+    Queue update_competition_epa once per burst of match results.
+
+    Results stored within TASK_EPA_DEBOUNCE_SECONDS (default: 10) share one
+    update, and results stored while it runs trigger one more.
+
+    Returns:
+        enqueue_once result (queued, reason, key)
+    """
+    from .utils.task_coalescing import coalesce_key, enqueue_once
+
+    func = "backend.tasks.update_competition_epa"
+    return enqueue_once(
+        func,
+        competition_code,
+        key=coalesce_key(func, competition=competition_code),
+        debounce=int(os.getenv("TASK_EPA_DEBOUNCE_SECONDS", "10")),
+        rerun=True,
+        task_name=f"update_epa_{competition_code}",
+    )
+
+
 def cleanup_old_tasks() -> dict:
     """
     Clean up old completed tasks from Django Q to prevent database bloat.
 
+    Rows are deleted in small primary key ordered chunks with a pause between
+    them, so the database write lock is never held for long.
+
+    Environment Variables:
+        TASK_RETENTION_DAYS: How many days to keep completed tasks (default: 7)
+        TASK_CLEANUP_CHUNK_SIZE: Rows deleted per transaction (default: 500)
+        TASK_CLEANUP_PAUSE_SECONDS: Pause between chunks (default: 0.05)
+        TASK_CLEANUP_MAX_RESULT_BYTES: Clear larger stored results of the tasks
+            that are kept (default: 0 = keep all results)
+
     Returns:
         dict with cleanup status
     """
@@ -227,27 +632,60 @@ def cleanup_old_tasks() -> dict:
     from django.utils import timezone
     from django_q.models import Failure, Success
 
+    from .utils.task_cleanup import (
+        delete_in_chunks,
+        new_cleanup_stats,
+        strip_large_results,
+    )
+
     # Keep tasks for the number of days specified in env (default 7 days)
     retention_days = int(os.getenv("TASK_RETENTION_DAYS", "7"))
     cutoff_date = timezone.now() - timedelta(days=retention_days)
+    chunk_size = int(os.getenv("TASK_CLEANUP_CHUNK_SIZE", "500"))
+    pause = float(os.getenv("TASK_CLEANUP_PAUSE_SECONDS", "0.05"))
+    max_result_bytes = int(os.getenv("TASK_CLEANUP_MAX_RESULT_BYTES", "0"))
 
     logger.info(f"Cleaning up tasks older than {retention_days} days ({cutoff_date})")
 
+    stats = new_cleanup_stats()
+    started = time.perf_counter()
+
     # Delete old successful tasks
-    success_deleted = Success.objects.filter(stopped__lt=cutoff_date).delete()
+    success_deleted = delete_in_chunks(
+        Success.objects.filter(stopped__lt=cutoff_date), chunk_size, pause, stats
+    )
 
     # Delete old failed tasks (you might want to keep these longer)
-    failure_deleted = Failure.objects.filter(stopped__lt=cutoff_date).delete()
+    failure_deleted = delete_in_chunks(
+        Failure.objects.filter(stopped__lt=cutoff_date), chunk_size, pause, stats
+    )
+
+    stripped = 0
+    if max_result_bytes > 0:
+        stripped = strip_large_results(
+            Success.objects.all(), max_result_bytes, chunk_size, pause, stats
+        )
+
+    elapsed = time.perf_counter() - started
+    rows = stats["deleted"] + stats["stripped"]
+    rows_per_second = round(rows / elapsed) if elapsed > 0 else 0
+    max_lock_ms = round(stats["max_lock_seconds"] * 1000, 1)
 
     logger.info(
-        f"Deleted {success_deleted[0]} successful tasks and {failure_deleted[0]} failed tasks"
+        f"Deleted {success_deleted} successful tasks and {failure_deleted} failed tasks"
+        f", stripped {stripped} results ({stats['chunks']} chunks, "
+        f"{rows_per_second} rows/s, longest lock {max_lock_ms} ms)"
     )
 
     return {
         "success": True,
         "message": f"Cleaned up tasks older than {retention_days} days",
-        "successful_tasks_deleted": success_deleted[0],
-        "failed_tasks_deleted": failure_deleted[0],
+        "successful_tasks_deleted": success_deleted,
+        "failed_tasks_deleted": failure_deleted,
+        "results_stripped": stripped,
+        "chunks": stats["chunks"],
+        "rows_per_second": rows_per_second,
+        "max_lock_ms": max_lock_ms,
     }
 
 
@@ -307,3 +745,96 @@ def download_match_video_task(match_id: int, buffer: int = 30) -> dict:
             "competition_code": match.competition.code,
             "video_available": False,
         }
+
+
+def queue_video_download(match_id: int, match_number: int, competition_code: str) -> dict:
+    """
+    Queue download_match_video_task once per match.
+
+    Triggers for a match whose download is queued or running are merged into
+    that download, and a match attempted within TASK_VIDEO_RETRY_MINUTES
+    (default: 60) is not retried yet.
+
+    Returns:
+        enqueue_once result (queued, reason, key)
+    """
+    from .utils.task_coalescing import coalesce_key, enqueue_once
+
+    func = "backend.tasks.download_match_video_task"
+    return enqueue_once(
+        func,
+        match_id,
+        key=coalesce_key(func, match=match_id),
+        cooldown=int(os.getenv("TASK_VIDEO_RETRY_MINUTES", "60")) * 60,
+        task_name=f"download_video_match_{match_number}_{competition_code}",
+    )
+
+
+def sync_competition_videos(competition_code: Optional[str] = None) -> dict:
+    """
+    Queue video downloads for played matches that do not have a video yet.
+
+    Match.save queues a download when a match is first played; this scheduled
+    task catches matches it missed (stream links added later, bulk imports,
+    failed downloads). Downloads go through queue_video_download, so matches
+    with a download in flight or attempted recently are skipped.
+
+    Args:
+        competition_code: Competition code (e.g., "2025gacmp").
+                         If None, uses COMPCODE from environment.
+
+    Returns:
+        dict with the number of downloads queued
+    """
+    from .models import Competition, Match
+
+    if not competition_code:
+        competition_code = os.getenv("COMPCODE")
+        if not competition_code:
+            logger.error(
+                "No competition code provided and COMPCODE env variable not set"
+            )
+            return {"success": False, "error": "No competition code available"}
+
+    try:
+        competition = Competition.objects.get(code=competition_code)
+    except Competition.DoesNotExist:
+        logger.error(f"Competition {competition_code} not found in database")
+        return {"success": False, "error": f"Competition {competition_code} not found"}
+
+    if not competition.video_sync_enabled:
+        return {"success": True, "message": "Video sync disabled", "queued": 0}
+
+    batch_size = int(os.getenv("TASK_VIDEO_SYNC_BATCH_SIZE", "3"))
+
+    missing = list(
+        Match.objects.filter(
+            competition=competition,
+            has_played=True,
+            start_match_time__gt=0,
+            video_available=False,
+        )
+        .order_by("start_match_time")
+        .values_list("pk", "match_number")
+    )
+    if not missing:
+        return {"success": True, "message": "All played matches have videos", "queued": 0}
+
+    queued = 0
+    for match_id, match_number in missing:
+        if queued >= batch_size:
+            break
+        if queue_video_download(match_id, match_number, competition_code)["queued"]:
+            queued += 1
+
+    logger.info(
+        f"Queued {queued} video download(s) for {competition_code} "
+        f"({len(missing)} played matches without video)"
+    )
+
+    return {
+        "success": True,
+        "message": f"Queued {queued} video downloads",
+        "queued": queued,
+        "missing_videos": len(missing),
+    }
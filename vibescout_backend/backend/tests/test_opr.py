@@ -0,0 +1,96 @@
+"""Incremental OPR solves against the batch solve"""
+
+import itertools
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from backend.analytics import opr
+
+TEAM_COUNT = 42  # Seven matches per round, so every round plays every team
+ROUNDS = 12
+TOLERANCE = 1e-6
+
+_state_keys = itertools.count()
+
+
+def synthetic_arrays(seed: int = 0) -> dict:
+    """load_alliance_arrays-shaped arrays of a random qualification schedule"""
+    rng = np.random.default_rng(seed)
+    team_ids = np.arange(1001, 1001 + TEAM_COUNT)
+    strength = rng.uniform(0, 30, size=(TEAM_COUNT, len(opr.COMPONENTS)))
+
+    alliances = np.concatenate(
+        [rng.permutation(TEAM_COUNT).reshape(-1, 2, 3) for _ in range(ROUNDS)]
+    )
+    noise = rng.normal(0, 8, size=(len(alliances), 2, len(opr.COMPONENTS)))
+    scores = np.maximum(np.rint(strength[alliances].sum(axis=2) + noise), 0)
+
+    return {
+        "match_ids": np.arange(1, len(alliances) + 1, dtype=np.int64),
+        "team_ids": team_ids[alliances],
+        "scores": scores.astype(np.int64),
+    }
+
+
+def prefix(arrays: dict, count: int) -> dict:
+    return {name: values[:count].copy() for name, values in arrays.items()}
+
+
+class SolveRatingsTests(SimpleTestCase):
+    def setUp(self):
+        self.arrays = synthetic_arrays()
+        self.first = len(self.arrays["match_ids"]) // 2
+        self.state_key = ("test", next(_state_keys))
+        opr.solve_ratings(prefix(self.arrays, self.first), self.state_key)
+
+    def assertSameRatings(self, ratings, reference):
+        np.testing.assert_array_equal(ratings["teams"], reference["teams"])
+        np.testing.assert_array_equal(ratings["matches"], reference["matches"])
+        for component in opr.COMPONENTS:
+            np.testing.assert_allclose(
+                ratings["opr"][component], reference["opr"][component], atol=TOLERANCE
+            )
+        for name in ("dpr", "ccwm", "rating_variance"):
+            np.testing.assert_allclose(ratings[name], reference[name], atol=TOLERANCE)
+
+    def test_matches_added_one_at_a_time_match_the_batch_solve(self):
+        for count in range(self.first + 1, len(self.arrays["match_ids"]) + 1):
+            arrays = prefix(self.arrays, count)
+            ratings = opr.solve_ratings(arrays, self.state_key)
+            self.assertEqual(ratings["method"], "incremental")
+            self.assertSameRatings(ratings, opr.solve_ratings(arrays))
+
+    def test_several_new_matches_are_added_in_one_update(self):
+        arrays = prefix(self.arrays, self.first + 7)
+        ratings = opr.solve_ratings(arrays, self.state_key)
+        self.assertEqual(ratings["method"], "incremental")
+        self.assertSameRatings(ratings, opr.solve_ratings(arrays))
+
+    def test_unchanged_matches_reuse_the_state(self):
+        arrays = prefix(self.arrays, self.first)
+        self.assertEqual(opr.solve_ratings(arrays, self.state_key)["method"], "cached")
+
+    def test_corrected_match_falls_back_to_a_full_solve(self):
+        arrays = prefix(self.arrays, self.first + 1)
+        arrays["scores"][0, 0, 0] += 10
+        ratings = opr.solve_ratings(arrays, self.state_key)
+        self.assertEqual(ratings["method"], "full")
+        self.assertSameRatings(ratings, opr.solve_ratings(arrays))
+
+    def test_removed_match_falls_back_to_a_full_solve(self):
+        arrays = {
+            name: np.delete(values, 3, axis=0)
+            for name, values in prefix(self.arrays, self.first + 1).items()
+        }
+        ratings = opr.solve_ratings(arrays, self.state_key)
+        self.assertEqual(ratings["method"], "full")
+        self.assertSameRatings(ratings, opr.solve_ratings(arrays))
+
+    def test_new_team_falls_back_to_a_full_solve(self):
+        arrays = prefix(self.arrays, self.first + 1)
+        arrays["team_ids"][-1, 0, 0] = 9999
+        ratings = opr.solve_ratings(arrays, self.state_key)
+        self.assertEqual(ratings["method"], "full")
+        self.assertIn(9999, ratings["teams"])
+        self.assertSameRatings(ratings, opr.solve_ratings(arrays))
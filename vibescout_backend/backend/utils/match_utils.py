@@ -2,20 +2,345 @@
 Utility functions for match management.
 """
 
-import tbapy
+import re
+from typing import TYPE_CHECKING
+
 from django.db import transaction
 
-from backend.models import Competition, Match, Team
+from backend.analytics.running_stats import (
+    apply_contributions,
+    create_team_infos,
+    match_contribution,
+)
+from backend.models import (
+    Competition,
+    Match,
+    Team,
+    schedule_competition_epa_update,
+)
+
+if TYPE_CHECKING:
+    # Only for annotations; callers pass a client from utils.tba_client
+    import tbapy
+
+# Map TBA comp_level codes to Match.match_type values
+MATCH_TYPE_MAP = {
+    "qm": "qualification",
+    "qf": "quarterfinal",
+    "sf": "semifinal",
+    "f": "final",
+}
+
+# Match columns that hold a team foreign key, in slot order
+TEAM_SLOT_FIELDS = [
+    "blue_team_1",
+    "blue_team_2",
+    "blue_team_3",
+    "red_team_1",
+    "red_team_2",
+    "red_team_3",
+]
+
+# Score breakdown keys holding an alliance's endgame points (2020, 2025)
+ENDGAME_POINT_KEYS = ["endgamePoints", "endGameBargePoints"]
+
+
+def map_climb(endgame_value, year):
+    """Map a TBA endgame robot value to a Match climb choice"""
+    if year == 2020:
+        if endgame_value == "Park":
+            return "L1"
+        elif endgame_value == "Hang":
+            return "L3"
+    elif year == 2025:
+        # 2025 Reefscape
+        if endgame_value == "Parked":
+            return "L1"
+        elif endgame_value == "ShallowCage":
+            return "L2"
+        elif endgame_value == "DeepCage":
+            return "L3"
+    elif year == 2026:
+        # 2026
+        if isinstance(endgame_value, str):
+            lower_val = endgame_value.lower()
+            if "park" in lower_val or "low" in lower_val:
+                return "L1"
+            elif "mid" in lower_val or "shallow" in lower_val:
+                return "L2"
+            elif "high" in lower_val or "deep" in lower_val or "cage" in lower_val:
+                return "L3"
+    return "None"
+
+
+def count_game_pieces(breakdown: dict, year: int):
+    """
+    Count auto and teleop game pieces for one alliance's score breakdown.
+
+    Returns:
+        (auto_pieces, teleop_pieces) tuple
+    """
+    breakdown = breakdown or {}
+
+    if year == 2020:
+        auto_cells = (
+            breakdown.get("autoCellsBottom", 0)
+            + breakdown.get("autoCellsOuter", 0)
+            + breakdown.get("autoCellsInner", 0)
+        )
+        teleop_cells = (
+            breakdown.get("teleopCellsBottom", 0)
+            + breakdown.get("teleopCellsOuter", 0)
+            + breakdown.get("teleopCellsInner", 0)
+        )
+        return auto_cells, teleop_cells
+    elif year == 2025:
+        # 2025 Reefscape
+        return (
+            breakdown.get("autoCoralCount", 0),
+            breakdown.get("teleopCoralCount", 0),
+        )
+    elif year == 2026:
+        # 2026 - Use hub score
+        hub = breakdown.get("hubScore", {})
+        if not isinstance(hub, dict):
+            return 0, 0
+        return hub.get("autoGamePieces", 0), hub.get("teleopGamePieces", 0)
+
+    return 0, 0
+
+
+def alliance_score_fields(alliance: str, score: int, breakdown: dict) -> dict:
+    """
+    Match columns for one alliance's score and its breakdown.
+
+    Auto, teleop and foul points use the breakdown keys shared by every
+    game since 2020; the endgame key changes name between games.
+
+    Args:
+        alliance: "blue" or "red"
+        score: Alliance total score
+        breakdown: The alliance's TBA score breakdown (may be empty)
+
+    Returns:
+        dict of <alliance>_* Match field values
+    """
+    endgame = next(
+        (breakdown[key] for key in ENDGAME_POINT_KEYS if key in breakdown), 0
+    )
+    return {
+        f"{alliance}_total_score": score,
+        f"{alliance}_auto_points": breakdown.get("autoPoints") or 0,
+        f"{alliance}_teleop_points": breakdown.get("teleopPoints") or 0,
+        f"{alliance}_endgame_points": endgame or 0,
+        f"{alliance}_penalties": breakdown.get("foulPoints") or 0,
+        f"{alliance}_ranking_points": breakdown.get("rp") or 0,
+    }
+
+
+def parse_tba_match(match_data: dict, year: int = None) -> dict:
+    """
+    Convert a TBA match dictionary into Match field values.
+
+    Args:
+        match_data: Match data dictionary from TBA API
+        year: Game year; taken from the match key when omitted
+
+    Returns:
+        dict with keys:
+            match_type, set_number, match_number: Match lookup values
+            blue_team_numbers, red_team_numbers: Lists of 3 team numbers
+            played: True when TBA has posted scores for the match
+            fields: dict of Match column values (without team foreign keys)
+
+    Raises:
+        Exception: If match data is incomplete
+    """
+    alliances = match_data.get("alliances", {})
+    blue_alliance = alliances.get("blue", {})
+    red_alliance = alliances.get("red", {})
+
+    blue_team_keys = blue_alliance.get("team_keys", [])
+    red_team_keys = red_alliance.get("team_keys", [])
+
+    if len(blue_team_keys) < 3 or len(red_team_keys) < 3:
+        raise Exception("Match has incomplete team data")
+
+    tba_key = match_data.get("key", "")
+    if year is None:
+        year = int(tba_key[:4])
+
+    # Determine match type from TBA comp_level
+    comp_level = match_data.get("comp_level", "qm")
+    match_type = MATCH_TYPE_MAP.get(comp_level, "qualification")
+
+    # Extract set_number from TBA key (e.g., qf1m1 -> set 1, qf2m1 -> set 2)
+    set_number = 1
+    if comp_level in ["qf", "sf", "f"]:
+        match_pattern = re.search(r"_(" + comp_level + r")(\d+)m", tba_key)
+        if match_pattern:
+            set_number = int(match_pattern.group(2))
+
+    # TBA reports -1 (or null) for matches that have not been played yet
+    raw_blue_score = blue_alliance.get("score")
+    raw_red_score = red_alliance.get("score")
+    played = (
+        raw_blue_score is not None
+        and raw_red_score is not None
+        and raw_blue_score >= 0
+        and raw_red_score >= 0
+    )
+    blue_score = max(raw_blue_score or 0, 0)
+    red_score = max(raw_red_score or 0, 0)
+
+    # Extract scores and breakdown
+    score_breakdown = match_data.get("score_breakdown") or {}
+    blue_breakdown = score_breakdown.get("blue") or {}
+    red_breakdown = score_breakdown.get("red") or {}
+
+    blue_auto_cells, blue_teleop_cells = count_game_pieces(blue_breakdown, year)
+    red_auto_cells, red_teleop_cells = count_game_pieces(red_breakdown, year)
+
+    fields = {
+        # Extract time fields
+        "predicted_match_time": match_data.get("predicted_time", 0) or 0,
+        "start_match_time": match_data.get("actual_time", 0) or 0,
+        "end_match_time": match_data.get("post_result_time", 0) or 0,
+        "total_points": blue_score + red_score,
+        "total_blue_fuels": blue_auto_cells + blue_teleop_cells,
+        "total_red_fuels": red_auto_cells + red_teleop_cells,
+        "blue_1_climb": map_climb(blue_breakdown.get("endgameRobot1", "None"), year),
+        "blue_2_climb": map_climb(blue_breakdown.get("endgameRobot2", "None"), year),
+        "blue_3_climb": map_climb(blue_breakdown.get("endgameRobot3", "None"), year),
+        "red_1_climb": map_climb(red_breakdown.get("endgameRobot1", "None"), year),
+        "red_2_climb": map_climb(red_breakdown.get("endgameRobot2", "None"), year),
+        "red_3_climb": map_climb(red_breakdown.get("endgameRobot3", "None"), year),
+        "calculated_points": blue_score + red_score,
+        **alliance_score_fields("blue", blue_score, blue_breakdown),
+        **alliance_score_fields("red", red_score, red_breakdown),
+        # TBA leaves winning_alliance empty for ties
+        "winning_alliance": (
+            (match_data.get("winning_alliance") or "tie") if played else None
+        ),
+    }
+
+    return {
+        "match_type": match_type,
+        "set_number": set_number,
+        "match_number": match_data.get("match_number", 0),
+        "blue_team_numbers": [int(k.replace("frc", "")) for k in blue_team_keys[:3]],
+        "red_team_numbers": [int(k.replace("frc", "")) for k in red_team_keys[:3]],
+        "played": played,
+        "fields": fields,
+    }
+
+
+def parse_match_key(match_key: str):
+    """
+    Split a TBA match key into Match lookup values.
+
+    Args:
+        match_key: TBA match key (e.g., '2025gacmp_qm12', '2025gacmp_sf2m1')
+
+    Returns:
+        (event_key, match_type, set_number, match_number) tuple
+
+    Raises:
+        ValueError: If the key is not a valid match key
+    """
+    found = re.fullmatch(r"(\w+?)_(qm|qf|sf|f)(\d+)(?:m(\d+))?", match_key or "")
+    if not found:
+        raise ValueError(f"Invalid match key: {match_key}")
+
+    event_key, comp_level, first, second = found.groups()
+    if comp_level == "qm":
+        return event_key, MATCH_TYPE_MAP[comp_level], 1, int(first)
+    if second is None:
+        raise ValueError(f"Invalid match key: {match_key}")
+    return event_key, MATCH_TYPE_MAP[comp_level], int(first), int(second)
+
+
+def new_write_stats() -> dict:
+    """Counters for upsert_match: rows created, updated, left unchanged and columns written"""
+    return {"created": 0, "updated": 0, "unchanged": 0, "columns_written": 0}
+
+
+def upsert_match(
+    competition: Competition,
+    match_type: str,
+    set_number: int,
+    match_number: int,
+    values: dict,
+    stats: dict = None,
+):
+    """
+    Create or update a match, writing only the columns whose value changed.
+
+    Unlike ``update_or_create``, an identical TBA payload issues no UPDATE
+    (and no ``Match.save``), and a changed payload updates only the
+    differing columns.
+
+    Args:
+        competition: Competition object
+        match_type: Match.match_type value
+        set_number: Set number
+        match_number: Match number
+        values: Field values to store; team slots may be given as ``<slot>_id``
+        stats: Optional counters from new_write_stats() to update
+
+    Returns:
+        Tuple of (Match, status) where status is "created", "updated" or "unchanged"
+    """
+    match = Match.objects.filter(
+        competition=competition,
+        match_type=match_type,
+        set_number=set_number,
+        match_number=match_number,
+    ).first()
+
+    if match is None:
+        match = Match(
+            competition=competition,
+            match_type=match_type,
+            set_number=set_number,
+            match_number=match_number,
+            **values,
+        )
+        match.save()
+        status = "created"
+        columns = len(values)
+    else:
+        changed = [
+            attr for attr, value in values.items() if getattr(match, attr) != value
+        ]
+        for attr in changed:
+            setattr(match, attr, values[attr])
+        if changed:
+            # update_fields takes field names, not the *_id attribute names
+            match.save(
+                update_fields=[attr.removesuffix("_id") for attr in changed]
+            )
+            status = "updated"
+        else:
+            status = "unchanged"
+        columns = len(changed)
+
+    if stats is not None:
+        stats[status] += 1
+        stats["columns_written"] += columns
+
+    return match, status
 
 
 @transaction.atomic
 def add_match_from_tba(
-    tba_client: tbapy.TBA,
+    tba_client: "tbapy.TBA",
     competition_code: str,
     match_number: int,
     match_type_code: str,
     set_number: int,
     stdout=None,
+    stats: dict = None,
 ):
     """
     Add or update a match from The Blue Alliance API.
@@ -27,6 +352,7 @@ def add_match_from_tba(
         match_type_code: Match type code ('qm', 'qf', 'sf', 'f')
         set_number: Set number for playoff matches
         stdout: Optional output stream for logging
+        stats: Optional write counters (see new_write_stats)
 
     Returns:
         Match object that was created or updated
@@ -66,164 +392,45 @@ def add_match_from_tba(
     except Exception as e:
         raise Exception(f"Failed to fetch match from TBA: {str(e)}")
 
-    # Extract match details
-    alliances = match_data.get("alliances", {})
-    blue_alliance = alliances.get("blue", {})
-    red_alliance = alliances.get("red", {})
-
-    blue_team_keys = blue_alliance.get("team_keys", [])
-    red_team_keys = red_alliance.get("team_keys", [])
-
-    if len(blue_team_keys) < 3 or len(red_team_keys) < 3:
-        raise Exception("Match has incomplete team data")
-
-    # Get or create teams
-    blue_teams = [get_or_create_team(key, stdout) for key in blue_team_keys[:3]]
-    red_teams = [get_or_create_team(key, stdout) for key in red_team_keys[:3]]
-
-    # Map match type
-    match_type_map = {
-        "qm": "qualification",
-        "qf": "quarterfinal",
-        "sf": "semifinal",
-        "f": "final",
-    }
-    match_type = match_type_map.get(match_type_code, "qualification")
-
-    # Extract scores and breakdown
-    score_breakdown = match_data.get("score_breakdown", {})
-    blue_breakdown = score_breakdown.get("blue", {})
-    red_breakdown = score_breakdown.get("red", {})
-
-    blue_score = blue_alliance.get("score", 0) or 0
-    red_score = red_alliance.get("score", 0) or 0
-
     # Extract year from event key
-    year = int(competition_code[:4])
-
-    # Calculate game piece counts based on year
-    blue_auto_cells = 0
-    red_auto_cells = 0
-    blue_teleop_cells = 0
-    red_teleop_cells = 0
-
-    if year == 2020:
-        blue_auto_cells = (
-            blue_breakdown.get("autoCellsBottom", 0)
-            + blue_breakdown.get("autoCellsOuter", 0)
-            + blue_breakdown.get("autoCellsInner", 0)
-        )
-        red_auto_cells = (
-            red_breakdown.get("autoCellsBottom", 0)
-            + red_breakdown.get("autoCellsOuter", 0)
-            + red_breakdown.get("autoCellsInner", 0)
-        )
-        blue_teleop_cells = (
-            blue_breakdown.get("teleopCellsBottom", 0)
-            + blue_breakdown.get("teleopCellsOuter", 0)
-            + blue_breakdown.get("teleopCellsInner", 0)
-        )
-        red_teleop_cells = (
-            red_breakdown.get("teleopCellsBottom", 0)
-            + red_breakdown.get("teleopCellsOuter", 0)
-            + red_breakdown.get("teleopCellsInner", 0)
-        )
-    elif year == 2025:
-        # 2025 Reefscape
-        blue_auto_cells = blue_breakdown.get("autoCoralCount", 0)
-        red_auto_cells = red_breakdown.get("autoCoralCount", 0)
-        blue_teleop_cells = blue_breakdown.get("teleopCoralCount", 0)
-        red_teleop_cells = red_breakdown.get("teleopCoralCount", 0)
-    elif year == 2026:
-        # 2026 - Use hub score
-        hub_blue = blue_breakdown.get("hubScore", {})
-        hub_red = red_breakdown.get("hubScore", {})
-        blue_auto_cells = (
-            hub_blue.get("autoGamePieces", 0) if isinstance(hub_blue, dict) else 0
-        )
-        red_auto_cells = (
-            hub_red.get("autoGamePieces", 0) if isinstance(hub_red, dict) else 0
-        )
-        blue_teleop_cells = (
-            hub_blue.get("teleopGamePieces", 0) if isinstance(hub_blue, dict) else 0
-        )
-        red_teleop_cells = (
-            hub_red.get("teleopGamePieces", 0) if isinstance(hub_red, dict) else 0
-        )
+    parsed = parse_tba_match(match_data, year=int(competition_code[:4]))
 
-    total_blue_fuels = blue_auto_cells + blue_teleop_cells
-    total_red_fuels = red_auto_cells + red_teleop_cells
-
-    # Extract time fields
-    predicted_match_time = match_data.get("predicted_time", 0) or 0
-    start_match_time = match_data.get("actual_time", 0) or 0
-    end_match_time = match_data.get("post_result_time", 0) or 0
-
-    # Map climb values
-    def map_climb(endgame_value, year):
-        if year == 2020:
-            if endgame_value == "Park":
-                return "L1"
-            elif endgame_value == "Hang":
-                return "L3"
-        elif year == 2025:
-            # 2025 Reefscape
-            if endgame_value == "Parked":
-                return "L1"
-            elif endgame_value == "ShallowCage":
-                return "L2"
-            elif endgame_value == "DeepCage":
-                return "L3"
-        elif year == 2026:
-            # 2026
-            if isinstance(endgame_value, str):
-                lower_val = endgame_value.lower()
-                if "park" in lower_val or "low" in lower_val:
-                    return "L1"
-                elif "mid" in lower_val or "shallow" in lower_val:
-                    return "L2"
-                elif "high" in lower_val or "deep" in lower_val or "cage" in lower_val:
-                    return "L3"
-        return "None"
-
-    # Create or update match
-    match, created = Match.objects.update_or_create(
-        competition=competition,
-        match_type=match_type,
-        set_number=set_number,
-        match_number=match_number,
-        defaults={
-            "predicted_match_time": predicted_match_time,
-            "start_match_time": start_match_time,
-            "end_match_time": end_match_time,
-            "blue_team_1": blue_teams[0],
-            "blue_team_2": blue_teams[1],
-            "blue_team_3": blue_teams[2],
-            "red_team_1": red_teams[0],
-            "red_team_2": red_teams[1],
-            "red_team_3": red_teams[2],
-            "total_points": blue_score + red_score,
-            "total_blue_fuels": total_blue_fuels,
-            "total_red_fuels": total_red_fuels,
-            "blue_1_climb": map_climb(
-                blue_breakdown.get("endgameRobot1", "None"), year
-            ),
-            "blue_2_climb": map_climb(
-                blue_breakdown.get("endgameRobot2", "None"), year
-            ),
-            "blue_3_climb": map_climb(
-                blue_breakdown.get("endgameRobot3", "None"), year
-            ),
-            "red_1_climb": map_climb(red_breakdown.get("endgameRobot1", "None"), year),
-            "red_2_climb": map_climb(red_breakdown.get("endgameRobot2", "None"), year),
-            "red_3_climb": map_climb(red_breakdown.get("endgameRobot3", "None"), year),
-            "calculated_points": blue_score + red_score,
-            "has_played": True,
+    # Get or create teams
+    blue_teams = [
+        get_or_create_team(f"frc{number}", stdout)
+        for number in parsed["blue_team_numbers"]
+    ]
+    red_teams = [
+        get_or_create_team(f"frc{number}", stdout)
+        for number in parsed["red_team_numbers"]
+    ]
+
+    match_type = MATCH_TYPE_MAP.get(match_type_code, "qualification")
+
+    # Create or update match, writing only changed columns
+    match, status = upsert_match(
+        competition,
+        match_type,
+        set_number,
+        match_number,
+        {
+            **parsed["fields"],
+            **{
+                f"{slot}_id": team.id
+                for slot, team in zip(TEAM_SLOT_FIELDS, blue_teams + red_teams)
+            },
+            "has_played": parsed["played"],
         },
+        stats,
     )
+    # Cache the loaded teams so callers can read match.blue_team_1 etc. without a query
+    for slot, team in zip(TEAM_SLOT_FIELDS, blue_teams + red_teams):
+        setattr(match, slot, team)
+
+    blue_score = (match_data["alliances"]["blue"].get("score", 0)) or 0
+    red_score = (match_data["alliances"]["red"].get("score", 0)) or 0
 
-    action = "Created" if created else "Updated"
-    log(f"{action} match: {match_type.title()} #{match_number}")
+    log(f"{status.title()} match: {match_type.title()} #{match_number}")
     log(
         f"  Blue Alliance: {blue_teams[0].number}, {blue_teams[1].number}, {blue_teams[2].number} - Score: {blue_score}"
     )
@@ -263,6 +470,7 @@ def import_match_from_dict(
     competition: Competition,
     team_names_cache: dict = None,
     stdout=None,
+    stats: dict = None,
 ):
     """
     Import a match from TBA match data dictionary.
@@ -273,6 +481,7 @@ def import_match_from_dict(
         competition: Competition object
         team_names_cache: Optional dict mapping team numbers to team names
         stdout: Optional output stream for logging
+        stats: Optional write counters (see new_write_stats)
 
     Returns:
         List of Team objects that participated in the match
@@ -286,19 +495,10 @@ def import_match_from_dict(
         if stdout:
             stdout.write(message)
 
-    alliances = match_data.get("alliances", {})
-    blue_alliance = alliances.get("blue", {})
-    red_alliance = alliances.get("red", {})
-
-    blue_team_keys = blue_alliance.get("team_keys", [])
-    red_team_keys = red_alliance.get("team_keys", [])
-
-    if len(blue_team_keys) < 3 or len(red_team_keys) < 3:
-        raise Exception("Match has incomplete team data")
+    parsed = parse_tba_match(match_data)
 
     # Get teams with optional cached names
-    def get_team_with_cache(team_key):
-        team_number = int(team_key.replace("frc", ""))
+    def get_team_with_cache(team_number):
         team_name = (
             team_names_cache.get(team_number, f"Team {team_number}")
             if team_names_cache
@@ -316,158 +516,204 @@ def import_match_from_dict(
 
         return team
 
-    blue_teams = [get_team_with_cache(key) for key in blue_team_keys[:3]]
-    red_teams = [get_team_with_cache(key) for key in red_team_keys[:3]]
+    blue_teams = [get_team_with_cache(n) for n in parsed["blue_team_numbers"]]
+    red_teams = [get_team_with_cache(n) for n in parsed["red_team_numbers"]]
+
+    # Create or update match, writing only changed columns
+    match, status = upsert_match(
+        competition,
+        parsed["match_type"],
+        parsed["set_number"],
+        parsed["match_number"],
+        {
+            **parsed["fields"],
+            **{
+                f"{slot}_id": team.id
+                for slot, team in zip(TEAM_SLOT_FIELDS, blue_teams + red_teams)
+            },
+            "has_played": True,
+        },
+        stats,
+    )
 
-    # Extract match info
-    match_number = match_data.get("match_number", 0)
-    tba_key = match_data.get("key", "")
+    if status == "created":
+        log(f"    Created match: {match_data.get('key', '')}")
 
-    # Determine match type from TBA comp_level
-    comp_level = match_data.get("comp_level", "qm")
-    match_type_map = {
-        "qm": "qualification",
-        "qf": "quarterfinal",
-        "sf": "semifinal",
-        "f": "final",
-    }
-    match_type = match_type_map.get(comp_level, "qualification")
+    return blue_teams + red_teams
 
-    # Extract set_number from TBA key (e.g., qf1m1 -> set 1, qf2m1 -> set 2)
-    set_number = 1
-    if comp_level in ["qf", "sf", "f"]:
-        import re
 
-        match_pattern = re.search(r"_(" + comp_level + r")(\d+)m", tba_key)
-        if match_pattern:
-            set_number = int(match_pattern.group(2))
+def import_matches_bulk(
+    matches,
+    competition: Competition,
+    team_names_cache: dict = None,
+    batch_size: int = 500,
+    stdout=None,
+) -> dict:
+    """
+    Import many TBA match dictionaries with a fixed number of queries per batch.
 
-    # Extract scores
-    score_breakdown = match_data.get("score_breakdown", {})
-    blue_breakdown = score_breakdown.get("blue", {})
-    red_breakdown = score_breakdown.get("red", {})
+    Matches are consumed from any iterable (including a streaming parser), so
+    memory stays bounded by ``batch_size``. Each batch resolves its teams with
+    one query, creates missing teams with ``bulk_create`` and their TeamInfo
+    rows with ``create_team_infos``, and writes matches with one
+    ``bulk_create`` plus one ``bulk_update`` that only covers rows and columns
+    whose values changed.
 
-    blue_score = blue_alliance.get("score", 0) or 0
-    red_score = red_alliance.get("score", 0) or 0
+    Unlike ``import_match_from_dict``, ``has_played`` follows the posted TBA
+    scores, so schedule-only dumps import as blank matches. ``Match.save`` is
+    not called, so no video downloads are queued for imported matches.
 
-    # Extract year
-    year = int(tba_key[:4])
+    Args:
+        matches: Iterable of TBA match dictionaries for one competition
+        competition: Competition object
+        team_names_cache: Optional dict mapping team numbers to team names
+        batch_size: Number of matches written per batch
+        stdout: Optional output stream for logging
 
-    # Calculate game piece counts based on year
-    if year == 2020:
-        blue_auto_cells = (
-            blue_breakdown.get("autoCellsBottom", 0)
-            + blue_breakdown.get("autoCellsOuter", 0)
-            + blue_breakdown.get("autoCellsInner", 0)
-        )
-        red_auto_cells = (
-            red_breakdown.get("autoCellsBottom", 0)
-            + red_breakdown.get("autoCellsOuter", 0)
-            + red_breakdown.get("autoCellsInner", 0)
-        )
-        blue_teleop_cells = (
-            blue_breakdown.get("teleopCellsBottom", 0)
-            + blue_breakdown.get("teleopCellsOuter", 0)
-            + blue_breakdown.get("teleopCellsInner", 0)
-        )
-        red_teleop_cells = (
-            red_breakdown.get("teleopCellsBottom", 0)
-            + red_breakdown.get("teleopCellsOuter", 0)
-            + red_breakdown.get("teleopCellsInner", 0)
-        )
-    elif year == 2025:
-        blue_auto_cells = blue_breakdown.get("autoCoralCount", 0)
-        red_auto_cells = red_breakdown.get("autoCoralCount", 0)
-        blue_teleop_cells = blue_breakdown.get("teleopCoralCount", 0)
-        red_teleop_cells = red_breakdown.get("teleopCoralCount", 0)
-    elif year == 2026:
-        hub_blue = blue_breakdown.get("hubScore", {})
-        hub_red = red_breakdown.get("hubScore", {})
-        blue_auto_cells = (
-            hub_blue.get("autoGamePieces", 0) if isinstance(hub_blue, dict) else 0
-        )
-        red_auto_cells = (
-            hub_red.get("autoGamePieces", 0) if isinstance(hub_red, dict) else 0
-        )
-        blue_teleop_cells = (
-            hub_blue.get("teleopGamePieces", 0) if isinstance(hub_blue, dict) else 0
-        )
-        red_teleop_cells = (
-            hub_red.get("teleopGamePieces", 0) if isinstance(hub_red, dict) else 0
-        )
-    else:
-        blue_auto_cells = red_auto_cells = blue_teleop_cells = red_teleop_cells = 0
+    Returns:
+        dict with created/updated/unchanged/skipped counts, columns_written
+        and the set of team numbers
+    """
 
-    total_blue_fuels = blue_auto_cells + blue_teleop_cells
-    total_red_fuels = red_auto_cells + red_teleop_cells
+    def log(message):
+        """Helper to log messages if stdout is provided"""
+        if stdout:
+            stdout.write(message)
 
-    # Extract time fields
-    predicted_match_time = match_data.get("predicted_time", 0) or 0
-    start_match_time = match_data.get("actual_time", 0) or 0
-    end_match_time = match_data.get("post_result_time", 0) or 0
+    stats = {**new_write_stats(), "skipped": 0, "team_numbers": set()}
+    team_ids = {}  # team number -> Team id, reused across batches
 
-    # Map climb values
-    def map_climb(endgame_value, year):
-        if year == 2020:
-            if endgame_value == "Park":
-                return "L1"
-            elif endgame_value == "Hang":
-                return "L3"
-        elif year == 2025:
-            if endgame_value == "Parked":
-                return "L1"
-            elif endgame_value == "ShallowCage":
-                return "L2"
-            elif endgame_value == "DeepCage":
-                return "L3"
-        elif year == 2026:
-            if isinstance(endgame_value, str):
-                lower_val = endgame_value.lower()
-                if "park" in lower_val or "low" in lower_val:
-                    return "L1"
-                elif "mid" in lower_val or "shallow" in lower_val:
-                    return "L2"
-                elif "high" in lower_val or "deep" in lower_val or "cage" in lower_val:
-                    return "L3"
-        return "None"
-
-    # Create or update match
-    match, created = Match.objects.update_or_create(
-        competition=competition,
-        match_type=match_type,
-        set_number=set_number,
-        match_number=match_number,
-        defaults={
-            "predicted_match_time": predicted_match_time,
-            "start_match_time": start_match_time,
-            "end_match_time": end_match_time,
-            "blue_team_1": blue_teams[0],
-            "blue_team_2": blue_teams[1],
-            "blue_team_3": blue_teams[2],
-            "red_team_1": red_teams[0],
-            "red_team_2": red_teams[1],
-            "red_team_3": red_teams[2],
-            "total_points": blue_score + red_score,
-            "total_blue_fuels": total_blue_fuels,
-            "total_red_fuels": total_red_fuels,
-            "blue_1_climb": map_climb(
-                blue_breakdown.get("endgameRobot1", "None"), year
-            ),
-            "blue_2_climb": map_climb(
-                blue_breakdown.get("endgameRobot2", "None"), year
-            ),
-            "blue_3_climb": map_climb(
-                blue_breakdown.get("endgameRobot3", "None"), year
-            ),
-            "red_1_climb": map_climb(red_breakdown.get("endgameRobot1", "None"), year),
-            "red_2_climb": map_climb(red_breakdown.get("endgameRobot2", "None"), year),
-            "red_3_climb": map_climb(red_breakdown.get("endgameRobot3", "None"), year),
-            "calculated_points": blue_score + red_score,
-            "has_played": True,
-        },
-    )
+    batch = []
+    for match_data in matches:
+        try:
+            batch.append(parse_tba_match(match_data))
+        except Exception as e:
+            stats["skipped"] += 1
+            log(f"    Skipping match {match_data.get('key')} - {str(e)}")
+            continue
 
-    if created:
-        log(f"    Created match: {tba_key}")
+        if len(batch) >= batch_size:
+            _write_match_batch(batch, competition, team_ids, team_names_cache, stats)
+            log(f"    Imported {stats['created'] + stats['updated']} matches...")
+            batch = []
 
-    return blue_teams + red_teams
+    if batch:
+        _write_match_batch(batch, competition, team_ids, team_names_cache, stats)
+
+    return stats
+
+
+@transaction.atomic
+def _write_match_batch(batch, competition, team_ids, team_names_cache, stats):
+    """Write one batch of parsed matches for import_matches_bulk"""
+    # Resolve every team in the batch with a single query
+    numbers = set()
+    for parsed in batch:
+        numbers.update(parsed["blue_team_numbers"])
+        numbers.update(parsed["red_team_numbers"])
+
+    unknown = numbers - team_ids.keys()
+    if unknown:
+        team_ids.update(
+            Team.objects.filter(number__in=unknown).values_list("number", "id")
+        )
+        missing = unknown - team_ids.keys()
+        if missing:
+            Team.objects.bulk_create(
+                [
+                    Team(
+                        number=number,
+                        name=(team_names_cache or {}).get(number, f"Team {number}"),
+                    )
+                    for number in sorted(missing)
+                ],
+                ignore_conflicts=True,
+            )
+            team_ids.update(
+                Team.objects.filter(number__in=missing).values_list("number", "id")
+            )
+
+        # Seeded before the batch is written; its changes are applied below
+        create_team_infos(competition.pk, [team_ids[number] for number in unknown])
+
+    stats["team_numbers"].update(numbers)
+
+    # Fetch the existing rows for this batch in one query
+    existing = {
+        (m.match_type, m.set_number, m.match_number): m
+        for m in Match.objects.filter(
+            competition=competition,
+            match_number__in={parsed["match_number"] for parsed in batch},
+        )
+    }
+
+    to_create = []
+    to_update = {}
+    update_fields = set()
+    epa_inputs_changed = False
+    for parsed in batch:
+        values = {
+            **parsed["fields"],
+            **{
+                f"{slot}_id": team_ids[number]
+                for slot, number in zip(
+                    TEAM_SLOT_FIELDS,
+                    parsed["blue_team_numbers"] + parsed["red_team_numbers"],
+                )
+            },
+            "has_played": parsed["played"],
+        }
+        key = (parsed["match_type"], parsed["set_number"], parsed["match_number"])
+        match = existing.get(key)
+
+        if match is None:
+            match = Match(
+                competition=competition,
+                match_type=parsed["match_type"],
+                set_number=parsed["set_number"],
+                match_number=parsed["match_number"],
+                **values,
+            )
+            existing[key] = match
+            to_create.append(match)
+            stats["columns_written"] += len(values)
+            epa_inputs_changed = epa_inputs_changed or match.has_played
+        else:
+            changed = [
+                attr for attr, value in values.items() if getattr(match, attr) != value
+            ]
+            for attr in changed:
+                setattr(match, attr, values[attr])
+            epa_inputs_changed = epa_inputs_changed or match.epa_inputs_changed(changed)
+            if match.pk is None:
+                continue
+            if changed:
+                to_update[match.pk] = match
+                update_fields.update(attr.removesuffix("_id") for attr in changed)
+            elif match.pk not in to_update:
+                stats["unchanged"] += 1
+
+    # Bulk writes skip Match.save, so the running stats are updated here
+    contribution_changes = []
+    for match in [*to_create, *to_update.values()]:
+        contribution = match_contribution(match)
+        if contribution != match.stats_contribution:
+            contribution_changes.append((match.stats_contribution, contribution))
+            match.stats_contribution = contribution
+            if match.pk is not None:
+                update_fields.add("stats_contribution")
+
+    if to_create:
+        Match.objects.bulk_create(to_create)
+        stats["created"] += len(to_create)
+
+    if to_update:
+        # bulk_update writes every listed column of every row it is given
+        Match.objects.bulk_update(to_update.values(), sorted(update_fields))
+        stats["updated"] += len(to_update)
+        stats["columns_written"] += len(to_update) * len(update_fields)
+
+    if contribution_changes:
+        apply_contributions(competition.pk, contribution_changes)
+    if epa_inputs_changed:
+        schedule_competition_epa_update(competition.pk)
@@ -0,0 +1,99 @@
+"""Utility functions for applying TBA event rankings to TeamInfo"""
+
+import logging
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# TeamInfo fields written from a TBA ranking
+RANKING_FIELDS = ["rank", "win", "lose", "tie", "ranking_points"]
+
+
+def parse_ranking(ranking: dict) -> dict:
+    """
+    Map one entry of TBA's event rankings to TeamInfo field values.
+
+    ranking_points is TBA's first sort order (the ranking score the event is
+    sorted by, e.g. average RP).
+
+    Args:
+        ranking: Ranking dictionary from TBA's /event/{key}/rankings
+
+    Returns:
+        dict of RANKING_FIELDS values
+    """
+    record = ranking.get("record") or {}
+    sort_orders = ranking.get("sort_orders") or [0]
+
+    return {
+        "rank": ranking.get("rank", 0),
+        "win": record.get("wins", 0),
+        "lose": record.get("losses", 0),
+        "tie": record.get("ties", 0),
+        "ranking_points": Decimal(str(sort_orders[0] or 0)).quantize(Decimal("0.01")),
+    }
+
+
+def apply_event_rankings(rankings_data: dict, competition, stdout=None) -> dict:
+    """
+    Write TBA event rankings to the competition's TeamInfo rows.
+
+    Loads every TeamInfo of the competition in one query and writes the
+    changed rows with a single bulk_update; nothing is written when no
+    ranking changed.
+
+    Args:
+        rankings_data: Response of TBA's /event/{key}/rankings
+        competition: Competition instance
+        stdout: Optional stdout for printing messages (for management commands)
+
+    Returns:
+        dict with updated, unchanged and missing (team numbers without TeamInfo)
+    """
+    from backend.models import TeamInfo
+
+    rankings = (rankings_data or {}).get("rankings") or []
+
+    team_infos = {
+        team_info.team.number: team_info
+        for team_info in TeamInfo.objects.filter(competition=competition)
+        .select_related("team")
+        .only("id", "team__number", *RANKING_FIELDS)
+    }
+
+    changed = []
+    unchanged = 0
+    missing = []
+
+    for ranking in rankings:
+        team_number = int(ranking.get("team_key", "frc0")[3:])
+        team_info = team_infos.get(team_number)
+        if team_info is None:
+            missing.append(team_number)
+            continue
+
+        values = parse_ranking(ranking)
+        if all(getattr(team_info, field) == value for field, value in values.items()):
+            unchanged += 1
+            continue
+
+        for field, value in values.items():
+            setattr(team_info, field, value)
+        changed.append(team_info)
+
+    if changed:
+        TeamInfo.objects.bulk_update(changed, RANKING_FIELDS)
+
+    if missing:
+        message = (
+            f"TeamInfo missing at {competition.code} for teams "
+            f"{', '.join(str(n) for n in missing)}, skipped"
+        )
+        logger.warning(message)
+        if stdout:
+            stdout.write(f"  {message}")
+
+    if stdout:
+        stdout.write(f"  Updated {len(changed)} team rankings ({unchanged} unchanged)")
+
+    return {"updated": len(changed), "unchanged": unchanged, "missing": missing}
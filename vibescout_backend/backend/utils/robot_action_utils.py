@@ -0,0 +1,357 @@
+"""Utility functions for writing scouted robot action submissions"""
+
+import logging
+
+import numpy as np
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+
+from backend.analytics.action_summary import refresh_action_summaries
+from backend.models import (
+    Match,
+    MatchTimeline,
+    RobotAction,
+    SubmissionReceipt,
+    Team,
+)
+
+logger = logging.getLogger(__name__)
+
+# Teleop actions start after the 15 second auto period
+AUTO_START_SECONDS = 0.0
+TELEOP_START_SECONDS = 15.0
+
+# Largest number of team-match submissions accepted in one batch upload
+MAX_BATCH_SUBMISSIONS = 200
+
+# MatchTimeline.actions records: action code, times in centiseconds, fuel
+TIMELINE_DTYPE = np.dtype(
+    [("action", "u1"), ("start", "<i4"), ("end", "<i4"), ("fuel", "<i2")]
+)
+# Action codes are indexes into RobotAction.ACTION_CHOICES; anything else
+# a client sent is stored as OTHER_ACTION_CODE
+ACTION_TYPES = [action_type for action_type, _ in RobotAction.ACTION_CHOICES]
+ACTION_CODES = {action_type: code for code, action_type in enumerate(ACTION_TYPES)}
+OTHER_ACTION_CODE = 255
+
+
+def pack_timeline(actions: list) -> bytes:
+    """Pack RobotActions (saved or not) into MatchTimeline.actions bytes"""
+    records = [
+        (
+            ACTION_CODES.get(action.action_type, OTHER_ACTION_CODE),
+            round(float(action.start_time) * 100),
+            round(float(action.end_time) * 100),
+            action.fuel,
+        )
+        for action in actions
+    ]
+    records.sort(key=lambda record: record[1])
+    return np.array(records, dtype=TIMELINE_DTYPE).tobytes()
+
+
+def unpack_timeline(data: bytes) -> np.ndarray:
+    """Structured array with action, start, end and fuel columns"""
+    return np.frombuffer(bytes(data), dtype=TIMELINE_DTYPE)
+
+
+def save_match_timelines(actions: list) -> int:
+    """
+    Write the MatchTimeline of every (match, team) the actions belong to.
+
+    The actions must be all of each pair's actions. Pairs get one row each,
+    created or overwritten with a single bulk upsert.
+
+    Returns:
+        Number of timelines written
+    """
+    grouped = {}
+    for action in actions:
+        grouped.setdefault((action.match_id, action.team_id), []).append(action)
+
+    timelines = [
+        MatchTimeline(
+            match_id=match_id,
+            team_id=team_id,
+            recorded_by_id=pair_actions[0].recorded_by_id,
+            is_playoff=pair_actions[0].is_playoff,
+            action_count=len(pair_actions),
+            actions=pack_timeline(pair_actions),
+            notes=next((action.notes for action in pair_actions if action.notes), None),
+        )
+        for (match_id, team_id), pair_actions in grouped.items()
+    ]
+    MatchTimeline.objects.bulk_create(
+        timelines,
+        update_conflicts=True,
+        unique_fields=["match", "team"],
+        update_fields=[
+            "recorded_by",
+            "is_playoff",
+            "action_count",
+            "actions",
+            "notes",
+            "updated_at",
+        ],
+    )
+    return len(timelines)
+
+
+def rebuild_match_timelines(matches, team=None) -> int:
+    """
+    Rebuild the timelines of matches from their stored RobotActions.
+
+    Timelines of pairs without actions any more are removed.
+
+    Args:
+        matches: Match queryset or list of matches
+        team: Only rebuild this team's timelines (default: all teams)
+
+    Returns:
+        Number of timelines written
+    """
+    actions = RobotAction.objects.filter(match__in=matches).only(
+        "match_id",
+        "team_id",
+        "recorded_by_id",
+        "is_playoff",
+        "action_type",
+        "start_time",
+        "end_time",
+        "fuel",
+        "notes",
+    )
+    timelines = MatchTimeline.objects.filter(match__in=matches)
+    if team is not None:
+        actions = actions.filter(team=team)
+        timelines = timelines.filter(team=team)
+    actions = list(actions.order_by())
+
+    scouted = {(action.match_id, action.team_id) for action in actions}
+    timelines.filter(
+        pk__in=[
+            pk
+            for pk, match_id, team_id in timelines.values_list("pk", "match_id", "team_id")
+            if (match_id, team_id) not in scouted
+        ]
+    ).delete()
+    return save_match_timelines(actions)
+
+
+def resolve_match(
+    candidates, competition_code: str, match_number: int, is_playoff: bool, set_number=None
+) -> tuple:
+    """
+    The match a scouting submission refers to.
+
+    Playoff sets share match numbers (sf1m1, sf2m1, ...), so the candidates
+    are narrowed to qualification or playoff matches and, when given, to the
+    set. A match that still is not unique is reported rather than guessed.
+
+    Args:
+        candidates: Matches at the competition with the submission's match number
+        competition_code: Competition code, for the error message
+        match_number: Submitted match number
+        is_playoff: Whether the submission is for a playoff match
+        set_number: Playoff set, if the client sent one
+
+    Returns:
+        (match, error) where match is None and error says why when no single
+        match fits
+    """
+    fitting = [
+        match
+        for match in candidates
+        if (match.match_type != "qualification") == is_playoff
+        and (set_number is None or match.set_number == set_number)
+    ]
+    if len(fitting) == 1:
+        return fitting[0], None
+
+    kind = "Playoff match" if is_playoff else "Match"
+    if not fitting:
+        return None, f"{kind} {match_number} at {competition_code} not found"
+    return None, (
+        f"{kind} {match_number} at {competition_code} is ambiguous "
+        f"({len(fitting)} sets); pass set_number"
+    )
+
+
+def build_robot_actions(submission, match, team, recorded_by) -> list:
+    """
+    Turn a submission's auto and tele arrays into unsaved RobotActions.
+
+    Start and end times follow from the cumulative durations within each period.
+
+    Args:
+        submission: BulkRobotActionsSchema (or a schema extending it)
+        match: Match instance
+        team: Team instance
+        recorded_by: User who scouted the match, or None
+
+    Returns:
+        list of unsaved RobotAction instances
+    """
+    actions = []
+    for period_start, items in (
+        (AUTO_START_SECONDS, submission.auto),
+        (TELEOP_START_SECONDS, submission.tele),
+    ):
+        current_time = period_start
+        for action_item in items:
+            end_time = current_time + action_item.duration
+            actions.append(
+                RobotAction(
+                    match=match,
+                    team=team,
+                    action_type=action_item.action,
+                    start_time=current_time,
+                    end_time=end_time,
+                    is_playoff=submission.is_playoff,
+                    fuel=action_item.fuel,
+                    notes=submission.notes if submission.notes else None,
+                    recorded_by=recorded_by,
+                )
+            )
+            current_time = end_time
+    return actions
+
+
+def replace_robot_actions(match, team, recorded_by, actions: list) -> None:
+    """
+    Replace a team's robot actions for a match with a single bulk insert,
+    and its MatchTimeline with them.
+
+    Must run inside a transaction so the ownership check and the replacement
+    cannot interleave with another submission.
+
+    Raises:
+        PermissionDenied: The team and match were scouted by another user
+    """
+    existing_actions = RobotAction.objects.filter(match=match, team=team)
+
+    owner = list(
+        existing_actions.order_by().values_list("recorded_by_id", flat=True)[:1]
+    )
+    if owner:
+        # Only the original scouter may replace the actions
+        if owner[0] != (recorded_by.pk if recorded_by else None):
+            raise PermissionDenied(
+                "This team and match combination has already been scouted by "
+                "another user. Only the original scouter can add more actions."
+            )
+        existing_actions.delete()
+
+    RobotAction.objects.bulk_create(actions)
+    if actions:
+        save_match_timelines(actions)
+    else:
+        MatchTimeline.objects.filter(match=match, team=team).delete()
+
+
+def apply_submission_batch(submissions: list, recorded_by) -> dict:
+    """
+    Write a batch of team-match submissions in one transaction.
+
+    Each submission runs in its own savepoint, so one rejected submission
+    does not undo the others. Submissions whose idempotency key already has
+    a receipt (a retried upload) are not written again. The action summaries
+    of the teams written are refreshed once per competition at the end.
+
+    Args:
+        submissions: list of BatchRobotActionSubmissionSchema
+        recorded_by: User who scouted the matches, or None
+
+    Returns:
+        dict with created, duplicates and failed counts and per-submission
+        results (idempotency_key, status, actions, error)
+    """
+    keys = [submission.idempotency_key for submission in submissions]
+    receipts = {
+        receipt.idempotency_key: receipt
+        for receipt in SubmissionReceipt.objects.filter(idempotency_key__in=keys)
+    }
+
+    # Every match and team the batch refers to, in two queries
+    matches = {}
+    for match in Match.objects.filter(
+        competition__code__in={s.competition_code for s in submissions},
+        match_number__in={s.match_number for s in submissions},
+    ).select_related("competition"):
+        matches.setdefault((match.competition.code, match.match_number), []).append(
+            match
+        )
+    teams = Team.objects.in_bulk(
+        {s.team_number for s in submissions}, field_name="number"
+    )
+
+    results = []
+    written = {}  # competition_id -> (competition, team_ids)
+    with transaction.atomic():
+        for submission in submissions:
+            key = submission.idempotency_key
+            result = {"idempotency_key": key, "status": "created", "actions": 0}
+            results.append(result)
+
+            if key in receipts:
+                result["status"] = "duplicate"
+                result["actions"] = receipts[key].action_count
+                continue
+
+            match, error = resolve_match(
+                matches.get((submission.competition_code, submission.match_number), []),
+                submission.competition_code,
+                submission.match_number,
+                submission.is_playoff,
+                submission.set_number,
+            )
+            team = teams.get(submission.team_number)
+            if match is None or team is None:
+                result["status"] = "not_found"
+                result["error"] = error or f"Team {submission.team_number} not found"
+                continue
+
+            actions = build_robot_actions(submission, match, team, recorded_by)
+            try:
+                with transaction.atomic():
+                    replace_robot_actions(match, team, recorded_by, actions)
+                    receipts[key] = SubmissionReceipt.objects.create(
+                        idempotency_key=key,
+                        match=match,
+                        team=team,
+                        recorded_by=recorded_by,
+                        action_count=len(actions),
+                    )
+            except PermissionDenied as e:
+                result["status"] = "rejected"
+                result["error"] = str(e)
+                continue
+            except IntegrityError:
+                # Another upload of the same submission committed first
+                result["status"] = "duplicate"
+                continue
+
+            result["actions"] = len(actions)
+            written.setdefault(match.competition_id, (match.competition, set()))[1].add(
+                team.pk
+            )
+
+        for competition, team_ids in written.values():
+            refresh_action_summaries(competition, team_ids)
+
+    counts = {
+        status: sum(1 for result in results if result["status"] == status)
+        for status in ("created", "duplicate")
+    }
+    failed = len(results) - counts["created"] - counts["duplicate"]
+    logger.info(
+        f"Applied submission batch: {counts['created']} created, "
+        f"{counts['duplicate']} duplicate, {failed} failed"
+    )
+
+    return {
+        "created": counts["created"],
+        "duplicates": counts["duplicate"],
+        "failed": failed,
+        "results": results,
+    }
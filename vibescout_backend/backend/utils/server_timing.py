@@ -0,0 +1,48 @@
+"""Server-Timing header for measuring request handling time"""
+
+import time
+
+from django.db import connection
+
+
+class ServerTiming:
+    """
+    Time a block of request handling and the database queries it runs.
+
+    Usage:
+        with ServerTiming() as timing:
+            ...
+        response["Server-Timing"] = timing.header()
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.total_seconds = 0.0
+        self._wrapper = None
+
+    def _execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self._execute)
+        self._wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total_seconds = time.perf_counter() - self._started
+        self._wrapper.__exit__(*exc_info)
+        return False
+
+    def header(self) -> str:
+        """Server-Timing value with db and total durations in milliseconds"""
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"total;dur={self.total_seconds * 1000:.1f}"
+        )
@@ -0,0 +1,115 @@
+"""Adaptive TBA polling cadence driven by predicted match times."""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Results usually post a few minutes after a match's predicted start
+RESULT_WINDOW_START_SECONDS = 2 * 60
+RESULT_WINDOW_END_SECONDS = 15 * 60
+
+# Overdue results past this are treated as stalled (replays, long field faults)
+LATE_LIMIT_SECONDS = 60 * 60
+
+# Most extra polls a tick makes to catch up on results that are already overdue
+CATCH_UP_POLL_LIMIT = 10
+
+# Scheduler ticks run every minute; a poll due within half a tick is taken now
+TICK_TOLERANCE_SECONDS = 30
+
+
+def get_sync_cadence() -> dict:
+    """
+    Poll intervals (in seconds) for each scheduler mode.
+
+    Environment Variables:
+        TASK_SYNC_FAST_INTERVAL_MINUTES: While a result is expected (default: 1)
+        TASK_SYNC_LATE_INTERVAL_MINUTES: When the next match is close or running late (default: 3)
+        TASK_SYNC_IDLE_INTERVAL_MINUTES: During gaps such as lunch, or with no schedule (default: 15)
+        TASK_SYNC_OVERNIGHT_INTERVAL_MINUTES: Overnight and between event days (default: 120)
+        TASK_SYNC_OVERNIGHT_GAP_HOURS: Gap before the next match that counts as overnight (default: 3)
+    """
+    return {
+        "fast": int(os.getenv("TASK_SYNC_FAST_INTERVAL_MINUTES", "1")) * 60,
+        "late": int(os.getenv("TASK_SYNC_LATE_INTERVAL_MINUTES", "3")) * 60,
+        "idle": int(os.getenv("TASK_SYNC_IDLE_INTERVAL_MINUTES", "15")) * 60,
+        "overnight": int(os.getenv("TASK_SYNC_OVERNIGHT_INTERVAL_MINUTES", "120")) * 60,
+        "overnight_gap": int(os.getenv("TASK_SYNC_OVERNIGHT_GAP_HOURS", "3")) * 3600,
+    }
+
+
+def plan_poll(
+    next_predicted_time: int,
+    last_result_time: int,
+    last_poll_time: int,
+    now: int,
+    cadence: dict = None,
+) -> dict:
+    """
+    Decide whether the match sync should poll TBA on this tick.
+
+    Args:
+        next_predicted_time: Predicted start of the next unplayed qualification
+                             match (0 if unknown)
+        last_result_time: End time of the latest played qualification match (0 if none)
+        last_poll_time: Unix timestamp of the previous poll (0 if never polled)
+        now: Current Unix timestamp
+        cadence: Intervals from get_sync_cadence() (read from env if None)
+
+    Returns:
+        dict with poll (bool), mode, interval (seconds) and a human-readable reason
+    """
+    if cadence is None:
+        cadence = get_sync_cadence()
+
+    if next_predicted_time:
+        window_start = next_predicted_time + RESULT_WINDOW_START_SECONDS
+        window_end = next_predicted_time + RESULT_WINDOW_END_SECONDS
+
+        if now < window_start:
+            gap = window_start - now
+            if gap >= cadence["overnight_gap"]:
+                mode = "overnight"
+            elif gap <= 2 * cadence["late"]:
+                # Predicted times drift, so check once more before the window opens
+                mode = "approaching"
+            else:
+                mode = "waiting"
+            reason = f"next result expected in {gap // 60} min"
+        elif now <= window_end:
+            mode = "match"
+            reason = f"result expected, match started {(now - next_predicted_time) // 60} min ago"
+        elif now - window_end <= LATE_LIMIT_SECONDS:
+            mode = "late"
+            reason = f"result overdue by {(now - window_end) // 60} min"
+        else:
+            mode = "stalled"
+            reason = f"result overdue by {(now - window_end) // 60} min"
+    elif last_result_time and now - last_result_time >= cadence["overnight_gap"]:
+        mode = "overnight"
+        reason = f"no scheduled matches, last result {(now - last_result_time) // 3600} h ago"
+    else:
+        mode = "idle"
+        reason = "no scheduled matches"
+
+    interval = {
+        "overnight": cadence["overnight"],
+        "waiting": cadence["idle"],
+        "idle": cadence["idle"],
+        "stalled": cadence["idle"],
+        "approaching": cadence["late"],
+        "late": cadence["late"],
+        "match": cadence["fast"],
+    }[mode]
+
+    since_last = now - last_poll_time
+    poll = not last_poll_time or since_last >= interval - TICK_TOLERANCE_SECONDS
+
+    return {
+        "poll": poll,
+        "mode": mode,
+        "interval": interval,
+        "reason": reason,
+        "since_last_poll": since_last if last_poll_time else None,
+    }
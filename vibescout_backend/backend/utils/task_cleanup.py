@@ -0,0 +1,105 @@
+"""Utility functions for pruning django-q task history without long write locks"""
+
+import logging
+import time
+
+from django.db import transaction
+from django.db.models.functions import Length
+
+logger = logging.getLogger(__name__)
+
+
+def new_cleanup_stats() -> dict:
+    """Counters shared by the chunked cleanup helpers"""
+    return {"deleted": 0, "stripped": 0, "chunks": 0, "max_lock_seconds": 0.0}
+
+
+def _run_in_chunks(queryset, chunk_size, pause, stats, write) -> int:
+    """
+    Apply ``write`` to the rows of ``queryset`` in primary key order.
+
+    Each chunk is selected and written in its own short transaction, so the
+    SQLite write lock is released between chunks and other writers (scout
+    uploads, syncs) get in during the pause.
+
+    Returns:
+        Number of rows written
+    """
+    total = 0
+    last_pk = None
+
+    while True:
+        chunk = queryset.order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            pks = list(chunk.values_list("pk", flat=True)[:chunk_size])
+            if pks:
+                write(queryset.model.objects.filter(pk__in=pks))
+        held = time.perf_counter() - started
+
+        if not pks:
+            break
+
+        total += len(pks)
+        last_pk = pks[-1]
+        stats["chunks"] += 1
+        stats["max_lock_seconds"] = max(stats["max_lock_seconds"], held)
+
+        if len(pks) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return total
+
+
+def delete_in_chunks(queryset, chunk_size=500, pause=0.05, stats=None) -> int:
+    """
+    Delete the rows of a queryset in primary key ordered chunks.
+
+    Args:
+        queryset: Rows to delete (must not need cascades)
+        chunk_size: Rows deleted per transaction
+        pause: Seconds to sleep between chunks
+        stats: Optional dict from new_cleanup_stats() to accumulate into
+
+    Returns:
+        Number of rows deleted
+    """
+    stats = stats if stats is not None else new_cleanup_stats()
+    deleted = _run_in_chunks(
+        queryset, chunk_size, pause, stats, lambda rows: rows.delete()
+    )
+    stats["deleted"] += deleted
+    return deleted
+
+
+def strip_large_results(queryset, max_bytes, chunk_size=500, pause=0.05, stats=None) -> int:
+    """
+    Drop stored results larger than ``max_bytes`` from tasks that are kept.
+
+    The task rows (name, function, timings, success) stay; only the pickled
+    result payload, e.g. a full sync report, is cleared.
+
+    Args:
+        queryset: Task rows to check
+        max_bytes: Largest stored result to keep
+        chunk_size: Rows updated per transaction
+        pause: Seconds to sleep between chunks
+        stats: Optional dict from new_cleanup_stats() to accumulate into
+
+    Returns:
+        Number of results stripped
+    """
+    stats = stats if stats is not None else new_cleanup_stats()
+    large = queryset.annotate(result_size=Length("result")).filter(
+        result_size__gt=max_bytes
+    )
+    stripped = _run_in_chunks(
+        large, chunk_size, pause, stats, lambda rows: rows.update(result=None)
+    )
+    stats["stripped"] += stripped
+    return stripped
@@ -0,0 +1,207 @@
+"""Single-flight deduplication and debouncing for django-q background tasks."""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Debounced executions are django-q ONCE schedules named with this prefix
+SCHEDULE_PREFIX = "coalesce:"
+
+ACTIVE_STATES = ["queued", "running"]
+
+
+def coalesce_key(func: str, **identity) -> str:
+    """
+    Idempotency key for a task and the objects it works on.
+
+    Example: coalesce_key("backend.tasks.download_match_video_task", match=42)
+    returns "download_match_video_task:match:42".
+    """
+    parts = [f"{name}:{value}" for name, value in sorted(identity.items())]
+    return ":".join([func.rsplit(".", 1)[-1], *parts])
+
+
+def _stale_cutoff(func: str, now):
+    from backend.task_queues import queue_for, queue_setting
+
+    # A claim held for two task timeouts belongs to a worker that died
+    timeout = queue_setting(queue_for(func), "timeout") or 300
+    return now - timedelta(seconds=2 * timeout)
+
+
+def enqueue_once(
+    func: str,
+    *args,
+    key: str,
+    debounce: int = 0,
+    cooldown: int = 0,
+    rerun: bool = False,
+    task_name: str = None,
+    **kwargs,
+) -> dict:
+    """
+    Queue a task unless an execution for the same key is already queued or running.
+
+    Args:
+        func: Dotted path of the task function
+        *args: JSON-serializable positional task arguments
+        key: Idempotency key (see coalesce_key)
+        debounce: Seconds to wait before running; triggers inside the window
+                  merge into that one run (ignored when tasks run synchronously)
+        cooldown: Seconds after a finished run during which triggers are dropped
+        rerun: Run once more after the current execution when triggered while running
+        task_name: django-q task name
+        **kwargs: JSON-serializable keyword task arguments
+
+    Returns:
+        dict with queued (bool), reason ("queued", "debounced", "in_flight",
+        "cooldown") and key
+    """
+    from django_q.models import Schedule
+    from django_q.tasks import async_task
+
+    from backend.models import CoalescedTask
+    from backend.task_queues import queue_for
+
+    now = timezone.now()
+    if settings.Q_CLUSTER.get("sync"):
+        # Without a cluster there is no scheduler to run a delayed task
+        debounce = 0
+
+    claim, _ = CoalescedTask.objects.get_or_create(key=key, defaults={"func": func})
+    claims = CoalescedTask.objects.filter(pk=claim.pk)
+    claims.update(requests=F("requests") + 1)
+
+    if (
+        cooldown
+        and claim.state == "idle"
+        and claim.finished_at
+        and now - claim.finished_at < timedelta(seconds=cooldown)
+    ):
+        claims.update(suppressed=F("suppressed") + 1)
+        logger.debug(f"Dropped {key}: finished {claim.finished_at}, in cooldown")
+        return {"queued": False, "reason": "cooldown", "key": key}
+
+    # Compare-and-set: only one caller moves the claim out of idle (or takes over a dead one)
+    cutoff = _stale_cutoff(func, now)
+    acquired = claims.filter(
+        Q(state="idle")
+        | Q(state="queued", run_after__lt=cutoff)
+        | Q(state="running", started_at__lt=cutoff)
+    ).update(
+        state="queued",
+        func=func,
+        args=list(args),
+        kwargs=kwargs,
+        task_name=task_name or "",
+        rerun_requested=False,
+        requested_at=now,
+        run_after=now + timedelta(seconds=debounce),
+    )
+
+    if not acquired:
+        claims.update(suppressed=F("suppressed") + 1)
+        if rerun:
+            claims.filter(state="running").update(rerun_requested=True)
+        logger.debug(f"Coalesced {key} into the execution already in flight")
+        return {"queued": False, "reason": "in_flight", "key": key}
+
+    if debounce:
+        Schedule.objects.create(
+            name=f"{SCHEDULE_PREFIX}{key}"[:100],
+            func="backend.utils.task_coalescing.run_coalesced",
+            args=repr(key),
+            schedule_type=Schedule.ONCE,
+            repeats=-1,  # ONCE schedules with negative repeats are deleted after running
+            next_run=now + timedelta(seconds=debounce),
+            cluster=queue_for(func),
+        )
+        return {"queued": True, "reason": "debounced", "key": key}
+
+    # Runs on the wrapped task's queue
+    async_task(
+        "backend.utils.task_coalescing.run_coalesced",
+        key,
+        task_name=task_name,
+        cluster=queue_for(func),
+    )
+    return {"queued": True, "reason": "queued", "key": key}
+
+
+def run_coalesced(key: str):
+    """
+    django-q entry point that runs the task claimed under a key.
+
+    Releases the claim when the task finishes (or fails) and queues one more
+    run if a rerun was requested while it was running.
+
+    Returns:
+        The task's own return value
+    """
+    from backend.models import CoalescedTask
+
+    claim = CoalescedTask.objects.filter(key=key, state="queued").first()
+    if claim is None:
+        return {"success": True, "message": f"No queued task for {key}"}
+
+    claims = CoalescedTask.objects.filter(pk=claim.pk)
+    if not claims.filter(state="queued").update(
+        state="running", started_at=timezone.now(), runs=F("runs") + 1
+    ):
+        return {"success": True, "message": f"{key} was started by another worker"}
+
+    try:
+        return import_string(claim.func)(*claim.args, **claim.kwargs)
+    finally:
+        finished_at = timezone.now()
+        rerun = claims.filter(rerun_requested=True).update(
+            state="idle", rerun_requested=False, finished_at=finished_at
+        )
+        claims.filter(state="running").update(state="idle", finished_at=finished_at)
+        if rerun:
+            enqueue_once(
+                claim.func,
+                *claim.args,
+                key=key,
+                task_name=claim.task_name or None,
+                **claim.kwargs,
+            )
+
+
+def coalescing_stats() -> dict:
+    """
+    Requests, executions and suppressed duplicates per task function.
+
+    Returns:
+        dict with totals and a per-function breakdown
+    """
+    from backend.models import CoalescedTask
+
+    tasks = list(
+        CoalescedTask.objects.values("func")
+        .annotate(
+            keys=Count("id"),
+            requests=Sum("requests"),
+            runs=Sum("runs"),
+            suppressed=Sum("suppressed"),
+            in_flight=Count("id", filter=Q(state__in=ACTIVE_STATES)),
+        )
+        .order_by("func")
+    )
+
+    requests = sum(task["requests"] for task in tasks)
+    suppressed = sum(task["suppressed"] for task in tasks)
+
+    return {
+        "requests": requests,
+        "runs": sum(task["runs"] for task in tasks),
+        "suppressed": suppressed,
+        "suppressed_ratio": round(suppressed / requests, 3) if requests else 0.0,
+        "tasks": tasks,
+    }
@@ -0,0 +1,69 @@
+"""Factory for The Blue Alliance API clients"""
+
+import hashlib
+import logging
+import os
+
+import tbapy
+
+logger = logging.getLogger(__name__)
+
+
+class CachedTBA(tbapy.TBA):
+    """
+    tbapy client that shares GET responses through the Django "tba" cache.
+
+    Every monitored competition runs its own sync tasks, often in different
+    worker processes. Responses are cached by URL for TBA_CACHE_SECONDS
+    (default: 20) so that overlapping tasks, and resources shared between
+    events such as teams, hit TBA once. Set TBA_CACHE_SECONDS=0 to disable.
+    """
+
+    def _get(self, url):
+        from django.core.cache import caches
+
+        timeout = int(os.getenv("TBA_CACHE_SECONDS", "20"))
+        if timeout <= 0:
+            return super()._get(url)
+
+        full_url = self.READ_URL_PRE + url
+        key = "tba:" + hashlib.sha1(full_url.encode()).hexdigest()
+        cache = caches["tba"]
+
+        raw = cache.get(key)
+        if raw is None:
+            raw = super()._get(url)
+            cache.set(key, raw, timeout)
+        else:
+            logger.debug(f"TBA cache hit for {url}")
+        return raw
+
+
+def get_tba_client(api_key: str = None) -> tbapy.TBA:
+    """
+    Build a TBA API client.
+
+    When the TBA_API_URL environment variable is set, requests are sent to
+    that base URL instead of thebluealliance.com. This is how the sync tasks
+    and commands are pointed at the local replay server
+    (``python manage.py tba_replay_server``).
+
+    Args:
+        api_key: TBA API key. If None, uses TBA_API_KEY from environment.
+
+    Returns:
+        tbapy.TBA client backed by the shared response cache
+    """
+    if api_key is None:
+        api_key = os.getenv("TBA_API_KEY", "")
+
+    tba = CachedTBA(api_key)
+
+    base_url = os.getenv("TBA_API_URL")
+    if base_url:
+        if not base_url.endswith("/"):
+            base_url += "/"
+        tba.READ_URL_PRE = base_url
+        logger.debug(f"Using TBA API at {base_url}")
+
+    return tba
@@ -0,0 +1,149 @@
+"""Utility functions for reading TBA JSON dumps without loading them whole"""
+
+import gzip
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(fp, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Incrementally parse a top-level JSON array from a text stream.
+
+    Only one chunk plus the element currently being decoded is held in memory,
+    so large TBA dumps can be processed element by element.
+
+    Args:
+        fp: Text file object positioned at the start of a JSON array
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        Each decoded element of the array
+
+    Raises:
+        ValueError: If the stream is not a JSON array
+        json.JSONDecodeError: If an element is malformed
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        # Skip whitespace (and element separators once inside the array)
+        while True:
+            while pos < len(buf) and (
+                buf[pos] in _WHITESPACE or (started and buf[pos] == ",")
+            ):
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            fill()
+
+        if pos >= len(buf):
+            if started:
+                raise ValueError("Unexpected end of JSON array")
+            return
+
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("TBA dump must be a JSON array")
+            started = True
+            pos += 1
+            continue
+
+        if buf[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+
+        # A scalar ending exactly at the buffer edge may be truncated
+        if end == len(buf) and not eof and not isinstance(obj, (dict, list)):
+            fill()
+            continue
+
+        yield obj
+        pos = end
+
+        # Drop consumed text so the buffer does not grow with the file
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def iter_dump_files(path):
+    """
+    List the dump files under a path.
+
+    Args:
+        path: A dump file, or a directory searched recursively for
+              ``*.json`` and ``*.json.gz`` files (e.g. a whole season)
+
+    Returns:
+        Sorted list of Path objects
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(
+            p
+            for p in path.rglob("*")
+            if p.is_file() and (p.name.endswith(".json") or p.name.endswith(".json.gz"))
+        )
+    return [path]
+
+
+def open_dump(path):
+    """Open a dump file as text, transparently handling gzip"""
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_dump_matches(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream TBA match dictionaries from dump files and directories.
+
+    Each file is expected to hold a TBA ``/event/{key}/matches`` response.
+    Elements that are not match objects are skipped.
+
+    Args:
+        paths: Iterable of dump files or directories
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        (path, match_data) tuples
+    """
+    for root in paths:
+        for dump_path in iter_dump_files(root):
+            logger.info(f"Reading TBA dump {dump_path}")
+            with open_dump(dump_path) as fp:
+                for item in iter_json_array(fp, chunk_size=chunk_size):
+                    if (
+                        isinstance(item, dict)
+                        and "key" in item
+                        and "alliances" in item
+                    ):
+                        yield dump_path, item
+                    else:
+                        logger.debug(f"Skipping non-match element in {dump_path}")
@@ -0,0 +1,507 @@
+"""
+Local stand-in for The Blue Alliance API that replays recorded responses.
+
+A recording is a directory with one sub-directory per event::
+
+    recordings/
+        2025gadal/
+            event.json      # /event/{key}
+            teams.json      # /event/{key}/teams/simple
+            matches.json    # /event/{key}/matches
+            rankings.json   # /event/{key}/rankings (optional)
+
+Only ``matches.json`` is required, so the TBA dumps in ``2020_data`` can be
+replayed directly. Missing event and team responses are synthesized from the
+matches.
+
+The server keeps a replay clock. Match results are only revealed once the
+clock passes the match's ``post_result_time``; before that the match is served
+the way TBA serves a scheduled match (scores of -1, no breakdown). Rankings
+are computed from the revealed qualification matches.
+
+Point the sync code at the server with ``TBA_API_URL`` (see
+``backend.utils.tba_client``).
+"""
+
+import email.utils
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from backend.utils.tba_dump import iter_dump_matches
+
+logger = logging.getLogger(__name__)
+
+# Seconds between actual_time and post_result_time when a recording lacks it
+DEFAULT_RESULT_DELAY = 180
+
+
+class ReplayClock:
+    """
+    Replay clock in unix seconds.
+
+    The clock either advances in real time scaled by ``speed`` or, with
+    ``speed=0``, only moves when ``set`` or ``advance`` is called.
+    """
+
+    def __init__(self, start: float = 0, speed: float = 0):
+        self._lock = threading.Lock()
+        self._base = start
+        self._speed = speed
+        self._anchor = time.monotonic()
+
+    def now(self) -> float:
+        with self._lock:
+            return self._base + (time.monotonic() - self._anchor) * self._speed
+
+    def set(self, timestamp: float):
+        with self._lock:
+            self._base = timestamp
+            self._anchor = time.monotonic()
+
+    def advance(self, seconds: float):
+        self.set(self.now() + seconds)
+
+    def set_speed(self, speed: float):
+        current = self.now()
+        with self._lock:
+            self._speed = speed
+        self.set(current)
+
+
+def _result_time(match_data: dict) -> int:
+    """Unix time at which TBA posted the match result (0 if never played)"""
+    if match_data.get("post_result_time"):
+        return match_data["post_result_time"]
+    if match_data.get("actual_time"):
+        return match_data["actual_time"] + DEFAULT_RESULT_DELAY
+    return 0
+
+
+def _blank_match(match_data: dict) -> dict:
+    """Return a copy of a match as TBA serves it before results are posted"""
+    blank = dict(match_data)
+    blank["alliances"] = {
+        color: {**alliance, "score": -1}
+        for color, alliance in match_data.get("alliances", {}).items()
+    }
+    blank["score_breakdown"] = None
+    blank["actual_time"] = None
+    blank["post_result_time"] = None
+    blank["winning_alliance"] = ""
+    blank["videos"] = []
+    return blank
+
+
+class ReplayStore:
+    """Recorded TBA responses for one or more events"""
+
+    def __init__(self):
+        self.events = {}  # event key -> event dict
+        self.teams = {}  # event key -> list of simple team dicts
+        self.matches = {}  # event key -> list of match dicts
+        self.rankings = {}  # event key -> recorded rankings dict
+
+    @classmethod
+    def load(cls, path) -> "ReplayStore":
+        """
+        Load a recording directory, a single event directory or a match dump.
+
+        Args:
+            path: Recording root, event directory or TBA matches dump file
+        """
+        store = cls()
+        path = Path(path)
+
+        if path.is_file():
+            store._load_matches(path)
+        elif (path / "matches.json").exists():
+            store._load_event_dir(path)
+        else:
+            for event_dir in sorted(p for p in path.iterdir() if p.is_dir()):
+                if (event_dir / "matches.json").exists():
+                    store._load_event_dir(event_dir)
+            # Plain dumps next to the event directories (e.g. 2020_data)
+            for dump in sorted(path.glob("*.json")):
+                store._load_matches(dump)
+
+        for event_key in store.matches:
+            store._fill_missing(event_key)
+
+        return store
+
+    def _load_event_dir(self, event_dir: Path):
+        event_key = event_dir.name
+        self._load_matches(event_dir / "matches.json", event_key)
+        for name, target in (
+            ("event.json", self.events),
+            ("teams.json", self.teams),
+            ("rankings.json", self.rankings),
+        ):
+            file_path = event_dir / name
+            if file_path.exists():
+                with open(file_path, "r", encoding="utf-8") as fp:
+                    target[event_key] = json.load(fp)
+
+    def _load_matches(self, dump_path: Path, event_key: str = None):
+        for _, match_data in iter_dump_matches([dump_path]):
+            key = event_key or match_data.get("event_key") or match_data["key"].split("_")[0]
+            self.matches.setdefault(key, []).append(match_data)
+
+    def _fill_missing(self, event_key: str):
+        """Synthesize event and team responses that were not recorded"""
+        if event_key not in self.events:
+            self.events[event_key] = {
+                "key": event_key,
+                "event_code": event_key[4:],
+                "name": event_key,
+                "year": int(event_key[:4]),
+            }
+        if event_key not in self.teams:
+            numbers = set()
+            for match_data in self.matches[event_key]:
+                for alliance in match_data.get("alliances", {}).values():
+                    numbers.update(
+                        int(key.replace("frc", ""))
+                        for key in alliance.get("team_keys", [])
+                    )
+            self.teams[event_key] = [
+                {
+                    "key": f"frc{number}",
+                    "team_number": number,
+                    "nickname": f"Team {number}",
+                    "name": f"Team {number}",
+                }
+                for number in sorted(numbers)
+            ]
+
+    def result_times(self, event_key: str) -> list:
+        """Sorted result-post times of every played match of an event"""
+        return sorted(
+            t for t in (_result_time(m) for m in self.matches.get(event_key, [])) if t
+        )
+
+    def match_at(self, match_data: dict, now: float) -> dict:
+        result_time = _result_time(match_data)
+        if result_time and now >= result_time:
+            return match_data
+        return _blank_match(match_data)
+
+    def matches_at(self, event_key: str, now: float) -> list:
+        return [self.match_at(m, now) for m in self.matches.get(event_key, [])]
+
+    def find_match(self, match_key: str):
+        event_key = match_key.split("_")[0]
+        for match_data in self.matches.get(event_key, []):
+            if match_data.get("key") == match_key:
+                return match_data
+        return None
+
+    def rankings_at(self, event_key: str, now: float) -> dict:
+        """Rankings as of ``now``, computed from revealed qualification matches"""
+        times = self.result_times(event_key)
+        if event_key in self.rankings and times and now >= times[-1]:
+            return self.rankings[event_key]
+
+        ranking_points = Counter()
+        records = {}
+        played = Counter()
+
+        for match_data in self.matches.get(event_key, []):
+            if match_data.get("comp_level") != "qm":
+                continue
+            result_time = _result_time(match_data)
+            if not result_time or now < result_time:
+                continue
+
+            alliances = match_data.get("alliances", {})
+            breakdown = match_data.get("score_breakdown") or {}
+            winner = match_data.get("winning_alliance") or ""
+
+            for color in ("blue", "red"):
+                alliance = alliances.get(color, {})
+                rp = (breakdown.get(color) or {}).get("rp")
+                if rp is None:
+                    rp = 2 if winner == color else (1 if winner == "" else 0)
+                for team_key in alliance.get("team_keys", []):
+                    if team_key in alliance.get("surrogate_team_keys", []):
+                        continue
+                    record = records.setdefault(
+                        team_key, {"wins": 0, "losses": 0, "ties": 0}
+                    )
+                    if winner == color:
+                        record["wins"] += 1
+                    elif winner == "":
+                        record["ties"] += 1
+                    else:
+                        record["losses"] += 1
+                    ranking_points[team_key] += rp
+                    played[team_key] += 1
+
+        order = sorted(
+            records,
+            key=lambda k: (-ranking_points[k] / played[k], -records[k]["wins"], k),
+        )
+        return {
+            "rankings": [
+                {
+                    "rank": rank,
+                    "team_key": team_key,
+                    "record": records[team_key],
+                    "matches_played": played[team_key],
+                    "dq": 0,
+                    "sort_orders": [round(ranking_points[team_key] / played[team_key], 2)],
+                    "extra_stats": [ranking_points[team_key]],
+                }
+                for rank, team_key in enumerate(order, start=1)
+            ],
+            "sort_order_info": [{"name": "Ranking Score", "precision": 2}],
+            "extra_stats_info": [{"name": "Total Ranking Points", "precision": 0}],
+        }
+
+
+class ReplayStats:
+    """Request counters exposed at /_replay/stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.not_found = 0
+            self.by_route = Counter()
+
+    def record(self, route: str, status: int):
+        with self._lock:
+            self.requests += 1
+            self.by_route[route] += 1
+            if status == 304:
+                self.not_modified += 1
+            elif status == 404:
+                self.not_found += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "not_found": self.not_found,
+                "by_route": dict(self.by_route),
+            }
+
+
+# (route name, pattern) pairs for the read API paths served by the replay
+ROUTES = [
+    ("event", re.compile(r"^event/(?P<event>[^/]+)(?:/simple)?$")),
+    ("event_teams", re.compile(r"^event/(?P<event>[^/]+)/teams(?:/simple)?$")),
+    ("event_matches", re.compile(r"^event/(?P<event>[^/]+)/matches(?:/simple)?$")),
+    ("event_rankings", re.compile(r"^event/(?P<event>[^/]+)/rankings$")),
+    ("match", re.compile(r"^match/(?P<match>[^/]+?)(?:/simple)?$")),
+    ("status", re.compile(r"^status$")),
+]
+
+
+class TBAReplayServer(ThreadingHTTPServer):
+    """
+    HTTP server mimicking the TBA read API from a ReplayStore.
+
+    Args:
+        address: (host, port) to bind; port 0 picks a free port
+        store: ReplayStore with the recorded responses
+        clock: ReplayClock controlling which results are visible
+        latency: Seconds added to every API response
+        jitter: Maximum random seconds added on top of latency
+        max_age: Cache-Control max-age sent with responses
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, store, clock, latency=0.0, jitter=0.0, max_age=0):
+        super().__init__(address, ReplayRequestHandler)
+        self.store = store
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.max_age = max_age
+        self.stats = ReplayStats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v3/"
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def resolve(self, path: str):
+        """
+        Resolve an API path to a response body.
+
+        Returns:
+            (route name, status code, JSON-serializable body)
+        """
+        now = self.clock.now()
+        store = self.store
+
+        for route, pattern in ROUTES:
+            found = pattern.match(path)
+            if not found:
+                continue
+            params = found.groupdict()
+            event_key = params.get("event")
+
+            if route == "status":
+                return route, 200, {"current_season": time.gmtime(now).tm_year}
+            if route == "match":
+                match_data = store.find_match(params["match"])
+                if match_data is None:
+                    return route, 404, {
+                        "Errors": [{"match_id": f"{params['match']} does not exist"}]
+                    }
+                return route, 200, store.match_at(match_data, now)
+            if event_key not in store.matches:
+                return route, 404, {
+                    "Errors": [{"event_id": f"{event_key} does not exist"}]
+                }
+            if route == "event":
+                return route, 200, store.events[event_key]
+            if route == "event_teams":
+                return route, 200, store.teams[event_key]
+            if route == "event_matches":
+                return route, 200, store.matches_at(event_key, now)
+            if route == "event_rankings":
+                return route, 200, store.rankings_at(event_key, now)
+
+        return "unknown", 404, {"Errors": [{"path": f"{path} does not exist"}]}
+
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    server: TBAReplayServer
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+
+        if parsed.path.startswith("/_replay/"):
+            return self._control(parsed)
+
+        if not parsed.path.startswith("/api/v3/"):
+            return self._send_json(404, {"Errors": [{"path": "not found"}]})
+
+        server = self.server
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        route, status, body = server.resolve(parsed.path[len("/api/v3/"):])
+        if status != 200:
+            server.stats.record(route, status)
+            return self._send_json(status, body)
+
+        payload = json.dumps(body, sort_keys=True).encode()
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={server.max_age}",
+            "Last-Modified": email.utils.formatdate(server.clock.now(), usegmt=True),
+        }
+
+        if self.headers.get("If-None-Match") == etag:
+            server.stats.record(route, 304)
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        server.stats.record(route, 200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/_replay/"):
+            return self._control(parsed)
+        return self._send_json(405, {"Errors": [{"method": "read-only replay"}]})
+
+    def _control(self, parsed):
+        """Clock and statistics endpoints used by benchmarks"""
+        server = self.server
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == "/_replay/clock":
+            if "set" in query:
+                server.clock.set(float(query["set"]))
+            if "advance" in query:
+                server.clock.advance(float(query["advance"]))
+            if "speed" in query:
+                server.clock.set_speed(float(query["speed"]))
+            return self._send_json(200, {"now": server.clock.now()})
+
+        if parsed.path == "/_replay/stats":
+            if query.get("reset"):
+                server.stats.reset()
+            return self._send_json(200, server.stats.as_dict())
+
+        return self._send_json(404, {"Errors": [{"path": "not found"}]})
+
+
+def record_event(tba, event_key: str, output_dir) -> Path:
+    """
+    Record the TBA responses used by the sync code for one event.
+
+    Args:
+        tba: TBA client (see backend.utils.tba_client.get_tba_client)
+        event_key: TBA event key (e.g., 2025gacmp)
+        output_dir: Recording root directory
+
+    Returns:
+        Path of the event recording directory
+    """
+    event_dir = Path(output_dir) / event_key
+    event_dir.mkdir(parents=True, exist_ok=True)
+
+    responses = {
+        "event.json": tba.event(event_key),
+        "teams.json": tba.event_teams(event_key, simple=True),
+        "matches.json": tba.event_matches(event_key),
+        "rankings.json": tba.event_rankings(event_key),
+    }
+
+    for name, data in responses.items():
+        with open(event_dir / name, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+
+    logger.info(f"Recorded {event_key} to {event_dir}")
+    return event_dir
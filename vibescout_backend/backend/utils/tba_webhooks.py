@@ -0,0 +1,191 @@
+"""
+Handling for push notifications from The Blue Alliance webhooks.
+
+TBA signs each webhook body with the secret configured for the webhook
+(https://www.thebluealliance.com/account) and sends the hex HMAC-SHA256 digest
+in the ``X-TBA-HMAC`` header. Set the same secret in TBA_WEBHOOK_SECRET.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Message types applied to the database; others are acknowledged and ignored
+HANDLED_MESSAGE_TYPES = ["match_score", "schedule_updated", "upcoming_match"]
+
+
+def get_webhook_secret() -> str:
+    return os.getenv("TBA_WEBHOOK_SECRET", "")
+
+
+def webhooks_enabled() -> bool:
+    """Webhooks are accepted only when a secret is configured"""
+    return bool(get_webhook_secret())
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    """HMAC-SHA256 hex digest of a webhook body, as sent in X-TBA-HMAC"""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str, secret: str) -> bool:
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip().lower())
+
+
+def record_payload(body: bytes):
+    """Save a raw webhook body when TBA_WEBHOOK_RECORD_DIR is set"""
+    record_dir = os.getenv("TBA_WEBHOOK_RECORD_DIR")
+    if not record_dir:
+        return
+
+    path = Path(record_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / f"webhook_{time.time_ns()}.json").write_bytes(body)
+
+
+def handle_webhook(message: dict) -> dict:
+    """
+    Apply a verified TBA webhook message.
+
+    Args:
+        message: Decoded webhook body with message_type and message_data
+
+    Returns:
+        dict with status information about the message
+    """
+    message_type = message.get("message_type", "")
+    message_data = message.get("message_data") or {}
+
+    if message_type == "verification":
+        # TBA sends this once when the webhook is added; the key must be
+        # entered on the TBA account page to activate the webhook.
+        logger.warning(
+            f"TBA webhook verification key: {message_data.get('verification_key')}"
+        )
+        return {"success": True, "message": "Verification key logged"}
+
+    if message_type == "ping":
+        return {"success": True, "message": "pong"}
+
+    if message_type not in HANDLED_MESSAGE_TYPES:
+        logger.debug(f"Ignoring TBA webhook message type {message_type}")
+        return {"success": True, "message": f"Ignored {message_type}"}
+
+    from backend.models import Competition
+
+    event_key = message_data.get("event_key", "")
+    competition = Competition.objects.filter(code=event_key).first()
+    if competition is None:
+        logger.debug(f"Ignoring {message_type} for untracked event {event_key}")
+        return {"success": True, "message": f"Event {event_key} is not tracked"}
+
+    if message_type == "match_score":
+        return _handle_match_score(competition, message_data)
+    if message_type == "upcoming_match":
+        return _handle_upcoming_match(competition, message_data)
+    return _handle_schedule_updated(competition)
+
+
+def _handle_match_score(competition, message_data: dict) -> dict:
+    from backend.utils.match_utils import import_match_from_dict
+
+    match_data = message_data.get("match") or {}
+    match_key = match_data.get("key") or message_data.get("match_key")
+
+    try:
+        import_match_from_dict(match_data, competition)
+    except Exception as e:
+        logger.error(f"Error applying match_score for {match_key}: {str(e)}")
+        return {"success": False, "error": f"Error applying {match_key}: {str(e)}"}
+
+    logger.info(f"Applied match_score webhook for {match_key}")
+    return {"success": True, "message": f"Updated match {match_key}"}
+
+
+def _handle_upcoming_match(competition, message_data: dict) -> dict:
+    from backend.models import Match
+    from backend.utils.match_utils import parse_match_key
+
+    match_key = message_data.get("match_key", "")
+    try:
+        _, match_type, set_number, match_number = parse_match_key(match_key)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    predicted_time = (
+        message_data.get("predicted_time") or message_data.get("scheduled_time") or 0
+    )
+    updated = Match.objects.filter(
+        competition=competition,
+        match_type=match_type,
+        set_number=set_number,
+        match_number=match_number,
+    ).update(predicted_match_time=predicted_time)
+
+    logger.info(f"Applied upcoming_match webhook for {match_key} ({updated} row)")
+    return {"success": True, "message": f"Updated predicted time for {match_key}"}
+
+
+def _handle_schedule_updated(competition) -> dict:
+    from .task_coalescing import coalesce_key, enqueue_once
+
+    # The message only says the schedule changed, so fetch it once in the background.
+    # Bursts of messages (alliance selection, replays) merge into one debounced sync,
+    # and a message arriving mid-sync triggers one more sync afterwards.
+    func = "backend.tasks.sync_competition_schedule"
+    result = enqueue_once(
+        func,
+        competition.code,
+        key=coalesce_key(func, competition=competition.code),
+        debounce=int(os.getenv("TBA_WEBHOOK_SCHEDULE_DEBOUNCE_SECONDS", "30")),
+        rerun=True,
+        task_name=f"sync_schedule_{competition.code}",
+    )
+    logger.info(f"Schedule sync for {competition.code}: {result['reason']}")
+    return {
+        "success": True,
+        "message": f"Schedule sync for {competition.code} {result['reason']}",
+        "queued": result["queued"],
+    }
+
+
+def build_match_score_message(match_data: dict) -> dict:
+    """Build a match_score webhook message from a TBA match dictionary"""
+    return {
+        "message_type": "match_score",
+        "message_data": {
+            "event_key": match_data.get("event_key"),
+            "match_key": match_data.get("key"),
+            "event_name": match_data.get("event_key"),
+            "match": match_data,
+        },
+    }
+
+
+def build_upcoming_match_message(match_data: dict) -> dict:
+    """Build an upcoming_match webhook message from a TBA match dictionary"""
+    alliances = match_data.get("alliances", {})
+    return {
+        "message_type": "upcoming_match",
+        "message_data": {
+            "event_key": match_data.get("event_key"),
+            "match_key": match_data.get("key"),
+            "event_name": match_data.get("event_key"),
+            "team_keys": alliances.get("red", {}).get("team_keys", [])
+            + alliances.get("blue", {}).get("team_keys", []),
+            "scheduled_time": match_data.get("time"),
+            "predicted_time": match_data.get("predicted_time"),
+        },
+    }
+
+
+def encode_message(message: dict) -> bytes:
+    return json.dumps(message).encode()
@@ -4,9 +4,6 @@ import logging
 import platform
 from pathlib import Path
 
-import yt_dlp
-from yt_dlp.utils import download_range_func
-
 logger = logging.getLogger(__name__)
 
 
@@ -130,6 +127,10 @@ def download_match_video(match, buffer=30, output_dir="match_videos"):
         f"(buffer: {buffer}s)"
     )
 
+    # yt-dlp takes a while to import; only the video queue's workers need it
+    import yt_dlp
+    from yt_dlp.utils import download_range_func
+
     # Determine temp directory based on platform
     if platform.system() == "Linux":
         tmp = "/tmp"
@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.analytics.match_predictor import predict_matches
+from backend.models import Match
+
+from .benchmark_opr import Command as OprBenchmark
+from .benchmark_sync_replay import QueryCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the Monte Carlo match predictor on a synthetic competition: "
+        "the first matches are played, the rest are predicted and compared "
+        "with their hidden results. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teams", type=int, default=80, help="Teams at the competition (default: 80)"
+        )
+        parser.add_argument(
+            "--matches-per-team",
+            type=int,
+            default=12,
+            help="Qualification matches each team plays (default: 12)",
+        )
+        parser.add_argument(
+            "--played",
+            type=float,
+            default=0.5,
+            help="Share of the schedule already played (default: 0.5)",
+        )
+        parser.add_argument(
+            "--draws", type=int, default=5000, help="Draws per match (default: 5000)"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per measurement (default: 3)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        match_count = options["teams"] * options["matches_per_team"] // 6
+
+        self.stdout.write(self.style.SUCCESS("\n=== Match Predictor Benchmark ==="))
+
+        with transaction.atomic():
+            competition, _ = OprBenchmark().create_competition(
+                options["teams"], match_count, rng
+            )
+            matches = list(
+                Match.objects.filter(competition=competition).order_by("match_number")
+            )
+            played = int(len(matches) * options["played"])
+            upcoming = matches[played:]
+            Match.objects.filter(pk__in=[match.pk for match in upcoming]).update(
+                has_played=False
+            )
+            self.stdout.write(
+                f"{options['teams']} teams, {played} played and {len(upcoming)} "
+                f"upcoming matches, {options['draws']} draws each"
+            )
+
+            predictions = self.measure(
+                "upcoming matches, not cached",
+                lambda: predict_matches(competition, upcoming, options["draws"]),
+                options["repeat"],
+                before=cache.clear,
+            )
+            self.measure(
+                "upcoming matches, cached",
+                lambda: predict_matches(competition, upcoming, options["draws"]),
+                options["repeat"],
+            )
+            self.measure(
+                "whole qualification schedule, not cached",
+                lambda: predict_matches(competition, matches, options["draws"]),
+                options["repeat"],
+                before=cache.clear,
+            )
+
+            # The upcoming matches still hold their generated scores
+            blue_won = np.array(
+                [m.blue_total_score > m.red_total_score for m in upcoming], dtype=float
+            )
+            forecast = np.array(
+                [predictions[m.pk]["blue_win_probability"] for m in upcoming]
+            )
+            inside = np.mean(
+                [
+                    predictions[m.pk]["blue_score_range"][0]
+                    <= m.blue_total_score
+                    <= predictions[m.pk]["blue_score_range"][2]
+                    for m in upcoming
+                ]
+            )
+            self.stdout.write(
+                f"\n  Brier score of blue win probability: "
+                f"{np.mean((forecast - blue_won) ** 2):.3f} (0.25 = coin flip)"
+            )
+            self.stdout.write(
+                f"  blue scores inside the 10-90th percentile range: {inside:.0%}"
+            )
+            transaction.set_rollback(True)
+
+    def measure(self, label, func, repeat, before=None):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        for _ in range(max(repeat, 1)):
+            if before:
+                before()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: median {statistics.median(timings) * 1000:.1f} ms  "
+            f"statements/run {sum(counter.counts.values()) / len(timings):.0f}"
+        )
+        return result
@@ -0,0 +1,208 @@
+import random
+import statistics
+import time
+from collections import Counter
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.analytics import opr
+from backend.models import Competition, Match, Team, TeamInfo
+
+from .benchmark_sync_replay import QueryCounter
+
+# Team numbers used for the synthetic competition
+FIRST_TEAM_NUMBER = 90001
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the OPR/DPR/CCWM solver on a synthetic competition whose "
+        "alliance scores come from known team ratings. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teams", type=int, default=80, help="Teams at the competition (default: 80)"
+        )
+        parser.add_argument(
+            "--matches-per-team",
+            type=int,
+            default=12,
+            help="Qualification matches each team plays (default: 12)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per measurement (default: 5)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        match_count = options["teams"] * options["matches_per_team"] // 6
+
+        self.stdout.write(self.style.SUCCESS("\n=== OPR Benchmark ==="))
+        self.stdout.write(
+            f"{options['teams']} teams x {match_count} matches, "
+            f"{options['repeat']} runs each"
+        )
+
+        with transaction.atomic():
+            competition, true_opr = self.create_competition(
+                options["teams"], match_count, rng
+            )
+            arrays = opr.load_alliance_arrays(competition)
+
+            self.measure(
+                "load matches", lambda: opr.load_alliance_arrays(competition), options
+            )
+            ratings = self.measure(
+                "full solve", lambda: opr.solve_ratings(arrays), options
+            )
+            self.measure(
+                "competition_ratings (load + solve)",
+                lambda: opr.competition_ratings(competition),
+                options,
+            )
+            self.replay_matches(arrays)
+
+            # Dense least squares on the same system as a reference
+            teams, matrix = opr.incidence_matrix(arrays["team_ids"])
+            scores = arrays["scores"][:, :, 0].reshape(-1).astype(np.float64)
+            reference = np.linalg.lstsq(matrix.toarray(), scores, rcond=None)[0]
+            recovered = np.array([true_opr[team_id] for team_id in teams.tolist()])
+
+            self.stdout.write(
+                f"\n  largest difference from dense lstsq: "
+                f"{np.abs(ratings['opr']['total'] - reference).max():.2e}"
+            )
+            self.stdout.write(
+                f"  RMS error against the hidden ratings: "
+                f"{np.sqrt(np.mean((ratings['opr']['total'] - recovered) ** 2)):.2f} "
+                f"points (score noise SD 8)"
+            )
+            transaction.set_rollback(True)
+
+    def create_competition(self, team_count, match_count, rng):
+        competition = Competition.objects.create(code="benchmarkopr", name="OPR Benchmark")
+        numbers = range(FIRST_TEAM_NUMBER, FIRST_TEAM_NUMBER + team_count)
+        existing = set(
+            Team.objects.filter(number__in=numbers).values_list("number", flat=True)
+        )
+        Team.objects.bulk_create(
+            [Team(number=n, name=f"Team {n}") for n in numbers if n not in existing]
+        )
+        teams = list(Team.objects.filter(number__in=numbers))
+        TeamInfo.objects.bulk_create(
+            [TeamInfo(team=team, competition=competition) for team in teams]
+        )
+
+        # Hidden per-component ratings; alliance scores are their sums plus noise
+        ratings = {
+            team.pk: {
+                "auto": rng.uniform(0, 15),
+                "teleop": rng.uniform(5, 40),
+                "endgame": rng.choice([0, 3, 6, 10]),
+            }
+            for team in teams
+        }
+
+        matches = []
+        for number in range(1, match_count + 1):
+            fields = {}
+            picked = rng.sample(teams, 6)
+            for alliance, members in (("blue", picked[:3]), ("red", picked[3:])):
+                for position, team in enumerate(members, 1):
+                    fields[f"{alliance}_team_{position}"] = team
+                points = {
+                    component: round(
+                        sum(ratings[team.pk][component] for team in members)
+                        + rng.gauss(0, 8 / 3**0.5)
+                    )
+                    for component in ("auto", "teleop", "endgame")
+                }
+                fields[f"{alliance}_auto_points"] = points["auto"]
+                fields[f"{alliance}_teleop_points"] = points["teleop"]
+                fields[f"{alliance}_endgame_points"] = points["endgame"]
+                fields[f"{alliance}_total_score"] = sum(points.values())
+            matches.append(
+                Match(
+                    competition=competition,
+                    match_number=number,
+                    match_type="qualification",
+                    has_played=True,
+                    **fields,
+                )
+            )
+        Match.objects.bulk_create(matches, batch_size=200)
+
+        true_opr = {team_id: sum(values.values()) for team_id, values in ratings.items()}
+        return competition, true_opr
+
+    def replay_matches(self, arrays):
+        """Add matches one at a time; compare incremental and full solves"""
+        first = len(arrays["match_ids"]) // 2
+        methods = Counter()
+        incremental_times, full_times = [], []
+        difference = 0.0
+        state_key = ("benchmark", time.time())
+
+        def prefix(count):
+            return {name: values[:count] for name, values in arrays.items()}
+
+        opr.solve_ratings(prefix(first), state_key)
+        for count in range(first + 1, len(arrays["match_ids"]) + 1):
+            started = time.perf_counter()
+            incremental = opr.solve_ratings(prefix(count), state_key)
+            incremental_times.append(time.perf_counter() - started)
+            methods[incremental["method"]] += 1
+
+            started = time.perf_counter()
+            full = opr.solve_ratings(prefix(count))
+            full_times.append(time.perf_counter() - started)
+
+            for values, reference in [
+                (incremental["dpr"], full["dpr"]),
+                *[(incremental["opr"][c], full["opr"][c]) for c in opr.COMPONENTS],
+            ]:
+                difference = max(difference, np.abs(values - reference).max())
+
+        # A corrected score forces a full solve
+        corrected = {name: values.copy() for name, values in arrays.items()}
+        corrected["scores"][0, 0, 0] += 10
+        methods["full after correction"] += (
+            opr.solve_ratings(corrected, state_key)["method"] == "full"
+        )
+
+        self.stdout.write(
+            f"\n  adding matches {first + 1}-{len(arrays['match_ids'])} one at a time:"
+        )
+        self.stdout.write(
+            f"    incremental: median {statistics.median(incremental_times) * 1000:.2f} ms"
+            f"  full: median {statistics.median(full_times) * 1000:.2f} ms"
+        )
+        self.stdout.write(f"    solves: {dict(methods)}")
+        self.stdout.write(
+            f"    largest difference from the batch solve: {difference:.2e}"
+        )
+
+    def measure(self, label, func, options, before=None):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        for _ in range(max(options["repeat"], 1)):
+            if before:
+                before()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: median {statistics.median(timings) * 1000:.2f} ms  "
+            f"min {min(timings) * 1000:.2f} ms  "
+            f"statements/run {sum(counter.counts.values()) / len(timings):.0f}"
+        )
+        return result
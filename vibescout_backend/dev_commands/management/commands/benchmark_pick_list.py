@@ -0,0 +1,103 @@
+import os
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.analytics.pick_list import build_draft, build_pick_list
+from backend.models import TeamInfo
+
+from .benchmark_opr import Command as OprBenchmark
+from .benchmark_sync_replay import QueryCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the pick-list optimizer on a synthetic competition ranked "
+        "by its hidden team ratings. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teams", type=int, default=60, help="Teams at the competition (default: 60)"
+        )
+        parser.add_argument(
+            "--matches-per-team",
+            type=int,
+            default=12,
+            help="Qualification matches each team plays (default: 12)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes for the parallel run (default: CPUs)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per measurement (default: 3)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        match_count = options["teams"] * options["matches_per_team"] // 6
+
+        self.stdout.write(self.style.SUCCESS("\n=== Pick List Benchmark ==="))
+
+        with transaction.atomic():
+            competition, true_opr = OprBenchmark().create_competition(
+                options["teams"], match_count, rng
+            )
+            infos = list(TeamInfo.objects.filter(competition=competition))
+            infos.sort(key=lambda info: -true_opr[info.team_id])
+            for rank, info in enumerate(infos, 1):
+                info.rank = rank
+            TeamInfo.objects.bulk_update(infos, ["rank"])
+
+            draft = build_draft(competition)
+            captains = [int(draft["team_ids"][row]) for row in draft["captains"]]
+            self.stdout.write(
+                f"{options['teams']} teams, {len(captains)} captains, "
+                f"{len(draft['pool'])} pickable teams"
+            )
+
+            for seed in (1, len(captains) // 2, len(captains)):
+                captain = captains[seed - 1]
+                single = self.measure(
+                    f"seed {seed}, 1 worker",
+                    lambda: build_pick_list(competition, captain, workers=1),
+                    options["repeat"],
+                )
+                parallel = self.measure(
+                    f"seed {seed}, {options['workers']} workers",
+                    lambda: build_pick_list(competition, captain, workers=options["workers"]),
+                    options["repeat"],
+                )
+                outcomes = single["evaluated"] + single["pruned"]
+                self.stdout.write(
+                    f"    second picks played out: {single['evaluated']} of "
+                    f"{outcomes} ({single['pruned'] / max(outcomes, 1):.0%} pruned), "
+                    f"{single['memoized']} alliance scores memoized, "
+                    f"same plans: {single['first_picks'] == parallel['first_picks']}"
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, label, func, repeat):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        for _ in range(max(repeat, 1)):
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: median {statistics.median(timings) * 1000:.1f} ms  "
+            f"statements/run {sum(counter.counts.values()) / len(timings):.0f}"
+        )
+        return result
@@ -0,0 +1,163 @@
+import os
+import random
+import statistics
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.analytics.rank_projection import (
+    load_qualification_schedule,
+    project_ranks,
+    result_ranking_points,
+)
+from backend.models import Match
+
+from .benchmark_opr import Command as OprBenchmark
+from .benchmark_sync_replay import QueryCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the ranking projection on a synthetic competition: the "
+        "first matches are played, the rest are simulated and the projected "
+        "ranks compared with the hidden final standings. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teams", type=int, default=60, help="Teams at the competition (default: 60)"
+        )
+        parser.add_argument(
+            "--matches-per-team",
+            type=int,
+            default=12,
+            help="Qualification matches each team plays (default: 12)",
+        )
+        parser.add_argument(
+            "--played",
+            type=float,
+            default=0.5,
+            help="Share of the schedule already played (default: 0.5)",
+        )
+        parser.add_argument(
+            "--simulations",
+            type=int,
+            default=10000,
+            help="Simulated events (default: 10000)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes for the parallel run (default: CPUs)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per measurement (default: 3)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        match_count = options["teams"] * options["matches_per_team"] // 6
+        simulations = options["simulations"]
+
+        self.stdout.write(self.style.SUCCESS("\n=== Rank Projection Benchmark ==="))
+
+        with transaction.atomic():
+            competition, _ = OprBenchmark().create_competition(
+                options["teams"], match_count, rng
+            )
+            # The final standings from the generated scores of every match
+            final = load_qualification_schedule(competition)
+            matches = list(
+                Match.objects.filter(competition=competition).order_by("match_number")
+            )
+            played = int(len(matches) * options["played"])
+            Match.objects.filter(
+                pk__in=[match.pk for match in matches[played:]]
+            ).update(has_played=False)
+            self.stdout.write(
+                f"{options['teams']} teams, {played} played and "
+                f"{len(matches) - played} remaining matches, {simulations} events"
+            )
+
+            self.measure(
+                "1 worker, not cached",
+                lambda: project_ranks(competition, simulations, workers=1),
+                options["repeat"],
+                before=cache.clear,
+            )
+            projection = self.measure(
+                f"{options['workers']} workers, not cached",
+                lambda: project_ranks(competition, simulations, options["workers"]),
+                options["repeat"],
+                before=cache.clear,
+            )
+            self.measure(
+                "cached",
+                lambda: project_ranks(competition, simulations, options["workers"]),
+                options["repeat"],
+            )
+
+            self.report_accuracy(projection, final)
+
+            # Post the remaining results one at a time
+            timings = []
+            for match in matches[played:]:
+                Match.objects.filter(pk=match.pk).update(has_played=True)
+                started = time.perf_counter()
+                project_ranks(competition, simulations, options["workers"])
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f"\n  re-projecting after each of the remaining results: first "
+                f"{timings[0] * 1000:.0f} ms, last {timings[-1] * 1000:.0f} ms, "
+                f"median {statistics.median(timings) * 1000:.0f} ms"
+            )
+            transaction.set_rollback(True)
+
+    def report_accuracy(self, projection, final):
+        teams = np.unique(final["team_ids"])
+        columns = np.searchsorted(teams, final["team_ids"].reshape(-1, 3))
+        points = np.zeros(len(teams))
+        scores = np.zeros(len(teams))
+        np.add.at(points, columns, result_ranking_points(final["scores"]).reshape(-1, 1))
+        np.add.at(scores, columns, final["scores"].reshape(-1, 1))
+        scheduled = np.bincount(columns.ravel(), minlength=len(teams))
+        order = np.lexsort((-scores / scheduled, -points / scheduled))
+        actual = dict(zip(teams[order].tolist(), range(1, len(teams) + 1)))
+
+        errors = [abs(t["mean_rank"] - actual[t["team_id"]]) for t in projection["teams"]]
+        inside = np.mean(
+            [
+                t["rank_range"][0] <= actual[t["team_id"]] <= t["rank_range"][2]
+                for t in projection["teams"]
+            ]
+        )
+        self.stdout.write(
+            f"\n  mean rank error against the final standings: "
+            f"{np.mean(errors):.2f} ranks"
+        )
+        self.stdout.write(f"  final ranks inside the 10-90th percentile range: {inside:.0%}")
+
+    def measure(self, label, func, repeat, before=None):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        for _ in range(max(repeat, 1)):
+            if before:
+                before()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: median {statistics.median(timings) * 1000:.1f} ms  "
+            f"statements/run {sum(counter.counts.values()) / len(timings):.0f}"
+        )
+        return result
@@ -0,0 +1,191 @@
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django_q.models import Schedule
+
+from backend.apps import migrations_applied
+from backend.schedule_setup import (
+    reconcile_schedules,
+    setup_scheduled_tasks,
+    wanted_schedules,
+)
+from backend.utils.task_coalescing import SCHEDULE_PREFIX
+
+from .benchmark_sync_replay import QueryCounter
+
+
+_SETUP = "import django; django.setup(); "
+
+# Fresh interpreters started for the cold-start measurements
+COLD_START_SCENARIOS = {
+    "manage.py help": ["manage.py", "help"],
+    "manage.py check": ["manage.py", "check"],
+    # What runserver loads before serving its first request
+    "runserver": ["-c", _SETUP + "import backend.urls"],
+    # What a (recycled) qcluster worker loads before running its first task
+    "qcluster worker": ["-c", _SETUP + "import django_q.cluster, backend.tasks"],
+    "webhook match_score": [
+        "-c",
+        _SETUP + "import backend.utils.tba_webhooks, backend.utils.match_utils",
+    ],
+}
+
+# Dependencies that should only load where they are used
+HEAVY_MODULES = ["tbapy", "yt_dlp", "numpy", "scipy", "PIL"]
+
+
+def parse_importtime(stderr: str) -> Counter:
+    """Self import time in microseconds per top-level package from -X importtime"""
+    totals = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        totals[parts[2].strip().split(".")[0]] += int(parts[0])
+    return totals
+
+
+def migration_plan_pending() -> bool:
+    """The startup check BackendConfig.ready used before: a full migration plan"""
+    executor = MigrationExecutor(connection)
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
+def recreate_schedules() -> dict:
+    """The startup schedule setup used before: delete every schedule and recreate it"""
+    Schedule.objects.exclude(name__startswith=SCHEDULE_PREFIX).delete()
+    return reconcile_schedules(wanted_schedules(), Schedule.objects.none())
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the work BackendConfig.ready does at startup (migration check and "
+        "schedule setup, old approach against new; changes are rolled back) and "
+        "the cold-start and import time of the server, workers and commands."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per measurement (default: 5)",
+        )
+        parser.add_argument(
+            "--cold-runs",
+            type=int,
+            default=3,
+            help="Fresh interpreter starts per cold-start scenario, 0 to skip (default: 3)",
+        )
+        parser.add_argument(
+            "--breakdown",
+            choices=list(COLD_START_SCENARIOS),
+            default="runserver",
+            help="Scenario to show the import time breakdown for (default: runserver)",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Packages shown in the import time breakdown (default: 15)",
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(options["repeat"], 1)
+        # Every created schedule is logged at INFO
+        logging.getLogger("backend.schedule_setup").setLevel(logging.WARNING)
+
+        self.stdout.write(self.style.SUCCESS("\n=== Startup Benchmark ==="))
+        self.stdout.write(f"Runs per step: {repeat}")
+
+        self.stdout.write("\nMigration check:")
+        self.measure("migration plan (before)", migration_plan_pending, repeat)
+        self.measure("applied check (now)", lambda: not migrations_applied(), repeat)
+
+        self.stdout.write("\nSchedule setup:")
+        with transaction.atomic():
+            # Start from a reconciled state, as on any restart after the first
+            setup_scheduled_tasks()
+
+            self.measure("delete and recreate (before)", recreate_schedules, repeat)
+            setup_scheduled_tasks()
+            next_runs = dict(Schedule.objects.values_list("name", "next_run"))
+
+            self.measure("reconcile (now)", setup_scheduled_tasks, repeat)
+            kept = sum(
+                1
+                for name, next_run in Schedule.objects.values_list("name", "next_run")
+                if next_runs.get(name) == next_run
+            )
+            self.stdout.write(
+                f"  next run times kept by reconcile: {kept}/{len(next_runs)}"
+            )
+            transaction.set_rollback(True)
+
+        if options["cold_runs"] > 0:
+            self.cold_start(options["cold_runs"], options["breakdown"], options["top"])
+
+    def cold_start(self, runs, breakdown, top):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings"}
+        env.pop("RUN_MAIN", None)  # Don't set up schedules in the measured processes
+
+        def run(args, importtime=False):
+            command = [sys.executable, *(["-X", "importtime"] if importtime else []), *args]
+            started = time.perf_counter()
+            result = subprocess.run(
+                command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+            )
+            return time.perf_counter() - started, result
+
+        self.stdout.write(f"\nCold start (median of {runs} fresh interpreters):")
+        imports = {}
+        for label, args in COLD_START_SCENARIOS.items():
+            timings = [run(args)[0] for _ in range(runs)]
+            _, result = run(args, importtime=True)
+            if result.returncode != 0:
+                self.stdout.write(self.style.ERROR(f"  {label}: failed"))
+                self.stdout.write(result.stderr.strip().splitlines()[-1])
+                continue
+
+            imports[label] = parse_importtime(result.stderr)
+            heavy = [name for name in HEAVY_MODULES if name in imports[label]]
+            self.stdout.write(
+                f"  {label}: {statistics.median(timings) * 1000:.0f} ms  "
+                f"imports {sum(imports[label].values()) / 1000:.0f} ms  "
+                f"heavy: {', '.join(heavy) or 'none'}"
+            )
+
+        if breakdown in imports:
+            self.stdout.write(f"\nImport time by package ({breakdown}, self time):")
+            for name, micros in imports[breakdown].most_common(top):
+                self.stdout.write(f"  {name:<24} {micros / 1000:8.1f} ms")
+
+    def measure(self, label, func, repeat):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        with connection.execute_wrapper(counter):
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: first {timings[0] * 1000:.1f} ms  "
+            f"mean {statistics.mean(timings) * 1000:.1f} ms  "
+            f"min {min(timings) * 1000:.1f} ms  "
+            f"statements/run {sum(counter.counts.values()) / repeat:.0f}  "
+            f"writes/run {counter.writes / repeat:.0f}  "
+            f"-> {result}"
+        )
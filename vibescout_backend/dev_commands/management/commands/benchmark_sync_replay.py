@@ -0,0 +1,295 @@
+import logging
+import os
+import statistics
+import time
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from backend.models import Competition, Match
+from backend.utils.tba_replay import ReplayClock, ReplayStore, TBAReplayServer
+
+# Gap between results that starts a new event day
+DAY_GAP_SECONDS = 6 * 3600
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts statements by SQL verb"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[sql.lstrip().split(" ", 1)[0].upper()] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def writes(self):
+        return self.counts["INSERT"] + self.counts["UPDATE"] + self.counts["DELETE"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay an event day from a TBA recording through the scheduled sync tasks "
+        "and report sync lag and database write load. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "recording",
+            type=str,
+            help="Recording directory, event directory or TBA matches dump (e.g., ../2020_data)",
+        )
+        parser.add_argument(
+            "--event",
+            type=str,
+            default=None,
+            help="Event key to replay (required if the recording has several events)",
+        )
+        parser.add_argument(
+            "--day",
+            type=int,
+            default=1,
+            help="Event day to replay, 0 for every day (default: 1)",
+        )
+        parser.add_argument(
+            "--poll-minutes",
+            type=float,
+            default=float(os.getenv("TASK_CHECK_MATCHES_INTERVAL_MINUTES", "5")),
+            help="Scheduled sync interval in minutes (default: TASK_CHECK_MATCHES_INTERVAL_MINUTES or 5)",
+        )
+        parser.add_argument(
+            "--strategy",
+            choices=["fixed", "adaptive"],
+            default="fixed",
+            help="fixed: poll every --poll-minutes; adaptive: run the adaptive "
+            "scheduler tick every minute (default: fixed)",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds of simulated TBA latency per request (default: 0)",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the replayed data instead of rolling it back",
+        )
+        parser.add_argument(
+            "--verbose-tasks",
+            action="store_true",
+            help="Keep INFO logging from the sync tasks",
+        )
+
+    def handle(self, *args, **options):
+        store = ReplayStore.load(options["recording"])
+        event_key = options["event"]
+        if event_key is None:
+            if len(store.matches) != 1:
+                raise CommandError(
+                    f"Recording has events {sorted(store.matches)}; choose one with --event"
+                )
+            event_key = next(iter(store.matches))
+        if event_key not in store.matches:
+            raise CommandError(f"Event {event_key} not found in recording")
+        if Competition.objects.filter(code=event_key).exists():
+            # Its already synced matches would count as synced at the window start
+            raise CommandError(
+                f"Competition {event_key} already exists in this database; "
+                "replay against a database without it"
+            )
+
+        window = self.day_window(store, event_key, options["day"])
+        start, end = window[0] - 1800, window[-1] + 600
+        poll_seconds = int(options["poll_minutes"] * 60)
+        strategy = options["strategy"]
+
+        clock = ReplayClock(start=start, speed=0)
+        server = TBAReplayServer(
+            ("127.0.0.1", 0), store, clock, latency=options["latency"]
+        )
+        server.start_in_thread()
+
+        if not options["verbose_tasks"]:
+            logging.getLogger("backend.tasks").setLevel(logging.WARNING)
+
+        saved_env = {
+            k: os.environ.get(k) for k in ("TBA_API_URL", "TBA_API_KEY", "TBA_CACHE_SECONDS")
+        }
+        os.environ["TBA_API_URL"] = server.base_url
+        # The replay clock jumps ahead of wall time, so cached responses would be stale
+        os.environ["TBA_CACHE_SECONDS"] = "0"
+        os.environ["TBA_API_KEY"] = saved_env["TBA_API_KEY"] or "replay"
+
+        self.stdout.write(self.style.SUCCESS("\n=== Sync Replay Benchmark ==="))
+        self.stdout.write(f"Event: {event_key}  Day: {options['day'] or 'all'}")
+        self.stdout.write(
+            f"Window: {time.strftime('%Y-%m-%d %H:%M', time.gmtime(start))} - "
+            f"{time.strftime('%H:%M', time.gmtime(end))} UTC, "
+            + (
+                "adaptive scheduler"
+                if strategy == "adaptive"
+                else f"polling every {poll_seconds}s"
+            )
+        )
+
+        try:
+            with transaction.atomic():
+                report = self.replay(
+                    event_key, store, clock, server, start, end, poll_seconds, strategy
+                )
+                if not options["keep"]:
+                    transaction.set_rollback(True)
+        finally:
+            server.shutdown()
+            server.server_close()
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        self.print_report(report, window)
+
+    def day_window(self, store, event_key, day):
+        """Sorted result times of the qualification matches on the chosen day"""
+        times = sorted(
+            t
+            for m in store.matches[event_key]
+            if m.get("comp_level") == "qm"
+            for t in [m.get("post_result_time") or m.get("actual_time")]
+            if t
+        )
+        if not times:
+            raise CommandError(f"No played qualification matches for {event_key}")
+
+        days = [[times[0]]]
+        for t in times[1:]:
+            if t - days[-1][-1] > DAY_GAP_SECONDS:
+                days.append([])
+            days[-1].append(t)
+
+        if day == 0:
+            return times
+        if day > len(days):
+            raise CommandError(f"{event_key} only has {len(days)} day(s) of matches")
+        return days[day - 1]
+
+    def replay(self, event_key, store, clock, server, start, end, poll_seconds, strategy):
+        from backend.tasks import adaptive_sync_tick, check_and_sync_new_matches
+
+        clock.set(start)
+        quiet = StringIO()
+        call_command("init_competition", event_key, api_key="replay", stdout=quiet)
+        call_command("add_blank_matches", event_key, api_key="replay", stdout=quiet)
+        server.stats.reset()
+
+        result_times = {
+            m["match_number"]: m.get("post_result_time") or m.get("actual_time")
+            for m in store.matches[event_key]
+            if m.get("comp_level") == "qm"
+        }
+
+        counter = QueryCounter()
+        synced_at = {}
+        polls = 0
+        modes = Counter()
+        writes = Counter()
+        task_seconds = 0.0
+        # The adaptive scheduler is a one-minute tick that decides whether to poll
+        step = 60 if strategy == "adaptive" else poll_seconds
+
+        now = start
+        while now <= end:
+            clock.set(now)
+
+            tick_started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                if strategy == "adaptive":
+                    result = adaptive_sync_tick(event_key, now=now)
+                    if result.get("polled"):
+                        polls += result["polls"]
+                        modes[result["mode"]] += result["polls"]
+                        writes.update(result["writes"])
+                else:
+                    result = check_and_sync_new_matches(event_key)
+                    polls += 1
+                    writes[result.get("write")] += 1
+            task_seconds += time.perf_counter() - tick_started
+
+            for number in Match.objects.filter(
+                competition__code=event_key,
+                match_type="qualification",
+                end_match_time__gt=0,
+            ).values_list("match_number", flat=True):
+                synced_at.setdefault(number, now)
+
+            now += step
+
+        return {
+            "polls": polls,
+            "modes": modes,
+            "match_writes": writes,
+            "task_seconds": task_seconds,
+            "queries": counter.counts,
+            "writes": counter.writes,
+            "tba": server.stats.as_dict(),
+            "result_times": result_times,
+            "synced_at": synced_at,
+        }
+
+    def print_report(self, report, window):
+        in_window = {
+            number: t
+            for number, t in report["result_times"].items()
+            if t and window[0] <= t <= window[-1]
+        }
+        lags = [
+            report["synced_at"][number] - t
+            for number, t in in_window.items()
+            if number in report["synced_at"]
+        ]
+        missed = len(in_window) - len(lags)
+        tba = report["tba"]
+
+        self.stdout.write("\nSync lag (result posted -> stored):")
+        if lags:
+            lags.sort()
+            p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+            self.stdout.write(
+                f"  matches: {len(lags)}  mean: {statistics.mean(lags) / 60:.1f} min  "
+                f"median: {statistics.median(lags) / 60:.1f} min  "
+                f"p95: {p95 / 60:.1f} min  max: {lags[-1] / 60:.1f} min"
+            )
+        if missed:
+            self.stdout.write(
+                self.style.WARNING(f"  {missed} match result(s) never synced in window")
+            )
+
+        self.stdout.write("\nLoad:")
+        self.stdout.write(
+            f"  polls: {report['polls']}  task time: {report['task_seconds']:.2f}s "
+            f"({report['task_seconds'] / max(report['polls'], 1) * 1000:.1f} ms/poll)"
+        )
+        if report["modes"]:
+            self.stdout.write(f"  polls by scheduler mode: {dict(report['modes'])}")
+        self.stdout.write(
+            f"  TBA requests: {tba['requests']} ({tba['not_modified']} not modified, "
+            f"{tba['not_found']} not found)"
+        )
+        match_writes = report["match_writes"]
+        self.stdout.write(
+            f"  match upserts: {match_writes['updated']} updated, "
+            f"{match_writes['created']} created, "
+            f"{match_writes['unchanged']} unchanged (writes avoided)"
+        )
+        queries = report["queries"]
+        self.stdout.write(
+            f"  DB statements: {sum(queries.values())}  writes: {report['writes']} "
+            f"(INSERT {queries['INSERT']}, UPDATE {queries['UPDATE']}, "
+            f"DELETE {queries['DELETE']})"
+        )
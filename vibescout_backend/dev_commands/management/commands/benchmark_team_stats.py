@@ -0,0 +1,207 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from backend.analytics.team_stats import (
+    CLIMB_POINTS,
+    SLOTS,
+    STAT_FIELDS,
+    compute_team_stats,
+    load_match_arrays,
+    update_team_stats,
+)
+from backend.models import Competition, Match, Team, TeamInfo
+
+from .benchmark_sync_replay import QueryCounter
+
+# Team numbers used for the synthetic competition
+FIRST_TEAM_NUMBER = 90001
+
+# Stats the per-team loop computed (it never filled avg_fuel_sd)
+COMPARED_FIELDS = [
+    "avg_fuel_scored",
+    "avg_auto_fuel",
+    "avg_climb_points",
+    "avg_auto_fuel_sd",
+    "avg_climb_points_sd",
+    "consistency_rating",
+]
+
+
+def legacy_team_stats(competition) -> dict:
+    """The per-team loop generate_competition used before backend.analytics"""
+    stats = {}
+    for team_info in TeamInfo.objects.filter(competition=competition).select_related(
+        "team"
+    ):
+        team = team_info.team
+        team_matches = Match.objects.filter(
+            competition=competition, has_played=True
+        ).filter(
+            models.Q(blue_team_1=team)
+            | models.Q(blue_team_2=team)
+            | models.Q(blue_team_3=team)
+            | models.Q(red_team_1=team)
+            | models.Q(red_team_2=team)
+            | models.Q(red_team_3=team)
+        )
+        if not team_matches.exists():
+            continue
+
+        fuel_values, auto_values, climb_values = [], [], []
+        for match in team_matches:
+            for slot in SLOTS:
+                alliance, position = slot.split("_")
+                if getattr(match, f"{alliance}_team_{position}") == team:
+                    fuel_values.append(getattr(match, f"{slot}_fuel_scored"))
+                    auto_values.append(getattr(match, f"{slot}_auto_fuel"))
+                    climb_values.append(
+                        CLIMB_POINTS.get(getattr(match, f"{slot}_climb"), 0)
+                    )
+                    break
+
+        count = len(fuel_values)
+        avg_fuel = sum(fuel_values) / count
+        consistency = 100.0
+        if count > 1 and avg_fuel > 0:
+            cv = statistics.stdev(fuel_values) / avg_fuel
+            consistency = max(0, min(100, 100 - cv * 100))
+
+        values = {
+            "avg_fuel_scored": avg_fuel,
+            "avg_auto_fuel": sum(auto_values) / count,
+            "avg_climb_points": sum(climb_values) / count,
+            "avg_auto_fuel_sd": statistics.stdev(auto_values) if count > 1 else 0.0,
+            "avg_climb_points_sd": statistics.stdev(climb_values) if count > 1 else 0.0,
+            "consistency_rating": consistency,
+        }
+        for field, value in values.items():
+            setattr(team_info, field, value)
+        team_info.avg_points_contributed = avg_fuel
+        team_info.save()
+        stats[team.pk] = values
+    return stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the vectorized team stats engine against the old per-team loop "
+        "on a synthetic competition. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teams", type=int, default=80, help="Teams at the competition (default: 80)"
+        )
+        parser.add_argument(
+            "--matches", type=int, default=1000, help="Played matches (default: 1000)"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per measurement (default: 3)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("\n=== Team Stats Benchmark ==="))
+        self.stdout.write(
+            f"{options['teams']} teams x {options['matches']} matches, "
+            f"{options['repeat']} runs each"
+        )
+
+        with transaction.atomic():
+            competition = self.create_competition(
+                options["teams"], options["matches"], random.Random(options["seed"])
+            )
+            team_infos = TeamInfo.objects.filter(competition=competition)
+
+            def reset():
+                team_infos.update(**{field: 0 for field in STAT_FIELDS})
+
+            legacy = self.measure(
+                "per-team loop (before)",
+                lambda: legacy_team_stats(competition),
+                options["repeat"],
+                reset,
+            )
+            self.measure(
+                "vectorized engine (now)",
+                lambda: update_team_stats(competition),
+                options["repeat"],
+                reset,
+            )
+
+            engine = compute_team_stats(
+                load_match_arrays(competition), [info.team_id for info in team_infos]
+            )
+            difference = max(
+                abs(engine[team_id][field] - legacy[team_id][field])
+                for team_id in legacy
+                for field in COMPARED_FIELDS
+            )
+            self.stdout.write(
+                f"\n  teams compared: {len(legacy)}  "
+                f"largest difference from the loop: {difference:.2e}"
+            )
+            transaction.set_rollback(True)
+
+    def create_competition(self, team_count, match_count, rng):
+        competition = Competition.objects.create(
+            code="benchmarkstats", name="Team Stats Benchmark"
+        )
+        numbers = range(FIRST_TEAM_NUMBER, FIRST_TEAM_NUMBER + team_count)
+        existing = set(
+            Team.objects.filter(number__in=numbers).values_list("number", flat=True)
+        )
+        Team.objects.bulk_create(
+            [Team(number=n, name=f"Team {n}") for n in numbers if n not in existing]
+        )
+        teams = list(Team.objects.filter(number__in=numbers))
+        TeamInfo.objects.bulk_create(
+            [TeamInfo(team=team, competition=competition) for team in teams]
+        )
+
+        climbs = ["None", "L1", "L2", "L3"]
+        matches = []
+        for number in range(1, match_count + 1):
+            fields = {}
+            for slot, team in zip(SLOTS, rng.sample(teams, len(SLOTS))):
+                alliance, position = slot.split("_")
+                fields[f"{alliance}_team_{position}"] = team
+                fields[f"{slot}_fuel_scored"] = rng.randint(0, 40)
+                fields[f"{slot}_auto_fuel"] = rng.randint(0, 10)
+                fields[f"{slot}_climb"] = rng.choice(climbs)
+            matches.append(
+                Match(
+                    competition=competition,
+                    match_number=number,
+                    match_type="qualification",
+                    has_played=True,
+                    **fields,
+                )
+            )
+        Match.objects.bulk_create(matches, batch_size=200)
+        return competition
+
+    def measure(self, label, func, repeat, reset):
+        counter = QueryCounter()
+        timings = []
+        result = None
+        for _ in range(max(repeat, 1)):
+            reset()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+
+        self.stdout.write(
+            f"  {label}: mean {statistics.mean(timings) * 1000:.1f} ms  "
+            f"min {min(timings) * 1000:.1f} ms  "
+            f"statements/run {sum(counter.counts.values()) / len(timings):.0f}  "
+            f"writes/run {counter.writes / len(timings):.0f}"
+        )
+        return result
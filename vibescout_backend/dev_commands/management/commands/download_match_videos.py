@@ -1,8 +1,6 @@
 from django.core.management.base import BaseCommand
 import platform
 from pathlib import Path
-import yt_dlp
-from yt_dlp.utils import download_range_func
 from backend.models import Competition, Match
 
 
@@ -103,7 +101,9 @@ class Command(BaseCommand):
 
     def download_match_video(self, match, competition, output_path, buffer, day_1_end, day_2_end):
         """Download a single match video clip"""
-        
+        import yt_dlp
+        from yt_dlp.utils import download_range_func
+
         # Determine which day's stream to use
         match_time = match.start_match_time
         
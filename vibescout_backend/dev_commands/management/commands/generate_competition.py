@@ -2,9 +2,9 @@ import random
 from decimal import Decimal
 
 from django.core.management.base import BaseCommand
-from django.db import models
 
-from backend.models import Competition, Match, Team, TeamInfo
+from backend.analytics.running_stats import verify_running_stats
+from backend.models import Competition, Match, Team, TeamInfo, defer_epa_updates
 
 
 class Command(BaseCommand):
@@ -82,6 +82,8 @@ class Command(BaseCommand):
             help="Number of qualification matches per team (default: 10)",
         )
 
+    # One EPA update per competition instead of one per stored result
+    @defer_epa_updates()
     def handle(self, *args, **options):
         comp_name = options["name"]
         comp_code = options["code"]
@@ -288,105 +290,12 @@ class Command(BaseCommand):
 
         # Calculate average stats for each team
         self.stdout.write("Calculating team statistics...")
-        for team in teams:
-            team_info = TeamInfo.objects.get(team=team, competition=competition)
-
-            # Get all matches for this team
-            team_matches = Match.objects.filter(
-                competition=competition, has_played=True
-            ).filter(
-                models.Q(blue_team_1=team)
-                | models.Q(blue_team_2=team)
-                | models.Q(blue_team_3=team)
-                | models.Q(red_team_1=team)
-                | models.Q(red_team_2=team)
-                | models.Q(red_team_3=team)
-            )
+        verify_running_stats(competition)
 
-            if team_matches.exists():
-                import statistics
-
-                fuel_values = []
-                auto_fuel_values = []
-                climb_point_values = []
-                total_fuel = 0
-                total_auto_fuel = 0
-                total_climb_points = 0
-                match_count = team_matches.count()
-
-                for match in team_matches:
-                    # Find which position this team was in
-                    for i in range(1, 4):
-                        if getattr(match, f"blue_team_{i}") == team:
-                            fuel = getattr(match, f"blue_{i}_fuel_scored")
-                            auto = getattr(match, f"blue_{i}_auto_fuel")
-                            climb = getattr(match, f"blue_{i}_climb")
-
-                            fuel_values.append(fuel)
-                            auto_fuel_values.append(auto)
-                            total_fuel += fuel
-                            total_auto_fuel += auto
-
-                            climb_pts = 0
-                            if climb == "L1":
-                                climb_pts = 3
-                            elif climb == "L2":
-                                climb_pts = 6
-                            elif climb == "L3":
-                                climb_pts = 10
-                            climb_point_values.append(climb_pts)
-                            total_climb_points += climb_pts
-                            break
-                        elif getattr(match, f"red_team_{i}") == team:
-                            fuel = getattr(match, f"red_{i}_fuel_scored")
-                            auto = getattr(match, f"red_{i}_auto_fuel")
-                            climb = getattr(match, f"red_{i}_climb")
-
-                            fuel_values.append(fuel)
-                            auto_fuel_values.append(auto)
-                            total_fuel += fuel
-                            total_auto_fuel += auto
-
-                            climb_pts = 0
-                            if climb == "L1":
-                                climb_pts = 3
-                            elif climb == "L2":
-                                climb_pts = 6
-                            elif climb == "L3":
-                                climb_pts = 10
-                            climb_point_values.append(climb_pts)
-                            total_climb_points += climb_pts
-                            break
-
-                # Calculate averages
-                team_info.avg_fuel_scored = total_fuel / match_count
-                team_info.avg_auto_fuel = total_auto_fuel / match_count
-                team_info.avg_climb_points = total_climb_points / match_count
-
-                # Advanced stats
-                team_info.avg_points_contributed = total_fuel / match_count
-
-                # Calculate standard deviations
-                if len(auto_fuel_values) > 1:
-                    team_info.avg_auto_fuel_sd = statistics.stdev(auto_fuel_values)
-                else:
-                    team_info.avg_auto_fuel_sd = 0.0
-
-                if len(climb_point_values) > 1:
-                    team_info.avg_climb_points_sd = statistics.stdev(climb_point_values)
-                else:
-                    team_info.avg_climb_points_sd = 0.0
-
-                # Consistency rating (0-100, higher = more consistent)
-                if len(fuel_values) > 1 and team_info.avg_fuel_scored > 0:
-                    fuel_sd = statistics.stdev(fuel_values)
-                    cv = fuel_sd / team_info.avg_fuel_scored
-                    team_info.consistency_rating = max(0, min(100, 100 - (cv * 100)))
-                else:
-                    team_info.consistency_rating = 100.0
-
-                team_info.accuracy = random.uniform(0.6, 0.95)  # Simulated accuracy
-                team_info.save()
+        team_infos = list(TeamInfo.objects.filter(competition=competition))
+        for team_info in team_infos:
+            team_info.accuracy = random.uniform(0.6, 0.95)  # Simulated accuracy
+        TeamInfo.objects.bulk_update(team_infos, ["accuracy"])
 
         # Display final rankings
         self.stdout.write(self.style.SUCCESS("\n=== Final Rankings ==="))
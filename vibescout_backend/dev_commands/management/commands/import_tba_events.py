@@ -1,13 +1,13 @@
 import os
 from pathlib import Path
 
-import tbapy
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from dotenv import load_dotenv
 
-from backend.models import Competition, Match, Team, TeamInfo
+from backend.models import Competition, Match, Team, TeamInfo, defer_epa_updates
 from backend.utils.match_utils import import_match_from_dict
+from backend.utils.tba_client import get_tba_client
 
 
 class Command(BaseCommand):
@@ -27,6 +27,8 @@ class Command(BaseCommand):
             help="TBA API key (or set TBA_API_KEY environment variable)",
         )
 
+    # One EPA update per competition instead of one per stored result
+    @defer_epa_updates()
     def handle(self, *args, **options):
         env_path = Path(__file__).resolve().parent.parent.parent.parent.parent / ".env"
         if env_path.exists():
@@ -44,7 +46,7 @@ class Command(BaseCommand):
             )
             return
 
-        tba = tbapy.TBA(api_key)
+        tba = get_tba_client(api_key)
 
         for event_key in options["event_keys"]:
             self.stdout.write(f"Processing event: {event_key}")
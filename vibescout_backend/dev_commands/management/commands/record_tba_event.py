@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from dotenv import load_dotenv
+
+from backend.utils.tba_client import get_tba_client
+from backend.utils.tba_replay import record_event
+
+
+class Command(BaseCommand):
+    help = "Record TBA event, team, match and ranking responses for the replay server"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "event_keys",
+            nargs="+",
+            type=str,
+            help="Event keys to record (e.g., 2025gacmp)",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=str,
+            default="tba_recordings",
+            help="Recording root directory (default: tba_recordings)",
+        )
+        parser.add_argument(
+            "--api-key",
+            type=str,
+            default="",
+            help="TBA API key (or set TBA_API_KEY environment variable)",
+        )
+
+    def handle(self, *args, **options):
+        env_path = Path(__file__).resolve().parent.parent.parent.parent.parent / ".env"
+        if env_path.exists():
+            load_dotenv(env_path)
+
+        api_key = options["api_key"]
+        if not api_key:
+            api_key = os.environ.get("TBA_API_KEY", "")
+
+        if not api_key:
+            self.stdout.write(
+                self.style.ERROR(
+                    "API key required. Provide via --api-key or TBA_API_KEY environment variable"
+                )
+            )
+            return
+
+        tba = get_tba_client(api_key)
+
+        for event_key in options["event_keys"]:
+            self.stdout.write(f"Recording event: {event_key}")
+            try:
+                event_dir = record_event(tba, event_key, options["output_dir"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Recorded {event_key} to {event_dir}")
+                )
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f"Error recording {event_key}: {str(e)}")
+                )
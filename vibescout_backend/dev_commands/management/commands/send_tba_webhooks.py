@@ -0,0 +1,146 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from backend.utils.tba_dump import iter_dump_matches
+from backend.utils.tba_webhooks import (
+    build_match_score_message,
+    build_upcoming_match_message,
+    encode_message,
+    sign_payload,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the TBA webhook endpoint with recorded payloads "
+        "(TBA_WEBHOOK_RECORD_DIR captures) or payloads built from a TBA match dump"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            type=str,
+            help="Directory of recorded webhook bodies, or a TBA matches dump file",
+        )
+        parser.add_argument(
+            "--event",
+            type=str,
+            default=None,
+            help="Only send messages for this event key",
+        )
+        parser.add_argument(
+            "--secret",
+            type=str,
+            default="",
+            help="Webhook secret (or set TBA_WEBHOOK_SECRET environment variable)",
+        )
+        parser.add_argument(
+            "--url",
+            type=str,
+            default=None,
+            help="POST to a running server (e.g., http://127.0.0.1:8000/api/tba/webhook) "
+            "instead of calling the endpoint in-process",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of messages to send",
+        )
+
+    def handle(self, *args, **options):
+        secret = options["secret"] or os.environ.get("TBA_WEBHOOK_SECRET", "")
+        if not secret:
+            raise CommandError(
+                "Webhook secret required. Provide via --secret or TBA_WEBHOOK_SECRET"
+            )
+        # The in-process endpoint reads the secret from the environment
+        os.environ["TBA_WEBHOOK_SECRET"] = secret
+
+        messages = list(self.load_messages(options["source"], options["event"]))
+        if options["limit"] is not None:
+            messages = messages[: options["limit"]]
+
+        self.stdout.write(self.style.SUCCESS("\n=== Sending TBA Webhooks ==="))
+        self.stdout.write(f"Messages: {len(messages)}")
+
+        client = None if options["url"] else Client(SERVER_NAME="localhost")
+        statuses = Counter()
+        types = Counter()
+        started = time.perf_counter()
+
+        for body in messages:
+            signature = sign_payload(body, secret)
+            if client is not None:
+                response = client.post(
+                    "/api/tba/webhook",
+                    data=body,
+                    content_type="application/json",
+                    HTTP_X_TBA_HMAC=signature,
+                )
+                status = response.status_code
+            else:
+                status = self.post(options["url"], body, signature)
+
+            statuses[status] += 1
+            types[json.loads(body).get("message_type")] += 1
+            if status != 200:
+                self.stdout.write(self.style.WARNING(f"  HTTP {status} for {body[:120]!r}"))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"\nMessage types: {dict(types)}")
+        self.stdout.write(f"HTTP statuses: {dict(statuses)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Sent {len(messages)} messages in {elapsed:.2f}s "
+                f"({elapsed / max(len(messages), 1) * 1000:.1f} ms/message)"
+            )
+        )
+
+    def load_messages(self, source, event_key):
+        """Yield webhook bodies in the order TBA would have sent them"""
+        path = Path(source)
+
+        if path.is_dir():
+            for body_path in sorted(path.glob("*.json")):
+                body = body_path.read_bytes()
+                data = json.loads(body).get("message_data") or {}
+                if event_key is None or data.get("event_key") == event_key:
+                    yield body
+            return
+
+        events = []
+        for _, match_data in iter_dump_matches([path]):
+            if event_key and match_data.get("event_key") != event_key:
+                continue
+            if match_data.get("predicted_time"):
+                events.append(
+                    (match_data["predicted_time"] - 420, build_upcoming_match_message(match_data))
+                )
+            result_time = match_data.get("post_result_time") or match_data.get("actual_time")
+            if result_time:
+                events.append((result_time, build_match_score_message(match_data)))
+
+        for _, message in sorted(events, key=lambda event: event[0]):
+            yield encode_message(message)
+
+    def post(self, url, body, signature):
+        request = urllib.request.Request(
+            url,
+            data=body,
+            headers={"Content-Type": "application/json", "X-TBA-HMAC": signature},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
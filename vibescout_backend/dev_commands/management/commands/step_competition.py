@@ -3,7 +3,8 @@ from decimal import Decimal
 
 from django.core.management.base import BaseCommand, CommandError
 
-from backend.models import Competition, Match, Team, TeamInfo
+from backend.analytics.pick_list import build_pick_list
+from backend.models import Competition, Match, Team, TeamInfo, defer_epa_updates
 
 
 class Command(BaseCommand):
@@ -32,6 +33,8 @@ class Command(BaseCommand):
             help="Competition code (default: TEST2026)",
         )
 
+    # One EPA update per competition instead of one per stored result
+    @defer_epa_updates()
     def handle(self, *args, **options):
         phase = options["phase"]
         comp_code = options["competition"]
@@ -144,6 +147,24 @@ class Command(BaseCommand):
                 f"  {team_info.rank}. Team {team_info.team.number} - {team_info.team.name} ({team_info.ranking_points} RP)"
             )
 
+        self.stdout.write("\nRecommended first picks:")
+        for team_info in top_teams:
+            try:
+                pick_list = build_pick_list(competition, team_info.team_id)
+            except ValueError as e:
+                self.stdout.write(f"  Team {team_info.team.number}: {e}")
+                continue
+            picks = Team.objects.in_bulk(
+                [pick["team_id"] for pick in pick_list["first_picks"][:3]]
+            )
+            self.stdout.write(
+                f"  Team {team_info.team.number}: "
+                + ", ".join(
+                    f"{picks[pick['team_id']].number} ({pick['win_probability']:.0%})"
+                    for pick in pick_list["first_picks"][:3]
+                )
+            )
+
         self.stdout.write(self.style.SUCCESS("\n✓ Alliance Selection Round 1 ready"))
         self.stdout.write(
             "Top 4 teams (#1-4) will now pick their first alliance partner..."
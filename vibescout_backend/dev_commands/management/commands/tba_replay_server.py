@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.utils.tba_replay import ReplayClock, ReplayStore, TBAReplayServer
+
+
+class Command(BaseCommand):
+    help = "Serve recorded TBA responses locally for offline sync testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "recording",
+            type=str,
+            help="Recording directory, event directory or TBA matches dump (e.g., ../2020_data)",
+        )
+        parser.add_argument("--host", type=str, default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--start",
+            type=float,
+            default=None,
+            help="Replay clock start as unix time (default: 10 minutes before the first result)",
+        )
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Replay seconds per real second; 0 freezes the clock (default: 1)",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds added to every API response (default: 0)",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.0,
+            help="Maximum random seconds added on top of latency (default: 0)",
+        )
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=0,
+            help="Cache-Control max-age in seconds (default: 0, always revalidate)",
+        )
+
+    def handle(self, *args, **options):
+        store = ReplayStore.load(options["recording"])
+        if not store.matches:
+            raise CommandError(f"No matches found in {options['recording']}")
+
+        start = options["start"]
+        if start is None:
+            first_results = [
+                times[0] for times in map(store.result_times, store.matches) if times
+            ]
+            start = min(first_results) - 600 if first_results else time.time()
+
+        clock = ReplayClock(start=start, speed=options["speed"])
+        server = TBAReplayServer(
+            (options["host"], options["port"]),
+            store,
+            clock,
+            latency=options["latency"],
+            jitter=options["jitter"],
+            max_age=options["max_age"],
+        )
+
+        self.stdout.write(self.style.SUCCESS("\n=== TBA Replay Server ==="))
+        for event_key, matches in store.matches.items():
+            self.stdout.write(f"  {event_key}: {len(matches)} matches")
+        self.stdout.write(f"\nServing at {server.base_url}")
+        self.stdout.write(f"Point the backend at it with TBA_API_URL={server.base_url}")
+        self.stdout.write(
+            "Control the clock with /_replay/clock?set=<unix>|advance=<s>|speed=<x>"
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("\nStopping replay server")
+        finally:
+            server.server_close()
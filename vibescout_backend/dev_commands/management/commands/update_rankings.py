@@ -1,12 +1,12 @@
 import os
 from pathlib import Path
 
-import tbapy
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from dotenv import load_dotenv
 
-from backend.models import Competition, Team, TeamInfo
+from backend.models import Competition
+from backend.utils.ranking_utils import apply_event_rankings
+from backend.utils.tba_client import get_tba_client
 
 
 class Command(BaseCommand):
@@ -43,7 +43,7 @@ class Command(BaseCommand):
             )
             return
 
-        tba = tbapy.TBA(api_key)
+        tba = get_tba_client(api_key)
 
         for event_key in options["event_keys"]:
             self.stdout.write(f"Updating rankings for: {event_key}")
@@ -57,7 +57,6 @@ class Command(BaseCommand):
                     self.style.ERROR(f"Error updating {event_key}: {str(e)}")
                 )
 
-    @transaction.atomic
     def update_event_rankings(self, tba, event_key):
         # Get competition from database
         try:
@@ -90,32 +89,4 @@ class Command(BaseCommand):
             for i, info in enumerate(sort_order_info, 1):
                 self.stdout.write(f"    {i}. {info.get('name', 'Unknown')}")
 
-        updated_count = 0
-        for ranking in rankings:
-            team_key = ranking.get("team_key", "")
-            team_number = int(team_key.replace("frc", ""))
-
-            try:
-                team = Team.objects.get(number=team_number)
-                team_info = TeamInfo.objects.get(team=team, competition=competition)
-
-                # Only cache the rank - TBA handles all sorting
-                team_info.rank = ranking.get("rank", 0)
-
-                team_info.save()
-                updated_count += 1
-
-            except Team.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"    Team {team_number} not found in database, skipping"
-                    )
-                )
-            except TeamInfo.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"    TeamInfo for {team_number} at {event_key} not found, skipping"
-                    )
-                )
-
-        self.stdout.write(f"  Updated {updated_count} team rankings")
+        apply_event_rankings(rankings_data, competition, stdout=self.stdout)